@@ -1,74 +1,233 @@
+import asyncio
 import requests
 import time
 import base64
 import hashlib
 import hmac
 import json
-from typing import Optional, List, Dict
-from config import API_KEY, API_SECRET, API_DOMAIN
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, List, Dict, Tuple
+from requests.adapters import HTTPAdapter
+from config import API_KEY, API_SECRET, API_DOMAIN, KRAKEN_POOL_CONNECTIONS, KRAKEN_POOL_MAXSIZE, KRAKEN_PUBLIC_TIMEOUT, KRAKEN_PRIVATE_TIMEOUT, KRAKEN_TICKER_TTL, \
+    KRAKEN_TIER, KRAKEN_PUBLIC_RATE, KRAKEN_PUBLIC_BURST, KRAKEN_RATE_LIMIT_MAX_WAIT, KRAKEN_REQUEST_DEADLINE, \
+    KRAKEN_BREAKER_THRESHOLD, KRAKEN_BREAKER_RESET, KRAKEN_NONCE_FILE
 from logger_config import logger
-from tenacity import retry, wait_exponential, stop_after_attempt
+from ohlcv import OHLCV
+from ticker import TickerSnapshot
+from rate_limiter import KrakenRateLimiter
+from nonce import NonceGenerator
+from resilience import KrakenError, CircuitBreaker, classify_api_errors, classify_exception, is_retryable, backoff_delay, \
+    ERROR_BUDGET, ERROR_CIRCUIT_OPEN, ERROR_RATE_LIMIT, BREAKER_ERRORS
+
+# Number of decimals Kraken accepts in the limit price of each pair
+PAIR_PRICE_DECIMALS = {
+    "XBTUSDT": 1,
+    "XETHZUSDT": 2,
+    "XRPUSDT": 5,
+}
+
+# Absolute amount a limit price is set inside the touch (below the ask for buys, above the bid for sells),
+# about one price tick of each pair so orders stay at the top of the book
+PAIR_PRICE_BUFFERS = {
+    "XBTUSDT": 0.05,
+    "XETHZUSDT": 0.01,
+    "XRPUSDT": 0.00001,
+}
+
+# time.monotonic() by which every request made in the current context must finish, e.g. one async
+# cycle's fetches. asyncio.to_thread copies the context, so worker threads see it too.
+request_deadline_at: ContextVar[Optional[float]] = ContextVar("request_deadline_at", default=None)
+
+
+@contextmanager
+def request_deadline(seconds: float):
+    """Bounds every Kraken call made inside the block, retries included, to 'seconds' from now."""
+    token = request_deadline_at.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        request_deadline_at.reset(token)
+
 
 class KrakenAPI:
-    def __init__(self, api_key: str, api_secret: str, api_domain: str):
+    def __init__(self, api_key: str, api_secret: str, api_domain: str,
+                 pool_connections: int = KRAKEN_POOL_CONNECTIONS, pool_maxsize: int = KRAKEN_POOL_MAXSIZE,
+                 public_timeout: Tuple[float, float] = KRAKEN_PUBLIC_TIMEOUT, private_timeout: Tuple[float, float] = KRAKEN_PRIVATE_TIMEOUT,
+                 ticker_ttl: float = KRAKEN_TICKER_TTL, rate_limiter: Optional[KrakenRateLimiter] = None,
+                 rate_limit_max_wait: float = KRAKEN_RATE_LIMIT_MAX_WAIT, request_deadline: float = KRAKEN_REQUEST_DEADLINE,
+                 circuit_breaker: Optional[CircuitBreaker] = None, nonce_generator: Optional[NonceGenerator] = None):
         self.api_key = api_key
         self.api_secret = base64.b64decode(api_secret)
         self.api_domain = api_domain
+        self.public_timeout = public_timeout
+        self.private_timeout = private_timeout
+        self.request_count = 0
+
+        # Monotonic nonces that stay unique across threads, tasks and (with a nonce file) processes
+        self.nonce_generator = nonce_generator if nonce_generator is not None else NonceGenerator(KRAKEN_NONCE_FILE)
+
+        # Client-side model of Kraken's API counters; share one instance between clients using the same key
+        self.rate_limiter = rate_limiter if rate_limiter is not None else KrakenRateLimiter(KRAKEN_TIER, KRAKEN_PUBLIC_RATE, KRAKEN_PUBLIC_BURST)
+        self.rate_limit_max_wait = rate_limit_max_wait
+
+        # Default time budget of one call including retries, and the per-endpoint circuit breaker
+        self.request_deadline = request_deadline
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not None else CircuitBreaker(KRAKEN_BREAKER_THRESHOLD, KRAKEN_BREAKER_RESET)
+
+        # Ticker snapshots shared by get_price/get_market_volume, and the fetches currently in flight
+        self.ticker_ttl = ticker_ttl
+        self._tickers: Dict[str, TickerSnapshot] = {}
+        self._ticker_fetches: Dict[str, "_InFlight"] = {}
+        self._ticker_lock = threading.Lock()
+
+        # One keep-alive session per client so TCP/TLS connections are reused across calls
+        self.session = requests.Session()
+        self._adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", self._adapter)
+        self.session.mount("http://", self._adapter)
+        self.session.headers.update({
+            "User-Agent": "Kraken REST API",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        })
+
+    def close(self):
+        """Closes all pooled connections."""
+        self.session.close()
+
+    def pool_stats(self) -> Dict[str, int]:
+        """Reports how many requests were made and how many connections the pool had to open for them."""
+        pools = self._adapter.poolmanager.pools
+        connections_opened = 0
+        idle_connections = 0
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            connections_opened += pool.num_connections
+            idle_connections += pool.pool.qsize() if pool.pool else 0
+        return {
+            "requests": self.request_count,
+            "hosts": len(pools),
+            "connections_opened": connections_opened,
+            "connections_reused": max(self.request_count - connections_opened, 0),
+            "idle_connections": idle_connections,
+        }
+
+    def rate_limit_budget(self) -> Dict[str, object]:
+        """Remaining points on each Kraken rate limit counter, queued requests and limiter counts."""
+        return self.rate_limiter.stats()
 
     def _sign_request(self, api_path: str, api_nonce: str, api_postdata: str) -> str:
         api_sha256 = hashlib.sha256(api_nonce.encode('utf-8') + api_postdata.encode('utf-8')).digest()
         api_hmacsha512 = hmac.new(self.api_secret, api_path.encode('utf-8') + api_sha256, hashlib.sha512)
         return base64.b64encode(api_hmacsha512.digest()).decode()
 
-    @retry(wait=wait_exponential(min=1, max=10), stop=stop_after_attempt(5))
-    def _make_request(self, method: str, path: str, data: Optional[Dict] = None, is_private: bool = False) -> Optional[Dict]:
+    def _make_request(self, method: str, path: str, data: Optional[Dict] = None, is_private: bool = False,
+                      priority: Optional[int] = None, deadline: Optional[float] = None) -> Optional[Dict]:
+        """
+        Calls a Kraken endpoint and returns its 'result', or None on failure. Transient
+        failures are retried with jittered backoff while 'deadline' seconds (the client's
+        request deadline by default) last, but only when the call is safe to repeat.
+        An endpoint whose circuit breaker is open fails immediately. Inside a
+        request_deadline() block the call also ends by that block's deadline.
+        """
+        deadline_at = time.monotonic() + (self.request_deadline if deadline is None else deadline)
+        bound = request_deadline_at.get()
+        if bound is not None:
+            deadline_at = min(deadline_at, bound)
+        attempt = 0
+        while True:
+            try:
+                return self._send(method, path, data, is_private, priority, deadline_at)
+            except KrakenError as error:
+                if error.kind == ERROR_CIRCUIT_OPEN:
+                    logger.error("%s skipped: %s", method, error)
+                    return None
+                delay = backoff_delay(attempt)
+                if not is_retryable(error.kind, method, is_private) or time.monotonic() + delay >= deadline_at:
+                    logger.error("%s failed (%s) after %d attempt(s): %s", method, error.kind, attempt + 1, error)
+                    return None
+                logger.warning("%s failed (%s), retrying in %.2fs: %s", method, error.kind, delay, error)
+                time.sleep(delay)
+                attempt += 1
+
+    def _send(self, method: str, path: str, data: Optional[Dict], is_private: bool, priority: Optional[int], deadline_at: float) -> Optional[Dict]:
+        """Makes one attempt at a request, raising KrakenError with the failure kind."""
+        if not self.circuit_breaker.allow(method):
+            raise KrakenError(ERROR_CIRCUIT_OPEN, f"circuit open after repeated failures of {method}")
+
         # Correctly format the URL
         url = f"{self.api_domain}{path}{method}"
-        headers = {"User-Agent": "Kraken REST API"}
-        
+        headers = {}
+        data = dict(data) if data else {}
+
+        # Wait for rate limit budget; orders are served before account and market data requests
+        remaining = deadline_at - time.monotonic()
+        if not self.rate_limiter.acquire(method, is_private, priority, timeout=max(0.0, min(self.rate_limit_max_wait, remaining))):
+            self.circuit_breaker.release(method)
+            raise KrakenError(ERROR_BUDGET, f"no rate limit budget for {method} before the deadline")
+
         if is_private:
-            # Handling private request
-            nonce = str(int(time.time() * 1000))
-            if not data:
-                data = {}
+            # Handling private request, with a fresh nonce on every attempt
+            nonce = self.nonce_generator()
             data['nonce'] = nonce
             headers["API-Key"] = self.api_key
             headers["API-Sign"] = self._sign_request(path + method, nonce, "&".join([f"{key}={value}" for key, value in data.items()]))
 
+        # The read timeout never outlasts the caller's deadline
+        connect_timeout, read_timeout = self.private_timeout if is_private else self.public_timeout
+        timeout = (connect_timeout, max(0.1, min(read_timeout, deadline_at - time.monotonic())))
+
         try:
             # Handle request method appropriately
-            logger.info(f"Making {method} request to {url} with data: {data}")
+            logger.info("Making %s request to %s with data: %s", method, url, data)
+            self.request_count += 1
             if is_private:
-                response = requests.post(url, headers=headers, data=data)
+                response = self.session.post(url, headers=headers, data=data, timeout=timeout)
             else:
-                response = requests.get(url, headers=headers, params=data)
-            
+                response = self.session.get(url, headers=headers, params=data, timeout=timeout)
+
             # Raise any HTTP errors
             response.raise_for_status()
 
             # Parse response
             api_reply = response.json()
-            
-            # Handle Kraken-specific errors
-            if 'error' in api_reply and len(api_reply['error']) > 0:
-                logger.error(f"API error: {api_reply['error']}")
-                return None
-            return api_reply.get('result', None)
-        
         except requests.RequestException as error:
-            # Log any request exceptions
-            logger.error(f"API call failed with error: {error}")
-            return None
+            kind = classify_exception(error)
+            self._record_outcome(method, is_private, kind)
+            raise KrakenError(kind, f"API call failed with error: {error}") from error
 
+        # Handle Kraken-specific errors
+        if 'error' in api_reply and len(api_reply['error']) > 0:
+            kind = classify_api_errors(api_reply['error'])
+            self._record_outcome(method, is_private, kind)
+            raise KrakenError(kind, f"API error: {api_reply['error']}")
+        self.circuit_breaker.record_success(method)
+        return api_reply.get('result', None)
 
-    def get_btc_order_book(self) -> Optional[Dict]:
-        """Gets the current order book for BTC/USDT."""
-        result = self._make_request(method="Depth", path="/0/public/", data={"pair": "XBTUSDT"})
+    def _record_outcome(self, method: str, is_private: bool, kind: str):
+        if kind in BREAKER_ERRORS:
+            self.circuit_breaker.record_failure(method)
+        else:
+            self.circuit_breaker.record_success(method)  # The endpoint answered
+        if kind == ERROR_RATE_LIMIT:
+            self.rate_limiter.penalize(method, is_private)
+
+    def get_order_book(self, pair: str = "XBTUSDT") -> Optional[Dict]:
+        """Gets the current order book for the given pair."""
+        result = self._make_request(method="Depth", path="/0/public/", data={"pair": pair})
         if result:
-            return result.get('XBTUSDT', None)
+            return result.get(pair, None)
         return None
 
-    def get_optimal_price(self, order_book: Dict, side: str, buffer: float = 0.05) -> Optional[float]:
+    def get_btc_order_book(self) -> Optional[Dict]:
+        """Gets the current order book for BTC/USDT."""
+        return self.get_order_book("XBTUSDT")
+
+    def get_optimal_price(self, order_book: Dict, side: str, buffer: float = 0.05, decimals: int = 1) -> Optional[float]:
         """Calculates an optimal price for buying or selling based on order book."""
         if side == "buy":
             best_ask = float(order_book['asks'][0][0])
@@ -79,35 +238,107 @@ class KrakenAPI:
         else:
             return None
 
-        # Round the optimal price to 1 decimal place as required by Kraken
-        optimal_price = round(optimal_price, 1)
+        # Round the optimal price to the pair's price precision as required by Kraken
+        optimal_price = round(optimal_price, decimals)
         return optimal_price
 
 
-    def get_historical_prices(self, pair: str = "XBTUSDT", interval: int = 60, since: Optional[int] = None) -> List[float]:
-        """Fetches historical OHLC (Open/High/Low/Close) data for the given pair."""
+    def get_ohlc(self, pair: str = "XBTUSDT", interval: int = 60, since: Optional[int] = None) -> Tuple[List[list], Optional[int]]:
+        """
+        Fetches raw OHLC rows [time, open, high, low, close, vwap, volume, count] for the
+        given pair, together with Kraken's 'last' cursor to pass as 'since' on the next poll.
+        """
         data = {"pair": pair, "interval": interval}
         if since:
             data["since"] = since
         result = self._make_request(method="OHLC", path="/0/public/", data=data)
         if result:
-            return [float(entry[4]) for entry in result.get(pair, [])]  # Return the 'close' price
-        return []
+            return result.get(pair, []), result.get('last')
+        return [], None
+
+    def get_ohlcv(self, pair: str = "XBTUSDT", interval: int = 60, since: Optional[int] = None) -> Tuple[OHLCV, Optional[int]]:
+        """Fetches OHLC data for the given pair as columnar OHLCV arrays, with the 'last' cursor."""
+        rows, last = self.get_ohlc(pair, interval, since)
+        return OHLCV.from_kraken(rows), last
+
+    def get_historical_prices(self, pair: str = "XBTUSDT", interval: int = 60, since: Optional[int] = None) -> List[float]:
+        """Fetches historical OHLC (Open/High/Low/Close) data for the given pair."""
+        rows, _ = self.get_ohlc(pair, interval, since)
+        return [float(entry[4]) for entry in rows]  # Return the 'close' price
+
+    def get_ticker(self, pairs: List[str]) -> Dict[str, Dict]:
+        """Fetches Ticker data for several pairs with a single request, keyed by pair."""
+        result = self._make_request(method="Ticker", path="/0/public/", data={"pair": ",".join(pairs)})
+        if not result:
+            return {}
+        tickers = {}
+        for pair in pairs:
+            if pair in result:
+                tickers[pair] = result[pair]
+            else:
+                logger.error(f"Ticker response is missing pair {pair}.")
+        self._store_tickers(tickers)
+        return tickers
+
+    def _store_tickers(self, tickers: Dict[str, Dict]) -> Dict[str, TickerSnapshot]:
+        fetched_at = time.monotonic()
+        snapshots = {pair: TickerSnapshot.from_kraken(pair, data, fetched_at) for pair, data in tickers.items()}
+        with self._ticker_lock:
+            self._tickers.update(snapshots)
+        return snapshots
+
+    def get_ticker_snapshot(self, pair: str = "XBTUSDT", max_age: Optional[float] = None) -> Optional[TickerSnapshot]:
+        """
+        Returns a parsed Ticker snapshot no older than 'max_age' seconds (the client's
+        ticker TTL by default). Concurrent callers asking for the same pair while it is
+        being fetched wait for that one request instead of sending their own.
+        """
+        max_age = self.ticker_ttl if max_age is None else max_age
+        with self._ticker_lock:
+            snapshot = self._tickers.get(pair)
+            if snapshot is not None and snapshot.age < max_age:
+                return snapshot
+            fetch = self._ticker_fetches.get(pair)
+            leader = fetch is None
+            if leader:
+                fetch = self._ticker_fetches[pair] = _InFlight()
+        if not leader:
+            fetch.done.wait()
+            return fetch.result
+
+        try:
+            result = self._make_request(method="Ticker", path="/0/public/", data={"pair": pair})
+            if result and pair in result:
+                fetch.result = self._store_tickers({pair: result[pair]})[pair]
+            elif result is not None:
+                logger.error(f"Ticker response is missing pair {pair}.")
+        finally:
+            with self._ticker_lock:
+                del self._ticker_fetches[pair]
+            fetch.done.set()
+        return fetch.result
+
+    def get_price(self, pair: str = "XBTUSDT") -> Optional[float]:
+        """Fetches the current price for the given pair."""
+        snapshot = self.get_ticker_snapshot(pair)
+        if snapshot:
+            return snapshot.last  # Last trade close price
+        return None
 
     def get_btc_price(self) -> Optional[float]:
         """Fetches the current BTC price."""
-        result = self._make_request(method="Ticker", path="/0/public/", data={"pair": "XBTUSDT"})
-        if result:
-            return float(result['XBTUSDT']['c'][0])  # 'c' represents the current close price
-        return None
+        return self.get_price("XBTUSDT")
 
-    def execute_trade(self, volume: float, side: str) -> None:
-        order_book = self.get_btc_order_book()
+    def execute_trade(self, volume: float, side: str, order_book: Optional[Dict] = None, pair: str = "XBTUSDT") -> Optional[str]:
+        """Places a limit order priced from 'order_book', fetching a fresh one if none is given. Returns its order id."""
+        if order_book is None:
+            order_book = self.get_order_book(pair)
         if order_book:
-            optimal_price = self.get_optimal_price(order_book, side)
+            optimal_price = self.get_optimal_price(order_book, side, buffer=PAIR_PRICE_BUFFERS.get(pair, 0.05),
+                                                   decimals=PAIR_PRICE_DECIMALS.get(pair, 1))
             if optimal_price:
                 data = {
-                    "pair": "XBTUSDT",
+                    "pair": pair,
                     "type": side,
                     "ordertype": "limit",
                     "price": optimal_price,
@@ -115,21 +346,65 @@ class KrakenAPI:
                 }
                 result = self._make_request(method="AddOrder", path="/0/private/", data=data, is_private=True)
                 if result:
-                    logger.info(f"\033[92mExecuted {side} order for {volume} BTC at {optimal_price}.\033[0m Order response: {result}")
+                    logger.info("Executed %s order for %s %s at %s. Order response: %s", side, volume, pair, optimal_price, result, extra={"color": "green"})
+                    return result.get("txid", [None])[0]
+        return None
 
     def get_market_volume(self, pair: str = "XBTUSDT") -> Optional[float]:
         """Fetches the 24-hour trading volume for a given pair."""
-        result = self._make_request(method="Ticker", path="/0/public/", data={"pair": pair})
-        if result:
-            try:
-                volume_data = result[pair].get('v', [])
-                if len(volume_data) > 1:
-                    return float(volume_data[1])  # 'v[1]' is the 24-hour volume
-                else:
-                    logger.error("Volume data is incomplete.")
-            except (KeyError, ValueError, IndexError) as e:
-                logger.error(f"Error retrieving market volume: {e}")
+        snapshot = self.get_ticker_snapshot(pair)
+        if snapshot:
+            if snapshot.volume is not None:
+                return snapshot.volume
+            logger.error("Volume data is incomplete.")
         return None
 
 
+class _InFlight:
+    """A Ticker request in progress, shared by every caller waiting on the same pair."""
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[TickerSnapshot] = None
+
+
+class AsyncKrakenAPI:
+    """
+    Coroutine variant of KrakenAPI. Each call runs the blocking client in a worker
+    thread and shares its keep-alive connection pool, so independent requests can be
+    awaited concurrently with asyncio.gather.
+    """
+    def __init__(self, api: KrakenAPI):
+        self.api = api
+
+    async def get_order_book(self, pair: str = "XBTUSDT") -> Optional[Dict]:
+        return await asyncio.to_thread(self.api.get_order_book, pair)
+
+    async def get_btc_order_book(self) -> Optional[Dict]:
+        return await asyncio.to_thread(self.api.get_btc_order_book)
+
+    async def get_ohlc(self, pair: str = "XBTUSDT", interval: int = 60, since: Optional[int] = None) -> Tuple[List[list], Optional[int]]:
+        return await asyncio.to_thread(self.api.get_ohlc, pair, interval, since)
+
+    async def get_ohlcv(self, pair: str = "XBTUSDT", interval: int = 60, since: Optional[int] = None) -> Tuple[OHLCV, Optional[int]]:
+        return await asyncio.to_thread(self.api.get_ohlcv, pair, interval, since)
+
+    async def get_historical_prices(self, pair: str = "XBTUSDT", interval: int = 60, since: Optional[int] = None) -> List[float]:
+        return await asyncio.to_thread(self.api.get_historical_prices, pair, interval, since)
+
+    async def get_ticker(self, pairs: List[str]) -> Dict[str, Dict]:
+        return await asyncio.to_thread(self.api.get_ticker, pairs)
+
+    async def get_ticker_snapshot(self, pair: str = "XBTUSDT", max_age: Optional[float] = None) -> Optional[TickerSnapshot]:
+        return await asyncio.to_thread(self.api.get_ticker_snapshot, pair, max_age)
+
+    async def get_price(self, pair: str = "XBTUSDT") -> Optional[float]:
+        return await asyncio.to_thread(self.api.get_price, pair)
+
+    async def get_btc_price(self) -> Optional[float]:
+        return await asyncio.to_thread(self.api.get_btc_price)
+
+    async def execute_trade(self, volume: float, side: str, order_book: Optional[Dict] = None, pair: str = "XBTUSDT") -> Optional[str]:
+        return await asyncio.to_thread(self.api.execute_trade, volume, side, order_book, pair)
 
+    async def get_market_volume(self, pair: str = "XBTUSDT") -> Optional[float]:
+        return await asyncio.to_thread(self.api.get_market_volume, pair)
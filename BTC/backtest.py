@@ -0,0 +1,185 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import List, Dict
+from indicators import calculate_potential_profit_loss, is_profitable_trade
+from logger_config import logger
+
+# Column of the close price in an (open, high, low, close) array
+OHLC_CLOSE = 3
+
+# Sentiment branches of TradingStrategy._determine_trade_action
+BRANCH_STRONG_POSITIVE = 0
+BRANCH_MODERATE_POSITIVE = 1
+BRANCH_STRONG_NEGATIVE = 2
+BRANCH_MODERATE_NEGATIVE = 3
+BRANCH_NEUTRAL = 4
+BRANCH_NAMES = ['strong_positive', 'moderate_positive', 'strong_negative', 'moderate_negative', 'neutral']
+
+# Trade signals produced by the decision ladder
+HOLD = 0
+BUY = 1
+PARTIAL_SELL = 2
+SELL = 3
+ACTION_NAMES = ['hold', 'buy', 'partial_sell', 'sell']
+
+
+def compute_indicators(close: np.ndarray, ma_window: int = 7, rsi_window: int = 14, short_window: int = 12, long_window: int = 26, signal_window: int = 7) -> Dict[str, np.ndarray]:
+    """
+    Computes moving average, RSI, MACD and signal for every bar at once.
+    Bar i holds the value the live functions return for close[:i + 1]; bars without
+    enough history are NaN.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+
+    moving_avg = np.full(n, np.nan)
+    if n >= ma_window:
+        moving_avg[ma_window - 1:] = sliding_window_view(close, ma_window).mean(axis=1)
+
+    rsi = np.full(n, np.nan)
+    if n >= rsi_window + 1:
+        delta = np.diff(close)
+        gains = np.where(delta > 0, delta, 0)
+        losses = np.where(delta < 0, -delta, 0)
+        avg_gain = sliding_window_view(gains, rsi_window).mean(axis=1)
+        avg_loss = sliding_window_view(losses, rsi_window).mean(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = avg_gain / avg_loss
+            rsi[rsi_window:] = np.where(avg_loss == 0, 100.0, 100 - (100 / (1 + rs)))
+
+    # ewm(adjust=False) is causal, so one pass over the whole series equals
+    # calculate_macd on every prefix.
+    series = pd.Series(close)
+    macd_series = series.ewm(span=short_window, adjust=False).mean() - series.ewm(span=long_window, adjust=False).mean()
+    macd = macd_series.to_numpy(copy=True)
+    signal = macd_series.ewm(span=signal_window, adjust=False).mean().to_numpy(copy=True)
+    macd[:long_window - 1] = np.nan
+    signal[:long_window - 1] = np.nan
+
+    return {'moving_average': moving_avg, 'rsi': rsi, 'macd': macd, 'signal': signal}
+
+
+def evaluate_decisions(indicators: Dict[str, np.ndarray], sentiment: np.ndarray):
+    """
+    Evaluates the TradingStrategy decision ladder for every bar as boolean masks.
+    Returns (branches, signals) as int8 arrays using the BRANCH_* and action constants.
+    """
+    moving_avg = indicators['moving_average']
+    rsi = indicators['rsi']
+    macd = indicators['macd']
+    signal = indicators['signal']
+    sentiment = np.asarray(sentiment, dtype=np.float64)
+
+    # execute_strategy only decides when every indicator is available and truthy
+    ready = np.ones(len(macd), dtype=bool)
+    for values in (moving_avg, rsi, macd, signal):
+        ready &= ~np.isnan(values) & (values != 0)
+
+    strong_positive = sentiment > 0.5
+    moderate_positive = ~strong_positive & (sentiment > 0.1)
+    strong_negative = ~strong_positive & ~moderate_positive & (sentiment < -0.5)
+    moderate_negative = ~strong_positive & ~moderate_positive & ~strong_negative & (sentiment < -0.1)
+    neutral = ~(strong_positive | moderate_positive | strong_negative | moderate_negative)
+
+    branches = np.select(
+        [strong_positive, moderate_positive, strong_negative, moderate_negative],
+        [BRANCH_STRONG_POSITIVE, BRANCH_MODERATE_POSITIVE, BRANCH_STRONG_NEGATIVE, BRANCH_MODERATE_NEGATIVE],
+        default=BRANCH_NEUTRAL,
+    ).astype(np.int8)
+
+    with np.errstate(invalid='ignore'):
+        buy = ready & (
+            (strong_positive & (macd > signal * 0.9) & (rsi < 65))
+            | (moderate_positive & (macd > signal) & (rsi < 60))
+            | (neutral & (macd > signal) & (rsi < 40))
+        )
+        sell = ready & (
+            (strong_negative & (macd < signal * 1.1) & (rsi > 50))
+            | (moderate_negative & (macd < signal) & (rsi > 45))
+        )
+        partial_sell = ready & neutral & ~buy & (macd < signal) & (rsi > 60)
+
+    signals = np.select([buy, sell, partial_sell], [BUY, SELL, PARTIAL_SELL], default=HOLD).astype(np.int8)
+    return branches, signals
+
+
+class BacktestResult:
+    def __init__(self, indicators: Dict[str, np.ndarray], branches: np.ndarray, signals: np.ndarray, trades: List[Dict], fees_paid: float, equity: np.ndarray):
+        self.indicators = indicators
+        self.branches = branches
+        self.signals = signals
+        self.trades = trades
+        self.fees_paid = fees_paid
+        self.equity = equity
+
+    @property
+    def total_return(self) -> float:
+        """Return over the whole run as a percentage of the starting equity."""
+        if len(self.equity) == 0 or self.equity[0] == 0:
+            return 0.0
+        return float((self.equity[-1] / self.equity[0] - 1) * 100.0)
+
+
+def run_backtest(ohlc: np.ndarray, sentiment: np.ndarray, trade_volume: float, initial_cash: float = 0.0, initial_position: float = 0.0, transaction_fee_percentage: float = 0.26) -> BacktestResult:
+    """
+    Replays the trading strategy over an (open, high, low, close) array and a per-bar
+    sentiment series. Indicators and signals are computed as whole-array operations;
+    only bars with a signal go through the stateful trade rules of _execute_buy,
+    _execute_partial_sell and _execute_sell. The live market volume check is not modelled.
+    """
+    ohlc = np.asarray(ohlc, dtype=np.float64)
+    close = ohlc[:, OHLC_CLOSE] if ohlc.ndim == 2 else ohlc
+    if len(sentiment) != len(close):
+        raise ValueError("Sentiment series must have one value per candle.")
+
+    indicators = compute_indicators(close)
+    branches, signals = evaluate_decisions(indicators, sentiment)
+
+    fee_rate = transaction_fee_percentage / 100.0
+    cash_delta = np.zeros(len(close))
+    position_delta = np.zeros(len(close))
+    position = initial_position
+    last_buy_price = None
+    last_sell_price = None
+    last_trade_type = None
+    trades = []
+    fees_paid = 0.0
+
+    for i in np.flatnonzero(signals):
+        price = float(close[i])
+        action = int(signals[i])
+        if action == BUY:
+            if last_trade_type == 'buy':
+                continue
+            if last_sell_price and not is_profitable_trade(calculate_potential_profit_loss(price, last_sell_price), transaction_fee_percentage):
+                continue
+            volume = trade_volume
+            last_buy_price = price
+            last_trade_type = 'buy'
+        else:
+            if last_trade_type == 'sell':
+                continue
+            if last_buy_price and not is_profitable_trade(calculate_potential_profit_loss(price, last_buy_price), transaction_fee_percentage):
+                continue
+            volume = min(trade_volume / 2 if action == PARTIAL_SELL else trade_volume, position)
+            last_sell_price = price
+            last_trade_type = 'sell'
+            if volume <= 0:
+                continue
+
+        fee = volume * price * fee_rate
+        fees_paid += fee
+        if action == BUY:
+            position += volume
+            position_delta[i] += volume
+            cash_delta[i] -= volume * price + fee
+        else:
+            position -= volume
+            position_delta[i] -= volume
+            cash_delta[i] += volume * price - fee
+        trades.append({'index': int(i), 'action': ACTION_NAMES[action], 'price': price, 'volume': volume, 'fee': fee})
+
+    equity = initial_cash + np.cumsum(cash_delta) + (initial_position + np.cumsum(position_delta)) * close
+    logger.info(f"Backtest over {len(close)} candles: {len(trades)} trades, fees paid {fees_paid:.2f}, final equity {equity[-1] if len(equity) else initial_cash:.2f}")
+    return BacktestResult(indicators, branches, signals, trades, fees_paid, equity)
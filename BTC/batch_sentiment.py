@@ -0,0 +1,194 @@
+import math
+import string
+import time
+import numpy as np
+from typing import Optional, List
+from nltk.sentiment.vader import VaderConstants
+from indicators import get_sentiment_analyzer
+from logger_config import logger
+
+C = VaderConstants
+SO_THIS = ("so", "this")
+PUNC_SET = set(C.PUNC_LIST)
+
+# Adjacent word pairs that start a VADER idiom or a multi-word booster ("kind of", "cut the mustard", ...),
+# plus single words with rules of their own. Texts containing any of them are scored by NLTK directly.
+FALLBACK_BIGRAMS = {
+    tuple(phrase.split()[:2])
+    for phrase in list(C.SPECIAL_CASE_IDIOMS) + [key for key in C.BOOSTER_DICT if " " in key]
+}
+FALLBACK_WORDS = {"least"}
+
+
+# Function to split text into VADER tokens, matching nltk's SentiText
+def vader_tokens(text: str) -> List[str]:
+    words_only = {w for w in C.REGEX_REMOVE_PUNCTUATION.sub("", text).split() if len(w) > 1}
+    tokens = []
+    for token in text.split():
+        if len(token) <= 1:
+            continue
+        # One leading or trailing PUNC_LIST entry is dropped when what remains is a plain word of the text
+        if token[-1] in string.punctuation:
+            word = token.rstrip(string.punctuation)
+            if word in words_only and token[len(word):] in PUNC_SET:
+                token = word
+        elif token[0] in string.punctuation:
+            word = token.lstrip(string.punctuation)
+            if word in words_only and token[:-len(word)] in PUNC_SET:
+                token = word
+        tokens.append(token)
+    return tokens
+
+
+class BatchSentimentScorer:
+    """
+    Scores many texts at once with VADER's rules. Every text is tokenized up front,
+    the whole corpus is looked up against a sorted NumPy vocabulary index in one pass,
+    and caps, booster, negation, "but" and repeated-token rules run as array operations
+    over all tokens together. The few texts that contain idioms, multi-word boosters or
+    "least" are handed to NLTK's polarity_scores, so compound scores match NLTK.
+    """
+    def __init__(self, analyzer=None):
+        self.analyzer = analyzer if analyzer is not None else get_sentiment_analyzer()
+        words = sorted(set(self.analyzer.lexicon) | set(C.BOOSTER_DICT) | set(C.NEGATE))
+        self.vocabulary = np.array(words)
+        self.valence = np.array([self.analyzer.lexicon.get(w, 0.0) for w in words])
+        self.in_lexicon = np.array([w in self.analyzer.lexicon for w in words])
+        self.booster = np.array([C.BOOSTER_DICT.get(w, 0.0) for w in words])
+        self.negate = np.array([w in C.NEGATE for w in words])
+
+    def _lookup(self, lowered: np.ndarray) -> np.ndarray:
+        """Index of each word in the vocabulary, or -1 when it is not there."""
+        index = np.searchsorted(self.vocabulary, lowered)
+        index[index == len(self.vocabulary)] = 0
+        return np.where(self.vocabulary[index] == lowered, index, -1)
+
+    def polarity(self, texts: List[str]) -> List[float]:
+        """Returns the VADER compound score of each text."""
+        n_texts = len(texts)
+        compounds = [0.0] * n_texts
+        tokens, doc_ids, fallback = [], [], []
+        for doc, text in enumerate(texts):
+            words = vader_tokens(text)
+            lowered = [w.lower() for w in words]
+            if FALLBACK_WORDS.intersection(lowered) or FALLBACK_BIGRAMS.intersection(zip(lowered, lowered[1:])):
+                fallback.append(doc)
+                continue
+            tokens.extend(words)
+            doc_ids.extend([doc] * len(words))
+        for doc in fallback:
+            compounds[doc] = self.analyzer.polarity_scores(texts[doc])["compound"]
+        if not tokens:
+            return compounds
+
+        # Per-word properties are computed once per distinct token and gathered back
+        unique, inverse = np.unique(np.array(tokens), return_inverse=True)
+        unique_lower = np.char.lower(unique)
+        vocab = self._lookup(unique_lower)
+        known = vocab >= 0
+        vocab = np.where(known, vocab, 0)
+        u_in_lex = known & self.in_lexicon[vocab]
+        u_valence = np.where(u_in_lex, self.valence[vocab], 0.0)
+        u_booster = np.where(known, self.booster[vocab], 0.0)
+        u_negated = (known & self.negate[vocab]) | (np.char.find(unique_lower, "n't") >= 0)
+        u_upper = np.char.isupper(unique)
+
+        in_lex, valence, booster = u_in_lex[inverse], u_valence[inverse], u_booster[inverse]
+        negated, upper = u_negated[inverse], u_upper[inverse]
+        never = (unique == "never")[inverse]
+        so_this = np.isin(unique, SO_THIS)[inverse]
+        but = (unique_lower == "but")[inverse]
+
+        doc_ids = np.array(doc_ids)
+        n_tokens = len(tokens)
+        k = np.arange(n_tokens)
+        counts = np.bincount(doc_ids, minlength=n_texts)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        pos = k - starts[doc_ids]
+        n_upper = np.bincount(doc_ids, weights=upper, minlength=n_texts)
+        cap_diff = ((counts - n_upper > 0) & (counts - n_upper < counts))[doc_ids]
+
+        scored = in_lex & (booster == 0)  # Booster words always contribute 0
+        v = valence.copy()
+        v = np.where(scored & upper & cap_diff, np.where(v > 0, v + C.C_INCR, v - C.C_INCR), v)
+
+        def back(values, n):
+            return values[np.maximum(k - n, 0)]
+
+        for start_i, damp in ((0, 1.0), (1, 0.95), (2, 0.9)):
+            step = scored & (pos > start_i) & ~back(in_lex, start_i + 1)
+            scalar = back(booster, start_i + 1)
+            scalar = np.where(v < 0, -scalar, scalar)
+            scalar = np.where((scalar != 0) & back(upper, start_i + 1) & cap_diff,
+                              np.where(v > 0, scalar + C.C_INCR, scalar - C.C_INCR), scalar)
+            v = np.where(step, v + scalar * damp, v)
+            if start_i == 0:
+                v = np.where(step & back(negated, 1), v * C.N_SCALAR, v)
+            elif start_i == 1:
+                emphasis = back(never, 2) & back(so_this, 1)
+                v = np.where(step & emphasis, v * 1.5, np.where(step & back(negated, 2), v * C.N_SCALAR, v))
+            else:
+                emphasis = (back(never, 3) & back(so_this, 2)) | back(so_this, 1)
+                v = np.where(step & emphasis, v * 1.25, np.where(step & back(negated, 3), v * C.N_SCALAR, v))
+        v = np.where(scored, v, 0.0)
+
+        # NLTK scores a repeated token in the context of its first occurrence in the text
+        _, first, token_key = np.unique(doc_ids * len(unique) + inverse, return_index=True, return_inverse=True)
+        sentiments = v[first[token_key]]
+
+        # Words before the first "but" count half, words after it one and a half times
+        first_but = np.full(n_texts, n_tokens)
+        np.minimum.at(first_but, doc_ids[but], pos[but])
+        first_but = first_but[doc_ids]
+        factor = np.where(pos < first_but, 0.5, np.where(pos > first_but, 1.5, 1.0))
+        sentiments = np.where(first_but < n_tokens, sentiments * factor, sentiments)
+
+        sums = np.bincount(doc_ids, weights=sentiments, minlength=n_texts)
+        for doc in np.flatnonzero(counts).tolist():
+            sum_s = float(sums[doc])
+            text = texts[doc]
+            question_marks = text.count("?")
+            amplifier = min(text.count("!"), 4) * 0.292
+            amplifier += (0.96 if question_marks > 3 else question_marks * 0.18) if question_marks > 1 else 0
+            if sum_s > 0:
+                sum_s += amplifier
+            elif sum_s < 0:
+                sum_s -= amplifier
+            compounds[doc] = round(sum_s / math.sqrt(sum_s * sum_s + 15), 4)
+        return compounds
+
+
+# Function to score a batch of news articles the way calculate_sentiment does, one compound per article
+def score_articles(articles: List[dict], scorer: Optional[BatchSentimentScorer] = None) -> List[float]:
+    scorer = scorer if scorer is not None else BatchSentimentScorer()
+    texts = [(article.get('title', '') or '') + ". " + (article.get('description', '') or '') for article in articles]
+    return scorer.polarity(texts)
+
+
+def benchmark(texts: List[str], runs: int = 3) -> dict:
+    """Best-of-'runs' throughput of the per-article NLTK loop versus the batch scorer, in texts per second."""
+    scorer = BatchSentimentScorer()
+    analyzer = scorer.analyzer
+    loop, batch = float("inf"), float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        [analyzer.polarity_scores(text)["compound"] for text in texts]
+        loop = min(loop, time.perf_counter() - start)
+        start = time.perf_counter()
+        scorer.polarity(texts)
+        batch = min(batch, time.perf_counter() - start)
+    return {"texts": len(texts), "loop_per_second": len(texts) / loop,
+            "batch_per_second": len(texts) / batch, "speedup": loop / batch}
+
+
+if __name__ == "__main__":
+    sample = [
+        "Bitcoin surges to a new all-time high as ETF inflows grow. Traders are very optimistic!",
+        "Crypto markets crash after exchange hack. Investors are not happy and fear more losses",
+        "BTC price holds steady, but analysts warn of a sharp correction ahead??",
+        "Regulators approve new rules. The outlook for miners is GOOD despite weak demand",
+    ]
+    for size in (1000, 10000, 50000):
+        result = benchmark([sample[i % len(sample)] + f" #{i}" for i in range(size)])
+        logger.info(f"{size} texts: loop {result['loop_per_second']:.0f}/s, batch {result['batch_per_second']:.0f}/s, "
+                    f"{result['speedup']:.1f}x faster")
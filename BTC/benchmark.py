@@ -0,0 +1,260 @@
+import argparse
+import json
+import logging
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+from unittest.mock import patch
+import numpy as np
+import fixtures
+from indicators import calculate_moving_average, calculate_rsi, calculate_macd, calculate_sentiment, SentimentScoreCache, get_sentiment_analyzer
+from ohlcv import OHLCV
+
+# Usage: python benchmark.py --save baseline.json     record a JSON baseline (e.g. on main)
+#        python benchmark.py --compare baseline.json  rerun on a change; exits 1 on regressions
+#        python benchmark.py rsi macd                 only benchmarks whose name contains a filter
+
+# Fails the comparison when a benchmark's median gets this much slower than its baseline
+DEFAULT_THRESHOLD = 0.25
+HISTORY_LENGTHS = (50, 300, 1000, 5000)
+ARTICLE_BATCHES = (10, 100, 1000)
+BACKTEST_CANDLES = 3 * 365 * 24
+JOURNAL_RECORDS = 30 * 24 * 60
+REPLAY_MESSAGES = 5000
+
+
+class FixtureKrakenAPI:
+    """Stands in for the trading strategy's Kraken client, replaying fixture prices with no I/O."""
+    def __init__(self, prices: np.ndarray, volume: float = 250.0):
+        self.prices = prices
+        self.volume = volume
+        self.order_book = fixtures.depth_levels(25, mid=float(prices[0]))
+        self.orders = []
+        self._next = 0
+
+    def get_price(self, pair: str = "XBTUSDT") -> float:
+        price = float(self.prices[self._next % len(self.prices)])
+        self._next += 1
+        return price
+
+    def get_market_volume(self, pair: str = "XBTUSDT") -> float:
+        return self.volume
+
+    def get_order_book(self, pair: str = "XBTUSDT") -> Dict:
+        return self.order_book
+
+    def execute_trade(self, volume: float, side: str, order_book: Optional[Dict] = None, pair: str = "XBTUSDT"):
+        self.orders.append((side, volume, pair))
+
+
+# Each case builder returns the function whose calls are timed
+def indicator_cases() -> Dict[str, Callable[[], Callable]]:
+    cases = {}
+    for n in HISTORY_LENGTHS:
+        prices = fixtures.price_walk(n).tolist()
+        cases[f"indicators.moving_average[{n}]"] = lambda prices=prices: (lambda: calculate_moving_average(prices))
+        cases[f"indicators.rsi[{n}]"] = lambda prices=prices: (lambda: calculate_rsi(prices))
+        cases[f"indicators.macd[{n}]"] = lambda prices=prices: (lambda: calculate_macd(prices))
+    return cases
+
+
+def strategy_cycle_case() -> Callable:
+    """One execute_strategy() cycle: sentiment on fixture news, price, indicators, decision and (fake) orders."""
+    from trading_strategy import TradingStrategy
+    history = fixtures.price_walk(1300)
+    api = FixtureKrakenAPI(history[300:])
+    news = fixtures.articles(10)
+    strategy = TradingStrategy(prices=history[:300].tolist())
+    patch('trading_strategy.kraken_api', api).start()
+    patch('trading_strategy.fetch_latest_news', lambda **kwargs: news).start()
+    return strategy.execute_strategy
+
+
+def cycle_timer_case() -> Callable:
+    """The overhead of timing one empty phase."""
+    from cycle_timer import CycleTimer, PHASE_NEWS
+    timer = CycleTimer("XBTUSDT")
+
+    def empty_phase():
+        with timer.phase(PHASE_NEWS):
+            pass
+    return empty_phase
+
+
+def market_data_replay_case() -> Callable:
+    """Streams recorded trade messages from a local ReplayServer through KrakenMarketDataFeed."""
+    import asyncio
+    from market_data import KrakenMarketDataFeed, ReplayServer
+    messages = [json.dumps([337, [[str(price), "0.01", "1700000000.1", "b", "l", ""]], "trade", "XBT/USDT"])
+                for price in fixtures.price_walk(REPLAY_MESSAGES)]
+
+    async def replay():
+        async with ReplayServer(messages) as server:
+            feed = KrakenMarketDataFeed(["XBTUSDT"], url=server.url, price_channel="trade")
+            await feed.run(max_messages=len(messages) + 1)
+    return lambda: asyncio.run(replay())
+
+
+def backtest_case() -> Callable:
+    """A full backtest over three years of hourly candles with random sentiment."""
+    from backtest import run_backtest
+    close = fixtures.price_walk(BACKTEST_CANDLES, volatility=0.004)
+    ohlc = np.column_stack([close, close * 1.001, close * 0.999, close])
+    sentiment = np.random.default_rng(1).uniform(-1, 1, len(ohlc))
+    return lambda: run_backtest(ohlc, sentiment, trade_volume=0.1, initial_cash=10000.0)
+
+
+def journal_read_case() -> Callable:
+    """Reads back a month of one-minute decision journal records."""
+    from decision_journal import DecisionJournal, read_journal
+    directory = tempfile.TemporaryDirectory()
+    journal = DecisionJournal(directory.name, segment_bytes=1024 * 1024)
+    for i in range(JOURNAL_RECORDS):
+        journal.append("XBTUSDT", 50000.0 + i, 50000.0, 50.0, 1.0, 1.0, 0.0, ts=float(i))
+    journal.close()
+    return lambda directory=directory: read_journal(directory.name)
+
+
+def sentiment_cases() -> Dict[str, Callable[[], Callable]]:
+    get_sentiment_analyzer()  # Load the lexicon outside the timed calls
+    cases = {}
+    for n in ARTICLE_BATCHES:
+        batch = fixtures.articles(n)
+        cases[f"sentiment.cold[{n}]"] = lambda batch=batch: (lambda: calculate_sentiment(batch, SentimentScoreCache()))
+        cases[f"sentiment.cached[{n}]"] = lambda batch=batch: _cached_sentiment(batch)
+    return cases
+
+
+def _cached_sentiment(batch: List[Dict]) -> Callable:
+    """Scores 'batch' once so the timed calls only hit the score cache."""
+    cache = SentimentScoreCache(max_entries=len(batch))
+    calculate_sentiment(batch, cache)
+    return lambda: calculate_sentiment(batch, cache)
+
+
+def parsing_cases() -> Dict[str, Callable[[], Callable]]:
+    ohlc = json.dumps(fixtures.ohlc_payload(720))
+    depth = json.dumps(fixtures.depth_payload(500))
+
+    def parse_ohlc():
+        rows = json.loads(ohlc)["result"]["XBTUSDT"]
+        return OHLCV.from_kraken(rows)
+
+    def parse_depth():
+        book = json.loads(depth)["result"]["XBTUSDT"]
+        return [float(level[0]) for level in book["asks"]], [float(level[0]) for level in book["bids"]]
+
+    return {
+        "parse.ohlc_json[720]": lambda: (lambda: json.loads(ohlc)),
+        "parse.ohlc_to_ohlcv[720]": lambda: parse_ohlc,
+        "parse.depth_json[500]": lambda: parse_depth,
+    }
+
+
+def all_cases() -> Dict[str, Callable[[], Callable]]:
+    cases = indicator_cases()
+    cases["strategy.execute_strategy"] = strategy_cycle_case
+    cases["cycle_timer.phase"] = cycle_timer_case
+    cases[f"market_data.replay[{REPLAY_MESSAGES}]"] = market_data_replay_case
+    cases[f"backtest.run_backtest[{BACKTEST_CANDLES}]"] = backtest_case
+    cases[f"journal.read[{JOURNAL_RECORDS}]"] = journal_read_case
+    cases.update(sentiment_cases())
+    cases.update(parsing_cases())
+    return cases
+
+
+def measure(func: Callable, repeat: int = 7, min_time: float = 0.05) -> Dict[str, float]:
+    """Times 'func' in 'repeat' rounds of enough calls to last 'min_time' seconds. Returns per-call microseconds."""
+    func()  # Warm-up
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+    rounds = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        rounds.append((time.perf_counter() - start) / number)
+    return {"median_us": statistics.median(rounds) * 1e6, "min_us": min(rounds) * 1e6, "calls": number * repeat}
+
+
+def run(selected: Optional[List[str]] = None, repeat: int = 7, min_time: float = 0.05) -> Dict:
+    """Runs the benchmarks whose name contains any of 'selected' (all by default)."""
+    results = {}
+    logging.disable(logging.INFO)  # Keep the strategy's log lines out of the terminal
+    try:
+        for name, build in all_cases().items():
+            if selected and not any(part in name for part in selected):
+                continue
+            try:
+                results[name] = measure(build(), repeat, min_time)
+            finally:
+                patch.stopall()
+    finally:
+        logging.disable(logging.NOTSET)
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """Lines comparing each benchmark's median to the baseline; 'regressed' when slower by more than 'threshold'."""
+    rows = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        ratio = result["median_us"] / base["median_us"] if base else None
+        rows.append({"name": name, "median_us": result["median_us"], "baseline_us": base["median_us"] if base else None,
+                     "ratio": ratio, "regressed": ratio is not None and ratio > 1 + threshold})
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks for indicators, the strategy cycle, sentiment and API parsing.")
+    parser.add_argument("filter", nargs="*", help="only run benchmarks whose name contains one of these")
+    parser.add_argument("--save", metavar="PATH", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved baseline; exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown before a regression (default 0.25)")
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    current = run(args.filter, args.repeat)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+
+    if not args.compare:
+        for name, result in current["results"].items():
+            print(f"{name:<32} {result['median_us']:12.1f} us  (min {result['min_us']:.1f})")
+        return 0
+
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    rows = compare(current, baseline, args.threshold)
+    for row in rows:
+        if row["ratio"] is None:
+            print(f"{row['name']:<32} {row['median_us']:12.1f} us  (no baseline)")
+        else:
+            flag = "  REGRESSION" if row["regressed"] else ""
+            print(f"{row['name']:<32} {row['median_us']:12.1f} us  {row['ratio']:6.2f}x baseline{flag}")
+    return 1 if any(row["regressed"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
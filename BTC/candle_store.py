@@ -0,0 +1,149 @@
+import sqlite3
+import numpy as np
+from typing import Optional, List, Tuple
+from logger_config import logger
+from ohlcv import OHLCV
+
+
+class CandleStore:
+    """
+    Append-only on-disk OHLC candle store for one pair and interval, kept in SQLite in
+    WAL mode. Startup reads the stored history locally and sync() only asks Kraken for
+    candles newer than the stored 'last' cursor. The most recent candle is still
+    forming on Kraken's side, so rows are upserted by their open time. Gaps Kraken
+    could not fill are remembered so they are not re-requested on every start.
+    """
+    def __init__(self, path: str, pair: str = "XBTUSDT", interval: int = 60):
+        self.path = path
+        self.pair = pair
+        self.interval = interval
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS candles ("
+            "pair TEXT NOT NULL, interval INTEGER NOT NULL, time INTEGER NOT NULL, "
+            "open REAL, high REAL, low REAL, close REAL, vwap REAL, volume REAL, count INTEGER, "
+            "PRIMARY KEY (pair, interval, time)) WITHOUT ROWID"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS sync_state ("
+            "pair TEXT NOT NULL, interval INTEGER NOT NULL, last INTEGER, "
+            "PRIMARY KEY (pair, interval))"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS unfillable_gaps ("
+            "pair TEXT NOT NULL, interval INTEGER NOT NULL, after INTEGER NOT NULL, before INTEGER NOT NULL, "
+            "PRIMARY KEY (pair, interval, after, before))"
+        )
+        self.connection.commit()
+
+    def __len__(self) -> int:
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM candles WHERE pair = ? AND interval = ?", (self.pair, self.interval)
+        ).fetchone()[0]
+
+    @property
+    def last_cursor(self) -> Optional[int]:
+        """Kraken's 'last' value from the previous sync, used as 'since' for the next one."""
+        row = self.connection.execute(
+            "SELECT last FROM sync_state WHERE pair = ? AND interval = ?", (self.pair, self.interval)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set_last_cursor(self, last: int):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO sync_state (pair, interval, last) VALUES (?, ?, ?)", (self.pair, self.interval, int(last))
+        )
+
+    def append(self, rows: List[list]) -> int:
+        """Stores raw Kraken OHLC rows, replacing any candle with the same open time."""
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO candles (pair, interval, time, open, high, low, close, vwap, volume, count) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(self.pair, self.interval, int(row[0]), float(row[1]), float(row[2]), float(row[3]), float(row[4]),
+              float(row[5]), float(row[6]), int(row[7])) for row in rows],
+        )
+        self.connection.commit()
+        return len(rows)
+
+    def closes(self, limit: Optional[int] = None) -> List[float]:
+        """Returns stored close prices, oldest first, optionally only the latest 'limit'."""
+        query = "SELECT close FROM candles WHERE pair = ? AND interval = ? ORDER BY time DESC"
+        params = (self.pair, self.interval)
+        if limit:
+            query += " LIMIT ?"
+            params += (limit,)
+        return [row[0] for row in self.connection.execute(query, params).fetchall()][::-1]
+
+    def load(self, limit: Optional[int] = None) -> OHLCV:
+        """Returns stored candles as columnar OHLCV arrays, oldest first, optionally only the latest 'limit'."""
+        query = ("SELECT time, open, high, low, close, vwap, volume, count FROM candles "
+                 "WHERE pair = ? AND interval = ? ORDER BY time DESC")
+        params = (self.pair, self.interval)
+        if limit:
+            query += " LIMIT ?"
+            params += (limit,)
+        rows = self.connection.execute(query, params).fetchall()
+        if not rows:
+            return OHLCV.empty()
+        values = np.array(rows[::-1], dtype=np.float64)
+        return OHLCV(values[:, 0], *values[:, 1:7].T.copy(), values[:, 7])
+
+    def find_gaps(self) -> List[Tuple[int, int]]:
+        """Returns (after, before) open times of stored candles with missing candles between them."""
+        step = self.interval * 60
+        rows = self.connection.execute(
+            "SELECT time, next_time FROM ("
+            "SELECT time, LEAD(time) OVER (ORDER BY time) AS next_time FROM candles WHERE pair = ? AND interval = ?"
+            ") WHERE next_time - time > ?",
+            (self.pair, self.interval, step),
+        ).fetchall()
+        return [(row[0], row[1]) for row in rows]
+
+    def unfillable_gaps(self) -> List[Tuple[int, int]]:
+        """Gaps that remained after Kraken answered a backfill request for them."""
+        rows = self.connection.execute(
+            "SELECT after, before FROM unfillable_gaps WHERE pair = ? AND interval = ? ORDER BY after", (self.pair, self.interval)
+        ).fetchall()
+        return [(row[0], row[1]) for row in rows]
+
+    def backfill_gaps(self, api) -> int:
+        """
+        Re-requests candles after the start of each gap. Kraken only serves the latest 720
+        candles per interval and has no candles for periods without trades, so gaps still
+        open after Kraken answered are recorded as unfillable and skipped from then on.
+        """
+        filled = 0
+        unfillable = set(self.unfillable_gaps())
+        for after, before in self.find_gaps():
+            if (after, before) in unfillable:
+                continue
+            rows, last = api.get_ohlc(self.pair, self.interval, since=after)
+            rows = [row for row in rows if after < int(row[0]) < before]
+            filled += self.append(rows)
+            if last is None:
+                continue  # The request failed; try again on the next sync
+            remaining = [gap for gap in self.find_gaps() if after <= gap[0] and gap[1] <= before]
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO unfillable_gaps (pair, interval, after, before) VALUES (?, ?, ?, ?)",
+                [(self.pair, self.interval, gap_after, gap_before) for gap_after, gap_before in remaining],
+            )
+            self.connection.commit()
+            if remaining:
+                logger.warning(f"{len(remaining)} gaps in {self.pair} {self.interval}m candles cannot be filled from Kraken.")
+        return filled
+
+    def sync(self, api) -> int:
+        """Fetches candles newer than the stored cursor, stores them and backfills gaps. Returns rows stored."""
+        rows, last = api.get_ohlc(self.pair, self.interval, since=self.last_cursor)
+        stored = self.append(rows)
+        if last is not None:
+            self._set_last_cursor(last)
+            self.connection.commit()
+        stored += self.backfill_gaps(api)
+        logger.info(f"Synced {stored} {self.pair} {self.interval}m candles. Store holds {len(self)} candles.")
+        return stored
+
+    def close(self):
+        self.connection.close()
@@ -15,6 +15,27 @@ if not API_KEY or not API_SECRET:
 # API-related constants
 API_DOMAIN = os.getenv("API_DOMAIN", "https://api.kraken.com")
 
+# Keep-alive connection pool and (connect, read) timeouts in seconds for Kraken REST calls
+KRAKEN_POOL_CONNECTIONS = int(os.getenv("KRAKEN_POOL_CONNECTIONS", "1"))
+KRAKEN_POOL_MAXSIZE = int(os.getenv("KRAKEN_POOL_MAXSIZE", "10"))
+KRAKEN_PUBLIC_TIMEOUT = (float(os.getenv("KRAKEN_PUBLIC_CONNECT_TIMEOUT", "3.05")), float(os.getenv("KRAKEN_PUBLIC_READ_TIMEOUT", "10")))
+KRAKEN_PRIVATE_TIMEOUT = (float(os.getenv("KRAKEN_PRIVATE_CONNECT_TIMEOUT", "3.05")), float(os.getenv("KRAKEN_PRIVATE_READ_TIMEOUT", "30")))
+# Kraken verification tier (starter, intermediate or pro), which sets the API counter limits,
+# the public endpoint rate the client allows itself, and how long a request may wait for budget
+KRAKEN_TIER = os.getenv("KRAKEN_TIER", "starter")
+KRAKEN_PUBLIC_RATE = float(os.getenv("KRAKEN_PUBLIC_RATE", "1"))
+KRAKEN_PUBLIC_BURST = float(os.getenv("KRAKEN_PUBLIC_BURST", "5"))
+KRAKEN_RATE_LIMIT_MAX_WAIT = float(os.getenv("KRAKEN_RATE_LIMIT_MAX_WAIT", "10"))
+# Default time budget in seconds for one Kraken call including retries, and the number of
+# consecutive failures that opens an endpoint's circuit breaker and for how many seconds
+KRAKEN_REQUEST_DEADLINE = float(os.getenv("KRAKEN_REQUEST_DEADLINE", "10"))
+KRAKEN_BREAKER_THRESHOLD = int(os.getenv("KRAKEN_BREAKER_THRESHOLD", "5"))
+KRAKEN_BREAKER_RESET = float(os.getenv("KRAKEN_BREAKER_RESET", "30"))
+# Optional file holding the last private-call nonce, shared by every process using the same API key
+KRAKEN_NONCE_FILE = os.getenv("KRAKEN_NONCE_FILE")
+# Seconds a Ticker snapshot is reused before the next price or volume read refetches it
+KRAKEN_TICKER_TTL = float(os.getenv("KRAKEN_TICKER_TTL", "2"))
+
 # Allocation strategy for portfolio management
 ALLOCATIONS = {
     'HODL': float(os.getenv("ALLOC_HODL")),
@@ -25,9 +46,74 @@ ALLOCATIONS = {
 # Initial BTC balance
 TOTAL_BTC = float(os.getenv("TOTAL_BTC"))
 
+# Pairs driven by the multi-pair runner as "PAIR[:BALANCE]" entries, e.g. "XBTUSDT,XETHZUSDT:0.5,XRPUSDT:100".
+# BALANCE is the base asset amount split by ALLOCATIONS; XBTUSDT defaults to TOTAL_BTC.
+def _parse_trading_pairs(value: str) -> dict:
+    pairs = {}
+    for entry in value.split(","):
+        pair, _, balance = entry.strip().partition(":")
+        if pair:
+            pairs[pair] = float(balance) if balance else (TOTAL_BTC if pair == "XBTUSDT" else 0.0)
+    return pairs
+
+TRADING_PAIRS = _parse_trading_pairs(os.getenv("TRADING_PAIRS", "XBTUSDT"))
+
+# News search query for each pair's sentiment
+PAIR_NEWS_QUERIES = {
+    "XBTUSDT": "bitcoin",
+    "XETHZUSDT": "ethereum",
+    "XRPUSDT": "Ripple AND XRP -recipe -water -sound",
+}
+
+# Words that tag a news article to each pair when found in its title or description
+PAIR_NEWS_KEYWORDS = {
+    "XBTUSDT": ["bitcoin", "btc"],
+    "XETHZUSDT": ["ethereum", "ether", "eth"],
+    "XRPUSDT": ["ripple", "xrp"],
+}
+
+# NewsAPI requests allowed per day, shared by every strategy using the news service
+NEWSAPI_DAILY_QUOTA = int(os.getenv("NEWSAPI_DAILY_QUOTA", "100"))
+# Optional Unix socket where the news service publishes per-pair sentiment to other processes
+NEWS_SERVICE_SOCKET = os.getenv("NEWS_SERVICE_SOCKET")
 
 # Minimum trading volume to avoid very small trades
 MIN_TRADE_VOLUME = float(os.getenv("MIN_TRADE_VOLUME"))
 
 # Cooldown period in seconds between trades
 GLOBAL_TRADE_COOLDOWN = int(os.getenv("GLOBAL_TRADE_COOLDOWN"))  # 5 minutes
+
+# Number of prices kept in the strategy's ring buffer and the array type used to store them
+PRICE_HISTORY_CAPACITY = int(os.getenv("PRICE_HISTORY_CAPACITY", "300"))
+PRICE_HISTORY_DTYPE = os.getenv("PRICE_HISTORY_DTYPE", "float64")
+
+# SQLite file holding the local OHLC candle history, and the candle interval in minutes
+CANDLE_STORE_PATH = os.getenv("CANDLE_STORE_PATH", "candles.db")
+CANDLE_INTERVAL = int(os.getenv("CANDLE_INTERVAL", "60"))
+
+# Refresh news and sentiment in a background thread every NEWS_REFRESH_INTERVAL seconds
+BACKGROUND_NEWS = os.getenv("BACKGROUND_NEWS", "true").lower() == "true"
+NEWS_REFRESH_INTERVAL = float(os.getenv("NEWS_REFRESH_INTERVAL", "1500"))
+
+# Stream prices from Kraken's WebSocket API in the background; cycles read the streamed price instead of polling Ticker
+MARKET_DATA_FEED = os.getenv("MARKET_DATA_FEED", "false").lower() == "true"
+# With the feed running, evaluate early when a price moves this fraction from its last evaluated price (0 disables)
+PRICE_MOVE_THRESHOLD = float(os.getenv("PRICE_MOVE_THRESHOLD", "0.01"))
+
+# Run each cycle's independent fetches concurrently, giving up on the cycle after CYCLE_DEADLINE seconds
+ASYNC_CYCLE = os.getenv("ASYNC_CYCLE", "false").lower() == "true"
+CYCLE_DEADLINE = float(os.getenv("CYCLE_DEADLINE", "30"))
+
+# Seconds between trading cycles, and how many recent cycles the per-phase timing percentiles cover.
+# Cycles fire on wall-clock multiples of CYCLE_INTERVAL, so they line up with candle closes when it
+# divides the candle interval, CYCLE_OFFSET seconds late to give Kraken time to close the candle.
+CYCLE_INTERVAL = float(os.getenv("CYCLE_INTERVAL", "300"))
+CYCLE_OFFSET = float(os.getenv("CYCLE_OFFSET", "2"))
+CYCLE_TIMING_WINDOW = int(os.getenv("CYCLE_TIMING_WINDOW", "500"))
+
+# Seconds before a repeated "no trade" decision line is logged again, with a count of those skipped
+LOG_REPEAT_INTERVAL = float(os.getenv("LOG_REPEAT_INTERVAL", "3600"))
+
+# Directory of the binary decision journal (one record per strategy cycle; empty disables it) and its segment size
+DECISION_JOURNAL_DIR = os.getenv("DECISION_JOURNAL_DIR", "journal")
+DECISION_JOURNAL_SEGMENT_BYTES = int(os.getenv("DECISION_JOURNAL_SEGMENT_BYTES", str(16 * 1024 * 1024)))
@@ -0,0 +1,108 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+import numpy as np
+from price_history import PriceRingBuffer
+from logger_config import logger
+
+# Phases of a trading cycle, in the order they run
+PHASE_NEWS = "news"
+PHASE_SENTIMENT = "sentiment"
+PHASE_MARKET_DATA = "market_data"  # The async cycle's concurrent fetches: news and price, then volume and order book for a buy
+PHASE_PRICE = "price"
+PHASE_INDICATORS = "indicators"
+PHASE_DECISION = "decision"
+PHASE_VOLUME = "volume"
+PHASE_ORDER_BOOK = "order_book"
+PHASE_ORDER = "order"
+PHASES = (PHASE_NEWS, PHASE_SENTIMENT, PHASE_MARKET_DATA, PHASE_PRICE, PHASE_INDICATORS,
+          PHASE_DECISION, PHASE_VOLUME, PHASE_ORDER_BOOK, PHASE_ORDER)
+
+# Percentiles reported for every phase and for whole cycles
+PERCENTILES = (50, 95, 99)
+
+
+class CycleTimer:
+    """
+    Times the phases of each trading cycle with time.perf_counter(). A phase nested in
+    another (the volume check and order inside the decision) is charged to itself only,
+    so the phases of a cycle add up to its total. The last 'window' durations of each
+    phase and of whole cycles are kept for rolling p50/p95/p99, and every cycle ends
+    with one summary line, flagged as an overrun when it took longer than 'budget'.
+    """
+    def __init__(self, name: str, budget: Optional[float] = None, window: int = 500):
+        self.name = name
+        self.budget = budget
+        self.window = window
+        self.cycles = 0
+        self.overruns = 0
+        self._durations: Dict[str, PriceRingBuffer] = {}
+        self._totals = PriceRingBuffer(window)
+        self._open: List[float] = []  # Time spent in the children of each open phase
+        self._cycle: Optional[Dict[str, float]] = None
+        self._cycle_start = 0.0
+
+    @contextmanager
+    def phase(self, name: str):
+        self._open.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            own = elapsed - self._open.pop()
+            if self._open:
+                self._open[-1] += elapsed
+            self._record(name, own)
+
+    def _record(self, name: str, duration: float):
+        durations = self._durations.get(name)
+        if durations is None:
+            durations = self._durations[name] = PriceRingBuffer(self.window)
+        durations.append(duration)
+        if self._cycle is not None:
+            self._cycle[name] = self._cycle.get(name, 0.0) + duration
+
+    @contextmanager
+    def cycle(self):
+        self.start_cycle()
+        try:
+            yield
+        finally:
+            self.end_cycle()
+
+    def start_cycle(self):
+        self._cycle = {}
+        self._cycle_start = time.perf_counter()
+
+    def end_cycle(self) -> Optional[float]:
+        """Records the cycle's total and logs its summary line. Returns the total in seconds."""
+        if self._cycle is None:
+            return None
+        total = time.perf_counter() - self._cycle_start
+        phases, self._cycle = self._cycle, None
+        self._totals.append(total)
+        self.cycles += 1
+        overrun = self.budget is not None and total > self.budget
+        if overrun:
+            self.overruns += 1
+
+        spans = " ".join(f"{name}={phases[name] * 1000:.1f}" for name in PHASES if name in phases)
+        p95 = float(np.percentile(self._totals.view(), 95)) * 1000
+        line = f"Cycle {self.name} {total * 1000:.1f}ms [{spans}] p95={p95:.1f}ms"
+        if overrun:
+            logger.warning(f"{line} OVERRUN of the {self.budget:g}s budget ({self.overruns}/{self.cycles} cycles)")
+        else:
+            logger.info(line)
+        return total
+
+    def percentiles(self) -> Dict[str, Dict[str, float]]:
+        """Rolling p50/p95/p99 in milliseconds for each phase seen so far and for whole cycles ('cycle')."""
+        windows = dict(self._durations)
+        windows["cycle"] = self._totals
+        report = {}
+        for name, durations in windows.items():
+            if len(durations):
+                values = np.percentile(durations.view(), PERCENTILES) * 1000
+                report[name] = {f"p{q}": float(value) for q, value in zip(PERCENTILES, values)}
+        return report
@@ -0,0 +1,142 @@
+import glob
+import os
+import threading
+import time
+from typing import Optional, List
+import numpy as np
+from backtest import evaluate_decisions, HOLD
+
+# Fixed-size binary record of one strategy cycle; the indicator fields use backtest.compute_indicators' names
+RECORD_DTYPE = np.dtype([
+    ("ts", "<f8"),
+    ("pair", "S12"),
+    ("price", "<f8"),
+    ("moving_average", "<f8"),
+    ("rsi", "<f8"),
+    ("macd", "<f8"),
+    ("signal", "<f8"),
+    ("sentiment", "<f8"),
+    ("branch", "i1"),      # backtest.BRANCH_* or NO_BRANCH
+    ("action", "i1"),      # backtest action constant the decision ladder chose
+    ("order_id", "S24"),   # Kraken txid when an order was placed, empty otherwise
+])
+
+INDICATOR_FIELDS = ("moving_average", "rsi", "macd", "signal")
+
+# Branch of a cycle whose indicators were not ready, so no decision was made
+NO_BRANCH = -1
+
+# Segment files start with a magic string and the record size, so a format change is never misread
+SEGMENT_MAGIC = b"BTCJRNL1"
+SEGMENT_HEADER = np.dtype([("magic", "S8"), ("record_size", "<u4"), ("reserved", "<u4")])
+SEGMENT_PREFIX = "decisions-"
+SEGMENT_SUFFIX = ".bin"
+
+
+def _segment_paths(directory: str) -> List[str]:
+    return sorted(glob.glob(os.path.join(directory, f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}")))
+
+
+def _header() -> bytes:
+    return np.array([(SEGMENT_MAGIC, RECORD_DTYPE.itemsize, 0)], dtype=SEGMENT_HEADER).tobytes()
+
+
+class DecisionJournal:
+    """
+    Append-only journal of every strategy cycle, as fixed-size binary records in
+    numbered segment files under 'directory'. A new segment is started once the current
+    one would grow past 'segment_bytes'. Each record goes to the OS in one unbuffered
+    write, so a crash loses at most the record being written, and the reader skips a
+    torn one. Files are opened on the first append.
+    """
+    def __init__(self, directory: str, segment_bytes: int = 16 * 1024 * 1024):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self._lock = threading.Lock()
+        self._file = None
+        self._segment = 0
+        self._size = 0
+
+    def _open_segment(self, number: int):
+        if self._file is not None:
+            self._file.close()
+        path = os.path.join(self.directory, f"{SEGMENT_PREFIX}{number:06d}{SEGMENT_SUFFIX}")
+        self._file = open(path, "ab", buffering=0)
+        self._segment = number
+        self._size = self._file.tell()
+        if self._size == 0:
+            self._size += self._file.write(_header())
+        elif (self._size - SEGMENT_HEADER.itemsize) % RECORD_DTYPE.itemsize:
+            # A torn record at the end would misalign everything appended after it
+            self._open_segment(number + 1)
+
+    def _ensure_segment(self):
+        if self._file is None:
+            os.makedirs(self.directory, exist_ok=True)
+            paths = _segment_paths(self.directory)
+            last = int(os.path.basename(paths[-1])[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]) if paths else 0
+            self._open_segment(last)
+        if self._size + RECORD_DTYPE.itemsize > self.segment_bytes and self._size > SEGMENT_HEADER.itemsize:
+            self._open_segment(self._segment + 1)
+
+    def append(self, pair: str, price: float, moving_average: Optional[float], rsi: Optional[float], macd: Optional[float],
+               signal: Optional[float], sentiment: float, branch: int = NO_BRANCH, action: int = HOLD,
+               order_id: Optional[str] = None, ts: Optional[float] = None):
+        """Writes one cycle's record. Indicators that are not available are stored as NaN."""
+        nan = float("nan")
+        record = np.array([(
+            time.time() if ts is None else ts, pair.encode(), price,
+            nan if moving_average is None else moving_average, nan if rsi is None else rsi,
+            nan if macd is None else macd, nan if signal is None else signal,
+            sentiment, branch, action, (order_id or "").encode(),
+        )], dtype=RECORD_DTYPE).tobytes()
+        with self._lock:
+            self._ensure_segment()
+            self._size += self._file.write(record)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def read_segment(path: str) -> np.ndarray:
+    """Loads one segment's records, ignoring a torn record at the end."""
+    with open(path, "rb") as f:
+        header = np.frombuffer(f.read(SEGMENT_HEADER.itemsize), dtype=SEGMENT_HEADER)
+        if len(header) == 0 or header["magic"][0] != SEGMENT_MAGIC or header["record_size"][0] != RECORD_DTYPE.itemsize:
+            raise ValueError(f"{path} is not a decision journal segment in this format.")
+        data = f.read()
+    count = len(data) // RECORD_DTYPE.itemsize
+    return np.frombuffer(data, dtype=RECORD_DTYPE, count=count)
+
+
+def read_journal(directory: str, since: Optional[float] = None, until: Optional[float] = None, pair: Optional[str] = None) -> np.ndarray:
+    """
+    Loads the journal as one structured array in write order, optionally only records
+    with since <= ts < until and for one pair. Columns are read as arrays, e.g.
+    records["rsi"] or records["action"].
+    """
+    segments = [read_segment(path) for path in _segment_paths(directory)]
+    records = np.concatenate(segments) if segments else np.empty(0, dtype=RECORD_DTYPE)
+    mask = np.ones(len(records), dtype=bool)
+    if since is not None:
+        mask &= records["ts"] >= since
+    if until is not None:
+        mask &= records["ts"] < until
+    if pair is not None:
+        mask &= records["pair"] == pair.encode()
+    return records if mask.all() else records[mask]
+
+
+def replay_decisions(records: np.ndarray) -> np.ndarray:
+    """
+    Re-runs backtest.evaluate_decisions on the journaled indicators and sentiment.
+    Returns a mask of the decided records whose live branch or action differs from
+    what the backtest would have chosen.
+    """
+    indicators = {name: records[name] for name in INDICATOR_FIELDS}
+    branches, actions = evaluate_decisions(indicators, records["sentiment"])
+    decided = records["branch"] != NO_BRANCH
+    return decided & ((branches != records["branch"]) | (actions != records["action"]))
@@ -0,0 +1,80 @@
+import numpy as np
+from typing import Dict, List
+
+# Deterministic Kraken-shaped market data and NewsAPI-shaped articles for benchmarks and offline tests
+
+
+def price_walk(n: int, start: float = 50000.0, volatility: float = 0.002, seed: int = 7) -> np.ndarray:
+    """A geometric random walk of 'n' prices."""
+    rng = np.random.default_rng(seed)
+    return start * np.exp(np.cumsum(rng.normal(0.0, volatility, n)))
+
+
+def ohlc_rows(n: int, interval: int = 60, start_time: int = 1700000000, seed: int = 7) -> List[list]:
+    """'n' OHLC rows in Kraken's format: [time, open, high, low, close, vwap, volume, count], prices as strings."""
+    rng = np.random.default_rng(seed)
+    close = price_walk(n, seed=seed)
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = np.abs(rng.normal(0.0, 0.001, n)) * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.uniform(1, 50, n)
+    count = rng.integers(10, 500, n)
+    return [
+        [start_time + i * interval * 60, f"{open_[i]:.1f}", f"{high[i]:.1f}", f"{low[i]:.1f}", f"{close[i]:.1f}",
+         f"{(high[i] + low[i] + close[i]) / 3:.1f}", f"{volume[i]:.8f}", int(count[i])]
+        for i in range(n)
+    ]
+
+
+def ohlc_payload(n: int = 720, pair: str = "XBTUSDT", interval: int = 60) -> Dict:
+    rows = ohlc_rows(n, interval)
+    return {"error": [], "result": {pair: rows, "last": rows[-1][0]}}
+
+
+def depth_levels(levels: int = 100, mid: float = 50000.0, decimals: int = 1, seed: int = 7) -> Dict[str, List[list]]:
+    """An order book with 'levels' asks and bids one tick apart around 'mid': [price, volume, timestamp], prices as strings."""
+    rng = np.random.default_rng(seed)
+    volumes = rng.uniform(0.001, 2.0, (2, levels))
+    tick = 10.0 ** -decimals
+    asks = [[f"{mid + (i + 1) * tick:.{decimals}f}", f"{volumes[0, i]:.8f}", 1700000000 + i] for i in range(levels)]
+    bids = [[f"{mid - (i + 1) * tick:.{decimals}f}", f"{volumes[1, i]:.8f}", 1700000000 + i] for i in range(levels)]
+    return {"asks": asks, "bids": bids}
+
+
+def depth_payload(levels: int = 500, pair: str = "XBTUSDT") -> Dict:
+    return {"error": [], "result": {pair: depth_levels(levels)}}
+
+
+def ticker_entry(price: float, volume: float = 250.0, decimals: int = 1) -> Dict:
+    """A Ticker entry with every field Kraken returns."""
+    tick = 10.0 ** -decimals
+    fmt = lambda value: f"{value:.{decimals}f}"
+    return {
+        "a": [fmt(price + tick), "1", "1.000"], "b": [fmt(price - tick), "1", "1.000"],
+        "c": [fmt(price), "0.01"], "v": [f"{volume / 2:.8f}", f"{volume:.8f}"],
+        "p": [fmt(price), fmt(price)], "t": [1000, 2000],
+        "l": [fmt(price * 0.98), fmt(price * 0.97)], "h": [fmt(price * 1.02), fmt(price * 1.03)],
+        "o": fmt(price),
+    }
+
+
+# Mixed headlines whose batches average to a neutral sentiment score
+HEADLINES = [
+    ("Bitcoin surges past resistance as ETF inflows grow", "Analysts are optimistic about further gains"),
+    ("Crypto markets slide after exchange outage", "Trading resumed within hours"),
+    ("BTC holds steady ahead of Fed decision", "Volatility remains low, but options markets price a big move"),
+    ("Miners sell reserves amid falling hashprice", "Profitability is under pressure"),
+    ("Institutional adoption of bitcoin keeps growing", "Banks announce new custody services"),
+]
+
+
+def articles(n: int, seed: int = 7) -> List[Dict]:
+    """'n' distinct NewsAPI-style articles, newest first."""
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(HEADLINES), n)
+    return [
+        {"title": f"{HEADLINES[k][0]} ({i})", "description": HEADLINES[k][1],
+         "publishedAt": f"2024-01-{28 - i % 28:02d}T{i % 24:02d}:00:00Z"}
+        for i, k in enumerate(picks)
+    ]
@@ -1,6 +1,9 @@
+import hashlib
+import time
 import numpy as np
 import pandas as pd
-from typing import Optional, List
+from collections import deque, OrderedDict
+from typing import Optional, List, Dict, Tuple
 import os
 import logging
 from dotenv import load_dotenv
@@ -20,36 +23,58 @@ logger = logging.getLogger(__name__)
 # Get News API credentials from environment variables with error handling
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
 
-# Ensure NLTK data is available
-nltk.download('vader_lexicon')
+# Download the VADER lexicon on first use if it is not already in the local NLTK data path.
+# Images pre-bake it (see Dockerfile), so air-gapped containers never reach the network.
+NLTK_DOWNLOAD_MISSING = os.getenv("NLTK_DOWNLOAD_MISSING", "true").lower() == "true"
 
-# Set up Sentiment Intensity Analyzer
-sid = SentimentIntensityAnalyzer()
+# Sentiment Intensity Analyzer, built lazily by get_sentiment_analyzer()
+_sentiment_analyzer = None
+sentiment_analyzer_load_seconds = None
 
-# Cache for latest news
-news_cache = {
-    "timestamp": None,
-    "articles": None
-}
+def get_sentiment_analyzer() -> SentimentIntensityAnalyzer:
+    """Builds the VADER analyzer from the local lexicon on first use and reuses it afterwards."""
+    global _sentiment_analyzer, sentiment_analyzer_load_seconds
+    if _sentiment_analyzer is None:
+        start = time.perf_counter()
+        try:
+            analyzer = SentimentIntensityAnalyzer()
+        except LookupError:
+            if not NLTK_DOWNLOAD_MISSING:
+                raise
+            logger.warning("VADER lexicon not found locally. Downloading it once...")
+            nltk.download('vader_lexicon', quiet=True)
+            analyzer = SentimentIntensityAnalyzer()
+        _sentiment_analyzer = analyzer
+        sentiment_analyzer_load_seconds = time.perf_counter() - start
+        logger.info(f"Loaded VADER sentiment analyzer in {sentiment_analyzer_load_seconds * 1000:.1f} ms.")
+    return _sentiment_analyzer
 
-def fetch_latest_news(top_n: int = 10) -> Optional[list]:
+# Cache for latest news, one entry per search query
+news_cache = {}
+
+# Seconds to wait for NewsAPI before giving up on a fetch
+NEWS_REQUEST_TIMEOUT = float(os.getenv("NEWS_REQUEST_TIMEOUT", "10"))
+
+def fetch_latest_news(top_n: int = 10, query: str = "bitcoin", use_cache: bool = True) -> Optional[list]:
     """
-    Fetch the latest news articles about Bitcoin in English.
+    Fetch the latest news articles matching 'query' (Bitcoin by default) in English.
     Returns a list of up to 'top_n' articles.
     """
     current_time = datetime.now()
-    if news_cache["timestamp"] and (current_time - news_cache["timestamp"]) < timedelta(minutes=25):
+    cached = news_cache.get(query)
+    if use_cache and cached and cached["page_size"] >= top_n and (current_time - cached["timestamp"]) < timedelta(minutes=25):
         logger.info("Using cached news articles.")
-        return news_cache["articles"][:top_n]  # Return only the top_n cached articles
+        return cached["articles"][:top_n]  # Return only the top_n cached articles
 
-    logger.info("Fetching latest Bitcoin news...")
-    url = f"https://newsapi.org/v2/everything?q=bitcoin&sortBy=publishedAt&language=en&apiKey={NEWS_API_KEY}"
-    response = requests.get(url)
+    logger.info(f"Fetching latest news for '{query}'...")
+    # Only ask for the articles that are used; NewsAPI returns 20 by default and at most 100 per page
+    page_size = min(top_n, 100)
+    params = {"q": query, "sortBy": "publishedAt", "language": "en", "pageSize": page_size, "apiKey": NEWS_API_KEY}
+    response = requests.get("https://newsapi.org/v2/everything", params=params, timeout=NEWS_REQUEST_TIMEOUT)
 
     if response.status_code == 200:
         articles = response.json().get('articles', [])
-        news_cache["timestamp"] = current_time
-        news_cache["articles"] = articles
+        news_cache[query] = {"timestamp": current_time, "articles": articles, "page_size": page_size}
         logger.info(f"Successfully fetched {len(articles)} news articles.")
 
         # Log the titles and URLs of the articles
@@ -65,26 +90,100 @@ def fetch_latest_news(top_n: int = 10) -> Optional[list]:
         return None
 
 
+# Bounded LRU cache of sentiment scores keyed by the content that was scored
+class SentimentScoreCache:
+    """
+    Maps a hash of an article's scored text to its VADER compound score so the same
+    headline is only scored once while it stays in the news feed. Entries expire after
+    'ttl' seconds and the least recently used ones are evicted beyond 'max_entries'.
+    'published_cursor' tracks the newest publishedAt seen, so a cycle can tell how many
+    articles are new.
+    """
+    def __init__(self, max_entries: int = 1024, ttl: float = 24 * 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._scores = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.published_cursor = None
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    @staticmethod
+    def key(content: str) -> str:
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[float]:
+        entry = self._scores.get(key)
+        if entry is None or time.monotonic() - entry[1] > self.ttl:
+            if entry is not None:
+                del self._scores[key]
+            self.misses += 1
+            return None
+        self._scores.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: str, score: float):
+        self._scores[key] = (score, time.monotonic())
+        self._scores.move_to_end(key)
+        while len(self._scores) > self.max_entries:
+            self._scores.popitem(last=False)
+
+    def advance_cursor(self, articles: list) -> int:
+        """Moves the publishedAt cursor forward and returns how many articles are newer than the previous one."""
+        previous = self.published_cursor
+        new_articles = 0
+        for article in articles:
+            published_at = article.get('publishedAt')
+            if not published_at:
+                continue
+            # NewsAPI timestamps are ISO 8601 in UTC, so they order correctly as strings
+            if previous is None or published_at > previous:
+                new_articles += 1
+            if self.published_cursor is None or published_at > self.published_cursor:
+                self.published_cursor = published_at
+        return new_articles
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._scores)}
+
+# Shared score cache used by calculate_sentiment
+sentiment_cache = SentimentScoreCache()
+
+# Function to score one article, reusing a cached score for identical text
+def score_article(article: dict, cache: Optional[SentimentScoreCache] = None) -> float:
+    cache = cache if cache is not None else sentiment_cache
+    headline = article.get('title', '') or ''
+    description = article.get('description', '') or ''
+    content = headline + ". " + description
+
+    key = cache.key(content)
+    sentiment_score = cache.get(key)
+    if sentiment_score is None:
+        sentiment_score = get_sentiment_analyzer().polarity_scores(content)['compound']
+        cache.put(key, sentiment_score)
+    return sentiment_score
+
 # Function to analyze the sentiment of news articles
-def calculate_sentiment(articles: Optional[list]) -> float:
+def calculate_sentiment(articles: Optional[list], cache: Optional[SentimentScoreCache] = None) -> float:
     """
     Analyze the sentiment of news articles.
+    Scores are reused from the cache, so only articles not seen before are run through VADER.
     """
+    cache = cache if cache is not None else sentiment_cache
     total_sentiment = 0
     if not articles:
         logger.warning("No articles found for sentiment analysis.")
         return 0  # Neutral sentiment
 
+    new_articles = cache.advance_cursor(articles)
     for article in articles:
-        headline = article.get('title', '') or ''
-        description = article.get('description', '') or ''
-        content = headline + ". " + description
-
-        sentiment_score = sid.polarity_scores(content)['compound']
-        total_sentiment += sentiment_score
+        total_sentiment += score_article(article, cache)
 
     average_sentiment = total_sentiment / len(articles)
-    logger.info(f"Calculated average sentiment score: {average_sentiment}")
+    logger.info(f"Calculated average sentiment score: {average_sentiment} ({new_articles} new articles, cache {cache.stats()})")
     return average_sentiment
 
 
@@ -119,6 +218,26 @@ def calculate_macd(prices: List[float], short_window: int = 12, long_window: int
     signal = macd.ewm(span=signal_window, adjust=False).mean()
     return float(macd.iloc[-1]), float(signal.iloc[-1])
 
+# Function to calculate the Average True Range from columnar OHLCV candles
+def calculate_atr(candles, window: int = 14) -> Optional[float]:
+    if len(candles) < window + 1:
+        return None  # Not enough data points yet
+    high = candles.high[-window:]
+    low = candles.low[-window:]
+    previous_close = candles.close[-window - 1:-1]
+    true_range = np.maximum(high - low, np.maximum(np.abs(high - previous_close), np.abs(low - previous_close)))
+    return float(np.mean(true_range))
+
+# Function to calculate the volume weighted average price over the latest candles
+def calculate_vwap(candles, window: int = 24) -> Optional[float]:
+    if len(candles) < window:
+        return None  # Not enough data points yet
+    volume = candles.volume[-window:]
+    total_volume = np.sum(volume)
+    if total_volume == 0:
+        return None
+    return float(np.sum(candles.vwap[-window:] * volume) / total_volume)
+
 # Function to calculate potential profit or loss percentage
 def calculate_potential_profit_loss(current_price: float, previous_price: float) -> float:
     return ((current_price - previous_price) / previous_price) * 100.0
@@ -126,3 +245,151 @@ def calculate_potential_profit_loss(current_price: float, previous_price: float)
 # Function to determine if the potential gain/loss is greater than the transaction fee
 def is_profitable_trade(potential_profit_loss: float, transaction_fee_percentage: float = 0.26) -> bool:
     return potential_profit_loss > transaction_fee_percentage
+
+
+# Stateful indicator engine updating MA, RSI and MACD in constant time per price
+class StreamingIndicators:
+    """
+    Incrementally maintains the moving average, RSI and MACD/signal so that each new
+    price costs the same regardless of history length. Outputs match
+    calculate_moving_average, calculate_rsi and calculate_macd for the same windows.
+    """
+    def __init__(self, ma_window: int = 7, rsi_window: int = 14, short_window: int = 12, long_window: int = 26, signal_window: int = 7):
+        self.ma_window = ma_window
+        self.rsi_window = rsi_window
+        self.long_window = long_window
+        self.count = 0
+
+        # Moving average state: last 'ma_window' prices and their running sum
+        self._ma_values = deque(maxlen=ma_window)
+        self._ma_sum = 0.0
+
+        # RSI state: last 'rsi_window' gains/losses, running sums and non-zero loss count
+        self._gains = deque(maxlen=rsi_window)
+        self._losses = deque(maxlen=rsi_window)
+        self._gain_sum = 0.0
+        self._loss_sum = 0.0
+        self._nonzero_losses = 0
+        self._last_price = None
+
+        # MACD state: EMAs seeded with the first value, as pandas ewm(adjust=False) does
+        self._short_alpha = 2.0 / (short_window + 1)
+        self._long_alpha = 2.0 / (long_window + 1)
+        self._signal_alpha = 2.0 / (signal_window + 1)
+        self._short_ema = None
+        self._long_ema = None
+        self._signal_ema = None
+
+        self.moving_average = None
+        self.rsi = None
+        self.macd = None
+        self.signal = None
+
+    def _update_moving_average(self, price: float):
+        if len(self._ma_values) == self.ma_window:
+            self._ma_sum -= self._ma_values[0]
+        self._ma_values.append(price)
+        self._ma_sum += price
+        # Re-sum once per full window to stop floating point drift from accumulating
+        if self.count % self.ma_window == 0:
+            self._ma_sum = sum(self._ma_values)
+        if len(self._ma_values) == self.ma_window:
+            self.moving_average = self._ma_sum / self.ma_window
+
+    def _update_rsi(self, price: float):
+        if self._last_price is None:
+            self._last_price = price
+            return
+        delta = price - self._last_price
+        self._last_price = price
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+
+        if len(self._gains) == self.rsi_window:
+            self._gain_sum -= self._gains[0]
+            self._loss_sum -= self._losses[0]
+            if self._losses[0] != 0:
+                self._nonzero_losses -= 1
+        self._gains.append(gain)
+        self._losses.append(loss)
+        self._gain_sum += gain
+        self._loss_sum += loss
+        if loss != 0:
+            self._nonzero_losses += 1
+        if self.count % self.rsi_window == 0:
+            self._gain_sum = sum(self._gains)
+            self._loss_sum = sum(self._losses)
+
+        if len(self._gains) == self.rsi_window:
+            if self._nonzero_losses == 0:
+                self.rsi = 100.0  # Same convention as calculate_rsi for a loss-free window
+            else:
+                rs = (self._gain_sum / self.rsi_window) / (self._loss_sum / self.rsi_window)
+                self.rsi = 100 - (100 / (1 + rs))
+
+    def _update_macd(self, price: float):
+        if self._short_ema is None:
+            self._short_ema = price
+            self._long_ema = price
+        else:
+            self._short_ema += self._short_alpha * (price - self._short_ema)
+            self._long_ema += self._long_alpha * (price - self._long_ema)
+        macd = self._short_ema - self._long_ema
+        if self._signal_ema is None:
+            self._signal_ema = macd
+        else:
+            self._signal_ema += self._signal_alpha * (macd - self._signal_ema)
+        if self.count >= self.long_window:
+            self.macd = macd
+            self.signal = self._signal_ema
+
+    def update(self, price: float) -> Tuple[Optional[float], Optional[float], Optional[float], Optional[float]]:
+        """Folds one new price into the indicators and returns (moving_avg, rsi, macd, signal)."""
+        price = float(price)
+        self.count += 1
+        self._update_moving_average(price)
+        self._update_rsi(price)
+        self._update_macd(price)
+        return self.moving_average, self.rsi, self.macd, self.signal
+
+    def extend(self, prices: List[float]) -> Tuple[Optional[float], Optional[float], Optional[float], Optional[float]]:
+        """Seeds the engine with a history of prices, oldest first."""
+        for price in prices:
+            self.update(price)
+        return self.moving_average, self.rsi, self.macd, self.signal
+
+
+def cross_check_streaming_indicators(prices: List[float], tolerance: float = 1e-9, **windows) -> Dict[str, float]:
+    """
+    Feeds 'prices' through StreamingIndicators and compares every step with the batch
+    indicator functions. Returns the largest relative deviation seen per indicator and
+    raises ValueError if any step differs by more than 'tolerance'.
+    """
+    engine = StreamingIndicators(**windows)
+    ma_window = engine.ma_window
+    rsi_window = engine.rsi_window
+    macd_windows = {key: windows[key] for key in ('short_window', 'long_window', 'signal_window') if key in windows}
+    deviations = {'moving_average': 0.0, 'rsi': 0.0, 'macd': 0.0, 'signal': 0.0}
+
+    for i, price in enumerate(prices):
+        streamed = dict(zip(deviations, engine.update(price)))
+        history = prices[:i + 1]
+        macd, signal = calculate_macd(history, **macd_windows)
+        expected = {
+            'moving_average': calculate_moving_average(history, window=ma_window),
+            'rsi': calculate_rsi(history, window=rsi_window),
+            'macd': macd,
+            'signal': signal,
+        }
+        for name, value in expected.items():
+            if (value is None) != (streamed[name] is None):
+                raise ValueError(f"Streaming {name} availability differs from batch at index {i}: {streamed[name]} vs {value}")
+            if value is None:
+                continue
+            deviation = abs(streamed[name] - value) / max(1.0, abs(value))
+            deviations[name] = max(deviations[name], deviation)
+            if deviation > tolerance:
+                raise ValueError(f"Streaming {name} deviates from batch at index {i}: {streamed[name]} vs {value}")
+
+    logger.info(f"Streaming indicators match batch functions over {len(prices)} prices. Max deviations: {deviations}")
+    return deviations
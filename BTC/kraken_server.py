@@ -0,0 +1,282 @@
+import argparse
+import base64
+import hashlib
+import hmac
+import itertools
+import json
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qsl
+import numpy as np
+import fixtures
+from rate_limiter import DecayingCounter
+from api_kraken import PAIR_PRICE_DECIMALS
+
+PUBLIC_ENDPOINTS = ("Ticker", "Depth", "OHLC", "AssetPairs")
+PRIVATE_ENDPOINTS = ("AddOrder", "Balance", "QueryOrders")
+
+
+class Fault:
+    """An injected misbehaviour for matching requests: added latency, a Kraken error or an HTTP status."""
+    def __init__(self, endpoint: str = "*", latency: float = 0.0, error: Optional[str] = None, status: Optional[int] = None,
+                 probability: float = 1.0, count: Optional[int] = None):
+        self.endpoint = endpoint
+        self.latency = latency
+        self.error = error
+        self.status = status
+        self.probability = probability
+        self.count = count  # Remaining times the fault fires, None for no limit
+
+    def matches(self, endpoint: str) -> bool:
+        return self.endpoint in ("*", endpoint) and self.count != 0 and random.random() < self.probability
+
+
+class LocalKrakenServer:
+    """
+    A local stand-in for Kraken's REST API. Serves the public Ticker, Depth, OHLC and
+    AssetPairs endpoints from generated market data, and the private AddOrder, Balance
+    and QueryOrders endpoints after checking API-Key, API-Sign and nonce order the way
+    Kraken does. Latency, errors and HTTP failures are injected with add_fault(), and the
+    private API counter is emulated so clients can be driven into real rate limit errors.
+    """
+    def __init__(self, api_key: str = "test_key", api_secret: str = "dGVzdF9zZWNyZXQ=", host: str = "127.0.0.1", port: int = 0,
+                 pairs: Optional[Dict[str, float]] = None, balances: Optional[Dict[str, str]] = None,
+                 counter_limit: float = 15, counter_decay: float = 0.33, ohlc_candles: int = 720):
+        self.api_key = api_key
+        self.api_secret = base64.b64decode(api_secret)
+        self.pairs = pairs if pairs is not None else {"XBTUSDT": 50000.0, "XETHZUSDT": 3000.0, "XRPUSDT": 0.5}
+        self.balances = balances if balances is not None else {"USDT": "10000.0", "XXBT": "0.5"}
+        self.counter = DecayingCounter(counter_limit, counter_decay)
+        self.ohlc = {pair: fixtures.ohlc_rows(ohlc_candles, seed=seed) for seed, pair in enumerate(self.pairs)}
+        self.orders: Dict[str, Dict] = {}
+        self.faults: List[Fault] = []
+        self.requests: Dict[str, int] = {}
+        self._last_nonce = 0
+        self._txids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "LocalKrakenServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="local-kraken", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "LocalKrakenServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def add_fault(self, *args, **kwargs) -> Fault:
+        fault = Fault(*args, **kwargs)
+        with self._lock:
+            self.faults.append(fault)
+        return fault
+
+    def clear_faults(self):
+        with self._lock:
+            self.faults.clear()
+
+    def _take_faults(self, endpoint: str) -> List[Fault]:
+        with self._lock:
+            fired = [fault for fault in self.faults if fault.matches(endpoint)]
+            for fault in fired:
+                if fault.count is not None:
+                    fault.count -= 1
+        return fired
+
+    def handle(self, verb: str, path: str, params: Dict[str, str], body: str, headers) -> Tuple[int, Dict]:
+        """Returns (HTTP status, JSON reply) for one request."""
+        endpoint = path.rsplit("/", 1)[-1]
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+
+        # Every matching fault adds its latency; the first one with a status or error decides the reply
+        faults = self._take_faults(endpoint)
+        latency = sum(fault.latency for fault in faults)
+        if latency:
+            time.sleep(latency)
+        for fault in faults:
+            if fault.status:
+                return fault.status, {"error": [f"HTTP {fault.status}"]}
+            if fault.error:
+                return 200, {"error": [fault.error]}
+
+        if path.startswith("/0/public/") and endpoint in PUBLIC_ENDPOINTS:
+            return 200, getattr(self, f"_public_{endpoint.lower()}")(params)
+        if path.startswith("/0/private/") and endpoint in PRIVATE_ENDPOINTS:
+            if verb != "POST":
+                return 200, {"error": ["EGeneral:Invalid arguments"]}
+            error = self._authenticate(path, params, body, headers)
+            if error:
+                return 200, {"error": [error]}
+            return 200, getattr(self, f"_private_{endpoint.lower()}")(params)
+        return 404, {"error": ["EGeneral:Unknown method"]}
+
+    def _authenticate(self, path: str, params: Dict[str, str], body: str, headers) -> Optional[str]:
+        if headers.get("API-Key") != self.api_key:
+            return "EAPI:Invalid key"
+        nonce = params.get("nonce", "")
+        digest = hashlib.sha256(nonce.encode() + body.encode()).digest()
+        expected = base64.b64encode(hmac.new(self.api_secret, path.encode() + digest, hashlib.sha512).digest()).decode()
+        if not hmac.compare_digest(expected, headers.get("API-Sign", "")):
+            return "EAPI:Invalid signature"
+        with self._lock:
+            if not nonce.isdigit() or int(nonce) <= self._last_nonce:
+                return "EAPI:Invalid nonce"
+            self._last_nonce = int(nonce)
+            if self.counter.wait_time(1) > 0:
+                return "EAPI:Rate limit exceeded"
+            self.counter.add(1)
+        return None
+
+    def _price(self, pair: str) -> float:
+        # Prices drift a little on every read so strategies see a moving market
+        with self._lock:
+            self.pairs[pair] *= float(np.exp(random.gauss(0.0, 0.0005)))
+            return self.pairs[pair]
+
+    def _unknown_pairs(self, pairs: List[str]) -> Optional[Dict]:
+        if not pairs or any(pair not in self.pairs for pair in pairs):
+            return {"error": ["EQuery:Unknown asset pair"]}
+        return None
+
+    def _public_ticker(self, params: Dict[str, str]) -> Dict:
+        pairs = params.get("pair", "").split(",")
+        return self._unknown_pairs(pairs) or {"error": [], "result": {
+            pair: fixtures.ticker_entry(self._price(pair), decimals=PAIR_PRICE_DECIMALS.get(pair, 1)) for pair in pairs
+        }}
+
+    def _public_depth(self, params: Dict[str, str]) -> Dict:
+        pair = params.get("pair", "")
+        error = self._unknown_pairs([pair])
+        if error:
+            return error
+        book = fixtures.depth_levels(int(params.get("count", 100)), mid=self._price(pair), decimals=PAIR_PRICE_DECIMALS.get(pair, 1))
+        return {"error": [], "result": {pair: book}}
+
+    def _public_ohlc(self, params: Dict[str, str]) -> Dict:
+        pair = params.get("pair", "")
+        error = self._unknown_pairs([pair])
+        if error:
+            return error
+        since = int(params.get("since", 0))
+        rows = [row for row in self.ohlc[pair] if row[0] > since]
+        last = self.ohlc[pair][-1][0]
+        return {"error": [], "result": {pair: rows, "last": last}}
+
+    def _public_assetpairs(self, params: Dict[str, str]) -> Dict:
+        pairs = params["pair"].split(",") if params.get("pair") else list(self.pairs)
+        return self._unknown_pairs(pairs) or {"error": [], "result": {
+            pair: {"altname": pair, "pair_decimals": PAIR_PRICE_DECIMALS.get(pair, 1), "lot_decimals": 8, "ordermin": "0.0001"}
+            for pair in pairs
+        }}
+
+    def _private_balance(self, params: Dict[str, str]) -> Dict:
+        return {"error": [], "result": dict(self.balances)}
+
+    def _private_addorder(self, params: Dict[str, str]) -> Dict:
+        missing = [field for field in ("pair", "type", "ordertype", "volume") if field not in params]
+        if missing or params["pair"] not in self.pairs:
+            return {"error": ["EGeneral:Invalid arguments"]}
+        txid = f"O{next(self._txids):05d}-LOCAL-KRAKEN"
+        description = f"{params['type']} {params['volume']} {params['pair']} @ {params['ordertype']} {params.get('price', '')}".strip()
+        with self._lock:
+            self.orders[txid] = {"status": "open", "opentm": time.time(), "vol": params["volume"], "vol_exec": "0",
+                                 "descr": {"pair": params["pair"], "type": params["type"], "ordertype": params["ordertype"],
+                                           "price": params.get("price", "0"), "order": description}}
+        return {"error": [], "result": {"descr": {"order": description}, "txid": [txid]}}
+
+    def _private_queryorders(self, params: Dict[str, str]) -> Dict:
+        txids = params.get("txid", "").split(",")
+        with self._lock:
+            if not all(txid in self.orders for txid in txids):
+                return {"error": ["EOrder:Unknown order"]}
+            return {"error": [], "result": {txid: self.orders[txid] for txid in txids}}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _respond(self, verb: str, body: str = ""):
+                url = urlparse(self.path)
+                params = dict(parse_qsl(url.query if verb == "GET" else body))
+                status, reply = server.handle(verb, url.path, params, body, self.headers)
+                payload = json.dumps(reply).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._respond("GET")
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                self._respond("POST", self.rfile.read(length).decode())
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def load_test(call: Callable[[], object], requests: int = 500, concurrency: int = 8) -> Dict[str, float]:
+    """Runs 'call' 'requests' times on 'concurrency' threads. Returns throughput and latency percentiles in ms."""
+    def timed(_):
+        start = time.perf_counter()
+        ok = call() is not None
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(timed, range(requests)))
+    elapsed = time.perf_counter() - start
+    latencies = sorted(latency * 1000 for latency, _ in results)
+    percentile = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+    return {"requests": requests, "failures": sum(not ok for _, ok in results), "per_second": requests / elapsed,
+            "p50_ms": statistics.median(latencies), "p95_ms": percentile(0.95), "p99_ms": percentile(0.99), "max_ms": latencies[-1]}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for Kraken's REST API. Point API_DOMAIN at the printed URL.")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with EGeneral:Temporary lockout")
+    parser.add_argument("--http-error-rate", type=float, default=0.0, help="share of requests answered with HTTP 503")
+    args = parser.parse_args()
+
+    local_kraken = LocalKrakenServer(port=args.port)
+    if args.http_error_rate:
+        local_kraken.add_fault(status=503, probability=args.http_error_rate)
+    if args.error_rate:
+        local_kraken.add_fault(error="EGeneral:Temporary lockout", probability=args.error_rate)
+    if args.latency:
+        local_kraken.add_fault(latency=args.latency)
+    print(f"Local Kraken API listening on {local_kraken.url}")
+    try:
+        local_kraken.serve_forever()
+    except KeyboardInterrupt:
+        local_kraken.stop()
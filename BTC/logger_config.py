@@ -1,26 +1,130 @@
+import atexit
+import json
 import logging
-from logging.handlers import RotatingFileHandler
 import os
+import queue
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from termcolor import colored
 
 # Set log level from environment variable, defaulting to INFO
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 
+# Records waiting for the writer thread; when it falls this far behind new records are dropped, not waited on
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+
+
+def _message(record: logging.LogRecord) -> str:
+    message = record.getMessage()
+    suppressed = getattr(record, "suppressed", 0)
+    if suppressed:
+        message += f" ({suppressed} similar lines suppressed)"
+    return message
+
+
+class ConsoleFormatter(logging.Formatter):
+    """Plain text lines, with the message coloured when logged with extra={"color": ...}."""
+    def format(self, record: logging.LogRecord) -> str:
+        message = _message(record)
+        color = getattr(record, "color", None)
+        # Format a copy, the same record also goes to the file sink
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg, record.args = colored(message, color) if color else message, None
+        return super().format(record)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record with ANSI escape codes removed from the message."""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "line": record.lineno,
+            "message": ANSI_ESCAPE.sub("", record.getMessage()),
+        }
+        if getattr(record, "suppressed", 0):
+            entry["suppressed"] = record.suppressed
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class ThrottleFilter(logging.Filter):
+    """
+    Rate-limits repetitive lines. A record logged with extra={"throttle": seconds} is
+    dropped when the same message template was written less than that many seconds ago;
+    the next one written reports how many were dropped in between.
+    """
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._written = {}  # (logger, level, template) -> (monotonic time written, records dropped since)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        interval = getattr(record, "throttle", None)
+        if not interval:
+            return True
+        key = (record.name, record.levelno, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            written, dropped = self._written.get(key, (None, 0))
+            if written is not None and now - written < interval:
+                self._written[key] = (written, dropped + 1)
+                return False
+            self._written[key] = (now, 0)
+        record.suppressed = dropped
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to the writer thread unformatted, so logging on the trading path costs
+    one enqueue: %-style arguments are only rendered, and only by the writer, once the
+    level check has passed. Arguments must not be mutated after they are logged.
+    """
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
 # Configure logger
 logger = logging.getLogger("trading_bot")
 logger.setLevel(getattr(logging, LOG_LEVEL, logging.INFO))
 
 # Console handler for logger
 console_handler = logging.StreamHandler()
-console_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+console_formatter = ConsoleFormatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 console_handler.setFormatter(console_formatter)
-logger.addHandler(console_handler)
 
-# Rotating file handler for persistent logging
+# Rotating JSON-lines file for persistent, machine-readable logging
 log_file = os.getenv("LOG_FILE", "trading_bot.log")
 log_handler = RotatingFileHandler(log_file, maxBytes=5*1024*1024, backupCount=2)
-file_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-log_handler.setFormatter(file_formatter)
-logger.addHandler(log_handler)
+log_handler.setFormatter(JsonLinesFormatter())
+
+# Both sinks are written by a background thread; the logger itself only filters and enqueues
+log_queue = queue.Queue(LOG_QUEUE_SIZE)
+queue_handler = NonBlockingQueueHandler(log_queue)
+logger.addHandler(queue_handler)
+logger.addFilter(ThrottleFilter())
+log_listener = QueueListener(log_queue, console_handler, log_handler, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)  # Flush queued records on exit
 
 # Disable propagation to prevent duplicate logs
-logger.propagate = False
\ No newline at end of file
+logger.propagate = False
@@ -1,47 +1,45 @@
-import time
-from trading_strategy import trading_strategy
+import asyncio
+from trading_strategy import trading_strategy, trading_strategy_async, trading_strategy_instance
+from news_service import RemoteNewsView
 from portfolio import rebalance_portfolio
-from api_kraken import KrakenAPI
+from scheduler import CycleScheduler
+from runner import load_candle_history, start_news_service, open_journal, start_market_data_feed, run_scheduled
 from logger_config import logger
-from config import API_KEY, API_SECRET, API_DOMAIN
-
-# Initialize Kraken API client
-kraken_api = KrakenAPI(API_KEY, API_SECRET, API_DOMAIN)
-
-# Load initial historical data
-logger.info("Fetching historical BTC data...")
-
-try:
-    historical_prices = kraken_api.get_historical_prices()
-    prices = historical_prices if historical_prices else []
-    if not prices:
-        logger.warning("No historical prices fetched, starting with an empty dataset.")
-    else:
-        logger.info(f"Loaded {len(prices)} historical prices.")
-except Exception as e:
-    logger.error(f"Failed to fetch historical BTC data: {e}")
-    prices = []
+from config import ASYNC_CYCLE, BACKGROUND_NEWS, NEWS_SERVICE_SOCKET, PRICE_HISTORY_CAPACITY, CYCLE_INTERVAL, CYCLE_OFFSET, DECISION_JOURNAL_DIR, MARKET_DATA_FEED
 
 def portfolio_manager():
-    while True:
-        try:
-            # Rebalance the portfolio
-            logger.info("Rebalancing portfolio...")
-            rebalance_portfolio()
-
-            # Execute the trading strategy
-            logger.info("Executing trading strategy...")
+    # The single-pair bot shares its wiring with runner.py, applied to the one global strategy
+    strategies = {trading_strategy_instance.pair: trading_strategy_instance}
+    # Columnar OHLCV candles; the strategy seeds its price history from their closes
+    prices = load_candle_history(trading_strategy_instance.pair, PRICE_HISTORY_CAPACITY)
+    if NEWS_SERVICE_SOCKET and trading_strategy_instance.news_refresher is None:
+        # Read sentiment from a shared news service (see runner.py) instead of polling NewsAPI here
+        trading_strategy_instance.news_refresher = RemoteNewsView(NEWS_SERVICE_SOCKET, trading_strategy_instance.pair)
+    elif BACKGROUND_NEWS and trading_strategy_instance.news_refresher is None:
+        start_news_service(strategies)
+    if DECISION_JOURNAL_DIR and trading_strategy_instance.journal is None:
+        open_journal(strategies)
+    # Cycles run on wall-clock boundaries aligned with candle closes, or earlier on a scheduler trigger.
+    # Created after the history is loaded, so a slow start-up is not counted as an overrun.
+    scheduler = CycleScheduler(CYCLE_INTERVAL, CYCLE_OFFSET)
+    if MARKET_DATA_FEED and trading_strategy_instance.market_data_feed is None:
+        start_market_data_feed(strategies, scheduler)
+    # One event loop for the whole run; asyncio.run per cycle would also join the previous cycle's worker threads
+    loop = asyncio.new_event_loop() if ASYNC_CYCLE else None
+
+    def cycle():
+        # Rebalance the portfolio
+        logger.info("Rebalancing portfolio...")
+        rebalance_portfolio()
+
+        # Execute the trading strategy
+        logger.info("Executing trading strategy...")
+        if ASYNC_CYCLE:
+            loop.run_until_complete(trading_strategy_async(prices))
+        else:
             trading_strategy(prices)
 
-            # Wait for the next cycle
-            logger.info("Waiting for the next trading cycle...")
-            time.sleep(300)  # Run every 5 minutes
-        except Exception as e:
-            logger.error(f"Error in portfolio manager: {e}")
-            time.sleep(60)  # Wait before retrying in case of an error
+    run_scheduled(scheduler, cycle, "portfolio manager")
 
 if __name__ == "__main__":
     portfolio_manager()
-
-  
-
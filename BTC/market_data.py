@@ -0,0 +1,268 @@
+import asyncio
+import json
+import random
+import threading
+import time
+from typing import Optional, List, Dict, Callable, Iterable
+from websockets.asyncio.client import connect
+from websockets.asyncio.server import serve
+from websockets.exceptions import WebSocketException
+from logger_config import logger
+from order_book import LocalOrderBook
+
+KRAKEN_WS_URL = "wss://ws.kraken.com"
+
+# Kraken's WebSocket API names pairs differently from the REST API
+WS_PAIR_NAMES = {
+    "XBTUSDT": "XBT/USDT",
+    "XETHZUSDT": "ETH/USDT",
+    "XRPUSDT": "XRP/USDT",
+}
+
+
+class KrakenMarketDataFeed:
+    """
+    Streams Kraken's public ticker, trade, OHLC and book channels for a set of pairs.
+    Prices are pushed into attached price histories (anything with an append method,
+    e.g. PriceRingBuffer) as they arrive. The connection is re-established with
+    jittered exponential backoff whenever it drops or goes silent for longer than
+    'stale_after' seconds; Kraken sends a heartbeat every second on idle connections.
+    At most 'max_queue' received messages are buffered; past that reading pauses until
+    the dispatcher catches up, so a slow consumer cannot grow memory without bound.
+    When "book" is subscribed, a LocalOrderBook per pair is kept in order_books and
+    resubscribed for a fresh snapshot whenever its checksum does not match, and marked
+    out of sync while the connection is down.
+    """
+    def __init__(self, pairs: List[str], url: str = KRAKEN_WS_URL, channels: Iterable[str] = ("ticker", "trade", "ohlc"),
+                 ohlc_interval: int = 1, book_depth: int = 10, price_channel: str = "ticker", stale_after: float = 10.0,
+                 backoff_min: float = 1.0, backoff_max: float = 60.0, record_path: Optional[str] = None, max_queue: int = 1024):
+        self.pairs = pairs
+        self.url = url
+        self.channels = list(channels)
+        self.ohlc_interval = ohlc_interval
+        self.book_depth = book_depth
+        self.price_channel = price_channel
+        self.stale_after = stale_after
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+        self.record_path = record_path
+        self.max_queue = max_queue
+        self._ws_to_pair = {WS_PAIR_NAMES.get(pair, pair): pair for pair in pairs}
+
+        self.price_histories: Dict[str, List] = {pair: [] for pair in pairs}
+        self.listeners: Dict[str, List[Callable]] = {"ticker": [], "trade": [], "ohlc": [], "book": []}
+        self.last_price: Dict[str, float] = {}
+        self.tickers: Dict[str, Dict] = {}
+        self.candles: Dict[str, List] = {}
+        self.order_books: Dict[str, LocalOrderBook] = {pair: LocalOrderBook(pair, book_depth) for pair in pairs}
+        self._resubscribe_books: List[str] = []
+
+        self.messages_received = 0
+        self.reconnects = 0
+        self.message_errors = 0
+        self.last_message_time = None
+        self._running = False
+        self._thread = None
+
+    def attach_price_history(self, pair: str, history):
+        """Appends every price from 'price_channel' for 'pair' to 'history'."""
+        self.price_histories[pair].append(history)
+
+    def add_listener(self, channel: str, callback: Callable):
+        """Registers callback(pair, payload) for 'ticker', 'trade', 'ohlc' or 'book' updates."""
+        self.listeners[channel].append(callback)
+
+    def is_stale(self) -> bool:
+        """True if nothing, not even a heartbeat, has arrived within 'stale_after' seconds."""
+        return self.last_message_time is None or time.monotonic() - self.last_message_time > self.stale_after
+
+    def price(self, pair: str) -> Optional[float]:
+        """The latest streamed price of 'pair', or None while the feed is stale."""
+        return None if self.is_stale() else self.last_price.get(pair)
+
+    def _subscription(self, channel: str) -> Dict:
+        subscription = {"name": channel}
+        if channel == "ohlc":
+            subscription["interval"] = self.ohlc_interval
+        elif channel == "book":
+            subscription["depth"] = self.book_depth
+        return subscription
+
+    def subscription_messages(self) -> List[Dict]:
+        ws_pairs = [WS_PAIR_NAMES.get(pair, pair) for pair in self.pairs]
+        return [{"event": "subscribe", "pair": ws_pairs, "subscription": self._subscription(channel)} for channel in self.channels]
+
+    def book_resubscription_messages(self) -> List[Dict]:
+        """Unsubscribe/subscribe pairs whose local book failed its checksum, to receive a new snapshot."""
+        if not self._resubscribe_books:
+            return []
+        ws_pairs = [WS_PAIR_NAMES.get(pair, pair) for pair in self._resubscribe_books]
+        self._resubscribe_books = []
+        subscription = self._subscription("book")
+        return [
+            {"event": "unsubscribe", "pair": ws_pairs, "subscription": subscription},
+            {"event": "subscribe", "pair": ws_pairs, "subscription": subscription},
+        ]
+
+    def _push_price(self, channel: str, pair: str, price: float):
+        self.last_price[pair] = price
+        if channel == self.price_channel:
+            for history in self.price_histories[pair]:
+                history.append(price)
+
+    def handle_message(self, raw: str):
+        """Parses one raw message and dispatches it. Returns the channel name, or None for events."""
+        self.messages_received += 1
+        self.last_message_time = time.monotonic()
+        message = json.loads(raw)
+
+        if isinstance(message, dict):
+            event = message.get("event")
+            if event == "subscriptionStatus" and message.get("status") == "error":
+                logger.error(f"Subscription failed: {message.get('errorMessage')}")
+            elif event == "systemStatus" and message.get("status") != "online":
+                logger.warning(f"Kraken WebSocket system status: {message.get('status')}")
+            return None
+
+        # Data messages are [channelID, payload, channelName, pair]; book updates may carry two payloads
+        payload, channel_name, ws_pair = message[1], message[-2], message[-1]
+        pair = self._ws_to_pair.get(ws_pair, ws_pair)
+        channel = channel_name.split("-")[0]
+
+        if channel == "book":
+            book = self.order_books[pair]
+            if "as" in payload or "bs" in payload:
+                book.apply_snapshot(payload)
+            elif book.is_synced and not book.apply_update(message[1:-2]):
+                # Updates are dropped until the resubscription delivers a new snapshot
+                self._resubscribe_books.append(pair)
+        elif channel == "ticker":
+            self.tickers[pair] = payload
+            self._push_price(channel, pair, float(payload["c"][0]))
+        elif channel == "trade":
+            for trade in payload:
+                self._push_price(channel, pair, float(trade[0]))
+        elif channel == "ohlc":
+            self.candles[pair] = payload
+            self._push_price(channel, pair, float(payload[5]))
+        else:
+            return None
+
+        for callback in self.listeners.get(channel, []):
+            callback(pair, payload)
+        return channel
+
+    def _unsync_books(self):
+        # Updates missed while disconnected would leave the books wrong; wait for the snapshot after resubscribing
+        for book in self.order_books.values():
+            book.is_synced = False
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.backoff_max, self.backoff_min * 2 ** attempt)
+        return random.uniform(delay / 2, delay)
+
+    async def run(self, max_messages: Optional[int] = None):
+        """Connects, subscribes and dispatches messages until stop() is called or 'max_messages' are handled."""
+        self._running = True
+        attempt = 0
+        record = open(self.record_path, "a") if self.record_path else None
+        try:
+            while self._running:
+                try:
+                    async with connect(self.url, max_queue=self.max_queue) as websocket:
+                        for subscription in self.subscription_messages():
+                            await websocket.send(json.dumps(subscription))
+                        logger.info(f"Subscribed to {', '.join(self.channels)} for {', '.join(self.pairs)} at {self.url}.")
+                        while self._running:
+                            raw = await asyncio.wait_for(websocket.recv(), timeout=self.stale_after)
+                            if record:
+                                record.write(raw + "\n")
+                            try:
+                                self.handle_message(raw)
+                            except Exception as error:
+                                # A bad payload or a failing listener must not end the feed
+                                self.message_errors += 1
+                                logger.error("Failed to handle market data message: %r", error, extra={"throttle": 60})
+                            for resubscription in self.book_resubscription_messages():
+                                await websocket.send(json.dumps(resubscription))
+                            attempt = 0
+                            if max_messages and self.messages_received >= max_messages:
+                                self._running = False
+                except asyncio.TimeoutError:
+                    logger.warning(f"No market data for {self.stale_after}s. Reconnecting...")
+                    self._unsync_books()
+                except (WebSocketException, OSError) as error:
+                    logger.warning(f"Market data connection lost: {error}")
+                    self._unsync_books()
+
+                if self._running:
+                    self.reconnects += 1
+                    delay = self._backoff(attempt)
+                    attempt += 1
+                    logger.info(f"Reconnecting to market data in {delay:.1f}s (attempt {attempt}).")
+                    await asyncio.sleep(delay)
+        finally:
+            if record:
+                record.close()
+
+    def start(self) -> "KrakenMarketDataFeed":
+        """Runs the feed on its own event loop in a background thread, for callers without one."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=asyncio.run, args=(self.run(),), name="market-data-feed", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+
+
+def load_recording(path: str) -> List[str]:
+    """Loads raw messages recorded by KrakenMarketDataFeed(record_path=...), one per line."""
+    with open(path) as recording:
+        return [line.rstrip("\n") for line in recording if line.strip()]
+
+
+class ReplayServer:
+    """
+    Local stand-in for Kraken's WebSocket API. After a client subscribes, it answers
+    with subscriptionStatus and replays the recorded messages, optionally throttled to
+    'rate' messages per second and repeated 'repeat' times, then closes the connection.
+    """
+    def __init__(self, messages: List[str], host: str = "127.0.0.1", port: int = 0, rate: Optional[float] = None, repeat: int = 1):
+        self.messages = messages
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self.repeat = repeat
+        self.connections = 0
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    async def _handler(self, websocket):
+        self.connections += 1
+        request = json.loads(await websocket.recv())
+        await websocket.send(json.dumps({"event": "subscriptionStatus", "status": "subscribed", "pair": request.get("pair", [None])[0], "subscription": request.get("subscription")}))
+        interval = 1.0 / self.rate if self.rate else 0
+        for _ in range(self.repeat):
+            for raw in self.messages:
+                await websocket.send(raw)
+                if interval:
+                    await asyncio.sleep(interval)
+
+    async def start(self):
+        self._server = await serve(self._handler, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
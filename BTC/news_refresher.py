@@ -0,0 +1,81 @@
+import random
+import threading
+import time
+from typing import Optional, List, Tuple
+from indicators import fetch_latest_news, calculate_sentiment
+from logger_config import logger
+
+
+class NewsRefresher:
+    """
+    Keeps news articles and their sentiment score warm in a background thread with
+    stale-while-revalidate semantics: snapshot() always returns the last good result
+    immediately, and refreshes happen on their own schedule. Failed refreshes keep the
+    previous result and retry after a jittered, exponentially growing delay.
+    """
+    def __init__(self, query: str = "bitcoin", interval: float = 25 * 60, top_n: int = 10,
+                 backoff_min: float = 30.0, backoff_max: float = 15 * 60):
+        self.query = query
+        self.interval = interval
+        self.top_n = top_n
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+        self._lock = threading.Lock()
+        self._articles: Optional[List[dict]] = None
+        self._sentiment_score = 0.0
+        self.last_refresh = None  # time.monotonic() of the last successful refresh
+        self.failures = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def snapshot(self) -> Tuple[Optional[List[dict]], float]:
+        """Returns the last good (articles, sentiment score) without any I/O."""
+        with self._lock:
+            return self._articles, self._sentiment_score
+
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the last successful refresh, or None if there has not been one."""
+        return None if self.last_refresh is None else time.monotonic() - self.last_refresh
+
+    def refresh(self) -> bool:
+        """Fetches and scores fresh articles. Returns False, keeping the previous result, on failure."""
+        try:
+            articles = fetch_latest_news(top_n=self.top_n, query=self.query, use_cache=False)
+        except Exception as e:
+            logger.error(f"News refresh for '{self.query}' failed: {e}")
+            articles = None
+        if articles is None:
+            self.failures += 1
+            return False
+        sentiment_score = calculate_sentiment(articles)
+        with self._lock:
+            self._articles = articles
+            self._sentiment_score = sentiment_score
+        self.last_refresh = time.monotonic()
+        self.failures = 0
+        return True
+
+    def next_delay(self) -> float:
+        if self.failures == 0:
+            return self.interval
+        delay = min(self.backoff_max, self.backoff_min * 2 ** (self.failures - 1))
+        return random.uniform(delay / 2, delay)
+
+    def _run(self):
+        while not self._stop.wait(self.next_delay()):
+            self.refresh()
+
+    def start(self) -> "NewsRefresher":
+        """Warms the cache once, before trading starts, then keeps refreshing in the background."""
+        if self._thread is None or not self._thread.is_alive():
+            self.refresh()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"news-refresher-{self.query}", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,200 @@
+import json
+import os
+import re
+import socket
+import socketserver
+import threading
+import time
+from datetime import datetime, timezone, timedelta
+from typing import Optional, List, Dict, Tuple
+from indicators import fetch_latest_news, score_article
+from news_refresher import NewsRefresher
+from logger_config import logger
+from config import PAIR_NEWS_QUERIES, PAIR_NEWS_KEYWORDS, NEWSAPI_DAILY_QUOTA
+
+
+# Function to combine per-asset queries into a single NewsAPI boolean query
+def combined_query(queries: Dict[str, str]) -> str:
+    return " OR ".join(f"({query})" for query in dict.fromkeys(queries.values()))
+
+
+# Function to list the assets whose keywords appear in an article's title or description
+def tag_article(article: dict, keywords: Dict[str, List[str]]) -> List[str]:
+    text = f"{article.get('title', '') or ''} {article.get('description', '') or ''}".lower()
+    return [
+        asset for asset, words in keywords.items()
+        if any(re.search(rf"\b{re.escape(word.lower())}\b", text) for word in words)
+    ]
+
+
+class NewsService(NewsRefresher):
+    """
+    One news source for every strategy. Polls NewsAPI with a single combined query on a
+    schedule that stays within the daily quota, tags each article to the assets it
+    mentions, scores it once, and serves per-asset (articles, sentiment) snapshots.
+    """
+    def __init__(self, queries: Optional[Dict[str, str]] = None, keywords: Optional[Dict[str, List[str]]] = None,
+                 interval: float = 25 * 60, daily_quota: int = NEWSAPI_DAILY_QUOTA, top_n: int = 100,
+                 articles_per_asset: int = 10, backoff_min: float = 30.0, backoff_max: float = 15 * 60):
+        queries = queries if queries is not None else PAIR_NEWS_QUERIES
+        super().__init__(combined_query(queries), interval, top_n, backoff_min, backoff_max)
+        self.keywords = keywords if keywords is not None else {asset: PAIR_NEWS_KEYWORDS.get(asset, [asset]) for asset in queries}
+        self.daily_quota = daily_quota
+        self.articles_per_asset = articles_per_asset
+        self.requests_today = 0
+        self._quota_day = None
+        self._by_asset: Dict[str, Tuple[List[dict], float]] = {}
+        self._server = None
+
+    @staticmethod
+    def _today():
+        return datetime.now(timezone.utc).date()
+
+    @property
+    def quota_remaining(self) -> int:
+        if self._quota_day != self._today():
+            return self.daily_quota
+        return max(0, self.daily_quota - self.requests_today)
+
+    def _quota_interval(self) -> float:
+        """Shortest refresh interval that spreads the daily quota evenly over the day."""
+        return 24 * 3600 / max(1, self.daily_quota)
+
+    def refresh(self) -> bool:
+        """Fetches the combined query once and rebuilds every asset's snapshot. Skipped when the quota is spent."""
+        today = self._today()
+        if self._quota_day != today:
+            self._quota_day = today
+            self.requests_today = 0
+        if self.requests_today >= self.daily_quota:
+            logger.warning(f"NewsAPI daily quota of {self.daily_quota} requests used up, keeping cached sentiment.")
+            return False
+        self.requests_today += 1
+
+        try:
+            articles = fetch_latest_news(top_n=self.top_n, query=self.query, use_cache=False)
+        except Exception as e:
+            logger.error(f"News refresh for '{self.query}' failed: {e}")
+            articles = None
+        if articles is None:
+            self.failures += 1
+            return False
+
+        tagged: Dict[str, List[Tuple[dict, float]]] = {asset: [] for asset in self.keywords}
+        for article in articles:
+            assets = tag_article(article, self.keywords)
+            if not assets:
+                continue
+            score = score_article(article)  # Scored once, however many assets it mentions
+            for asset in assets:
+                if len(tagged[asset]) < self.articles_per_asset:
+                    tagged[asset].append((article, score))
+
+        by_asset = {}
+        for asset, scored in tagged.items():
+            asset_articles = [article for article, _ in scored]
+            sentiment_score = sum(score for _, score in scored) / len(scored) if scored else 0.0
+            by_asset[asset] = (asset_articles, sentiment_score)
+        with self._lock:
+            self._by_asset = by_asset
+            self._articles = articles
+        self.last_refresh = time.monotonic()
+        self.failures = 0
+        logger.info(f"Refreshed news for {len(by_asset)} assets from {len(articles)} articles "
+                    f"({self.quota_remaining} NewsAPI requests left today).")
+        return True
+
+    def snapshot(self, asset: Optional[str] = None) -> Tuple[Optional[List[dict]], float]:
+        """Returns the last good (articles, sentiment score) for 'asset' without any I/O."""
+        with self._lock:
+            if asset is None:
+                return self._articles, 0.0
+            return self._by_asset.get(asset, (None, 0.0))
+
+    def sentiment(self, asset: str) -> float:
+        return self.snapshot(asset)[1]
+
+    def view(self, asset: str) -> "AssetNewsView":
+        """A per-asset handle that can stand in for a NewsRefresher on a TradingStrategy."""
+        return AssetNewsView(self, asset)
+
+    def next_delay(self) -> float:
+        if self._quota_day == self._today() and self.requests_today >= self.daily_quota:
+            # Sleep until the quota resets at midnight UTC
+            now = datetime.now(timezone.utc)
+            midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), timezone.utc)
+            return (midnight - now).total_seconds() + 1
+        delay = super().next_delay()
+        return max(delay, self._quota_interval()) if self.failures == 0 else delay
+
+    def serve(self, path: str) -> "NewsService":
+        """Publishes per-asset sentiment on a Unix socket for strategies running in other processes."""
+        if os.path.exists(path):
+            os.unlink(path)
+        service = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        asset = json.loads(line)["asset"]
+                        articles, sentiment_score = service.snapshot(asset)
+                        reply = {"asset": asset, "sentiment": sentiment_score,
+                                 "articles": len(articles or []), "age": service.age}
+                    except (ValueError, KeyError, TypeError) as e:
+                        reply = {"error": str(e)}
+                    self.wfile.write(json.dumps(reply).encode() + b"\n")
+
+        self._server = socketserver.ThreadingUnixStreamServer(path, Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="news-service-ipc", daemon=True).start()
+        logger.info(f"News service listening on {path}")
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        super().stop(timeout)
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class AssetNewsView:
+    """Read-only view of one asset's news in a shared NewsService."""
+    def __init__(self, service: NewsService, asset: str):
+        self.service = service
+        self.asset = asset
+
+    def snapshot(self) -> Tuple[Optional[List[dict]], float]:
+        return self.service.snapshot(self.asset)
+
+    @property
+    def age(self) -> Optional[float]:
+        return self.service.age
+
+
+class RemoteNewsView:
+    """
+    Reads one asset's sentiment from a NewsService in another process over its Unix socket.
+    Keeps the last score it received if the service cannot be reached.
+    """
+    def __init__(self, path: str, asset: str, timeout: float = 1.0):
+        self.path = path
+        self.asset = asset
+        self.timeout = timeout
+        self._sentiment_score = 0.0
+
+    def fetch(self) -> dict:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.path)
+            sock.sendall(json.dumps({"asset": self.asset}).encode() + b"\n")
+            with sock.makefile("rb") as reply:
+                return json.loads(reply.readline())
+
+    def snapshot(self) -> Tuple[Optional[List[dict]], float]:
+        try:
+            self._sentiment_score = float(self.fetch()["sentiment"])
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"News service at {self.path} unavailable, keeping last {self.asset} sentiment: {e}")
+        return None, self._sentiment_score
@@ -0,0 +1,53 @@
+import numpy as np
+from typing import Optional, List
+
+# Float columns of a Kraken OHLC row, in payload order after the timestamp
+PRICE_FIELDS = ('open', 'high', 'low', 'close', 'vwap', 'volume')
+
+
+class OHLCV:
+    """
+    Columnar OHLCV candles: one NumPy array per field, int64 open times and trade
+    counts, float64 prices and volumes. Built straight from Kraken's OHLC payload so
+    vectorized indicators can use every field without refetching.
+    """
+    def __init__(self, time: np.ndarray, open: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                 vwap: np.ndarray, volume: np.ndarray, count: np.ndarray):
+        self.time = np.asarray(time, dtype=np.int64)
+        self.open = np.asarray(open, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.vwap = np.asarray(vwap, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.float64)
+        self.count = np.asarray(count, dtype=np.int64)
+
+    @classmethod
+    def empty(cls) -> "OHLCV":
+        return cls(*([np.empty(0)] * 8))
+
+    @classmethod
+    def from_kraken(cls, rows: List[list]) -> "OHLCV":
+        """Parses rows [time, open, high, low, close, vwap, volume, count] into columns."""
+        n = len(rows)
+        if n == 0:
+            return cls.empty()
+        time = np.fromiter((row[0] for row in rows), dtype=np.int64, count=n)
+        count = np.fromiter((row[7] for row in rows), dtype=np.int64, count=n)
+        # Kraken sends prices as strings; NumPy parses them during the conversion
+        values = np.array([row[1:7] for row in rows], dtype=np.float64)
+        return cls(time, *values.T.copy(), count)
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def tail(self, n: Optional[int]) -> "OHLCV":
+        """Returns the latest 'n' candles as views of the same arrays."""
+        if n is None or n >= len(self):
+            return self
+        return OHLCV(*(getattr(self, field)[-n:] for field in ('time',) + PRICE_FIELDS + ('count',)))
+
+    def to_rows(self) -> List[list]:
+        """Converts back to Kraken's row layout."""
+        return [[int(t), o, h, l, c, v, vol, int(n)] for t, o, h, l, c, v, vol, n in zip(
+            self.time, self.open, self.high, self.low, self.close, self.vwap, self.volume, self.count)]
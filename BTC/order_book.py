@@ -0,0 +1,146 @@
+import threading
+import zlib
+from bisect import bisect_left
+from typing import Optional, List, Dict, Tuple
+from logger_config import logger
+
+
+class BookSide:
+    """
+    One side of an L2 book. Price keys are kept sorted best-first with binary search,
+    next to a dict of the raw price/volume strings needed for Kraken's checksum.
+    Finding a level is O(log n), but inserting or deleting one shifts the list and is
+    O(n). The side is truncated to the subscribed depth (10-1000 levels) after every
+    update, so n stays small and a contiguous list beats a balanced tree there.
+    """
+    def __init__(self, descending: bool):
+        self._sign = -1.0 if descending else 1.0
+        self._keys: List[float] = []
+        self._levels: Dict[float, Tuple[str, str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def update(self, price: str, volume: str):
+        """Sets the volume at a price level; a zero volume deletes the level."""
+        key = self._sign * float(price)
+        i = bisect_left(self._keys, key)
+        exists = i < len(self._keys) and self._keys[i] == key
+        if float(volume) == 0:
+            if exists:
+                del self._keys[i]
+                del self._levels[key]
+        else:
+            if not exists:
+                self._keys.insert(i, key)
+            self._levels[key] = (price, volume)
+
+    def truncate(self, depth: int):
+        """Drops levels beyond the subscribed depth, as Kraken expects clients to do."""
+        for key in self._keys[depth:]:
+            del self._levels[key]
+        del self._keys[depth:]
+
+    def clear(self):
+        self._keys.clear()
+        self._levels.clear()
+
+    def level(self, n: int = 0) -> Optional[Tuple[float, float]]:
+        """Returns (price, volume) of the n-th best level, or None if the side is shallower."""
+        if n >= len(self._keys):
+            return None
+        price, volume = self._levels[self._keys[n]]
+        return float(price), float(volume)
+
+    def top(self, n: int) -> List[Tuple[str, str]]:
+        """Raw (price, volume) strings of the best 'n' levels."""
+        return [self._levels[key] for key in self._keys[:n]]
+
+
+def _checksum_field(value: str) -> str:
+    return value.replace('.', '').lstrip('0')
+
+
+class LocalOrderBook:
+    """
+    L2 order book for one pair maintained from Kraken's WebSocket book channel.
+    Every update carrying a checksum is verified against the CRC32 of the top ten
+    levels per side; on mismatch the book is marked out of sync so the feed can
+    resubscribe for a fresh snapshot. The feed thread writes the book while strategy
+    threads read it, so every access holds the book's lock.
+    """
+    def __init__(self, pair: str, depth: int = 10):
+        self.pair = pair
+        self.depth = depth
+        self.asks = BookSide(descending=False)
+        self.bids = BookSide(descending=True)
+        self.is_synced = False
+        self.checksum_failures = 0
+        self._lock = threading.RLock()
+
+    def apply_snapshot(self, payload: Dict):
+        with self._lock:
+            self.asks.clear()
+            self.bids.clear()
+            for price, volume, *_ in payload.get("as", []):
+                self.asks.update(price, volume)
+            for price, volume, *_ in payload.get("bs", []):
+                self.bids.update(price, volume)
+            self.is_synced = True
+
+    def apply_update(self, payloads: List[Dict]) -> bool:
+        """Applies one update message (one or two payload dicts). Returns False on checksum mismatch."""
+        with self._lock:
+            if not self.is_synced:
+                return False
+            checksum = None
+            for payload in payloads:
+                for price, volume, *_ in payload.get("a", []):
+                    self.asks.update(price, volume)
+                for price, volume, *_ in payload.get("b", []):
+                    self.bids.update(price, volume)
+                checksum = payload.get("c", checksum)
+            self.asks.truncate(self.depth)
+            self.bids.truncate(self.depth)
+            if checksum is not None and self.checksum() != int(checksum):
+                self.checksum_failures += 1
+                self.is_synced = False
+                logger.warning(f"Order book checksum mismatch for {self.pair}. Rebuilding from a new snapshot.")
+                return False
+            return True
+
+    def checksum(self) -> int:
+        """CRC32 over the top ten asks (ascending) then bids (descending), per Kraken's spec."""
+        with self._lock:
+            parts = [_checksum_field(price) + _checksum_field(volume) for price, volume in self.asks.top(10)]
+            parts += [_checksum_field(price) + _checksum_field(volume) for price, volume in self.bids.top(10)]
+        return zlib.crc32("".join(parts).encode())
+
+    @property
+    def best_ask(self) -> Optional[float]:
+        with self._lock:
+            level = self.asks.level(0)
+        return level[0] if level else None
+
+    @property
+    def best_bid(self) -> Optional[float]:
+        with self._lock:
+            level = self.bids.level(0)
+        return level[0] if level else None
+
+    def depth_at(self, side: str, n: int) -> float:
+        """Cumulative volume of the best 'n' levels on 'asks' or 'bids'."""
+        book_side = self.asks if side == "asks" else self.bids
+        with self._lock:
+            levels = book_side.top(n)
+        return sum(float(volume) for _, volume in levels)
+
+    def to_dict(self, levels: int = 1) -> Optional[Dict]:
+        """Returns the book in the REST Depth layout used by KrakenAPI.get_optimal_price, or None if out of sync."""
+        with self._lock:
+            if not self.is_synced or not len(self.asks) or not len(self.bids):
+                return None
+            return {
+                "asks": [[price, volume] for price, volume in self.asks.top(levels)],
+                "bids": [[price, volume] for price, volume in self.bids.top(levels)],
+            }
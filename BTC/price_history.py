@@ -0,0 +1,54 @@
+import numpy as np
+from typing import Optional, List, Union
+
+
+class PriceRingBuffer:
+    """
+    Fixed-capacity price history backed by a preallocated NumPy array.
+    Every price is written twice (at slot and slot + capacity) so that the latest N
+    prices are always a contiguous, zero-copy view. Appends never allocate.
+    """
+    def __init__(self, capacity: int = 300, dtype: Union[str, np.dtype] = np.float64):
+        if capacity <= 0:
+            raise ValueError("Price history capacity must be positive.")
+        self.capacity = capacity
+        self.dtype = np.dtype(dtype)
+        self._data = np.zeros(2 * capacity, dtype=self.dtype)
+        self._head = 0  # Slot that receives the next price
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, price: float):
+        """Adds a price, overwriting the oldest one once the buffer is full."""
+        self._data[self._head] = price
+        self._data[self._head + self.capacity] = price
+        self._head = (self._head + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def extend(self, prices: List[float]):
+        """Adds a sequence of prices, oldest first."""
+        prices = np.asarray(prices, dtype=self.dtype)[-self.capacity:]
+        for price in prices:
+            self.append(price)
+
+    def view(self, n: Optional[int] = None) -> np.ndarray:
+        """Returns a read-only contiguous view of the last 'n' prices (all if None), oldest first."""
+        n = self._size if n is None else min(n, self._size)
+        end = self._head + self.capacity
+        window = self._data[end - n:end]
+        window.flags.writeable = False
+        return window
+
+    @property
+    def latest(self) -> Optional[float]:
+        """Most recent price, or None if the buffer is empty."""
+        if self._size == 0:
+            return None
+        return float(self._data[self._head + self.capacity - 1])
+
+    def clear(self):
+        self._head = 0
+        self._size = 0
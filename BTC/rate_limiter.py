@@ -0,0 +1,135 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Optional, Dict, Tuple
+
+# Request priorities, lowest value served first
+PRIORITY_ORDER = 0
+PRIORITY_ACCOUNT = 1
+PRIORITY_MARKET_DATA = 2
+
+# Kraken's per-key counter limits and decay per second for each verification tier
+# (REST "private" counter, then the matching engine "trading" counter, which Kraken keeps
+# per pair but is modelled here as one counter shared by every pair)
+KRAKEN_TIERS = {
+    "starter": {"private": (15, 0.33), "trading": (60, 1.0)},
+    "intermediate": {"private": (20, 0.5), "trading": (125, 2.34)},
+    "pro": {"private": (20, 1.0), "trading": (180, 3.75)},
+}
+
+# Order endpoints are limited by the trading counter, not the REST counter
+TRADING_METHODS = {"AddOrder", "AddOrderBatch", "EditOrder", "CancelOrder", "CancelOrderBatch", "CancelAll", "CancelAllOrdersAfter"}
+# Private endpoints that cost more than one point on the REST counter
+PRIVATE_METHOD_COSTS = {"Ledgers": 2, "QueryLedgers": 2, "TradesHistory": 2}
+
+
+class DecayingCounter:
+    """A counter that grows by each call's cost and decays linearly over time, like Kraken's API counter."""
+    def __init__(self, limit: float, decay: float):
+        self.limit = limit
+        self.decay = decay
+        self._value = 0.0
+        self._updated = time.monotonic()
+
+    @property
+    def value(self) -> float:
+        now = time.monotonic()
+        self._value = max(0.0, self._value - (now - self._updated) * self.decay)
+        self._updated = now
+        return self._value
+
+    def wait_time(self, cost: float) -> float:
+        """Seconds until 'cost' more fits under the limit, 0 if it fits now."""
+        excess = self.value + cost - self.limit
+        return 0.0 if excess <= 0 else excess / self.decay
+
+    def add(self, cost: float):
+        self._value = self.value + cost
+
+    def saturate(self):
+        """Assumes the server-side counter is full, e.g. after a rate limit error."""
+        self._value = float(self.limit)
+        self._updated = time.monotonic()
+
+
+class KrakenRateLimiter:
+    """
+    Client-side model of Kraken's rate limits. Every request is classified into a
+    counter ('private' REST counter, 'trading' order counter or 'public' per-IP rate)
+    with a cost and a priority, then waits in that counter's priority queue until it
+    fits. Orders and cancels therefore never queue behind market data or account polling,
+    and within a counter the most urgent request gets the next free point.
+    """
+    def __init__(self, tier: str = "starter", public_rate: float = 1.0, public_burst: float = 5.0):
+        limits = KRAKEN_TIERS[tier]
+        self.counters: Dict[str, DecayingCounter] = {
+            "private": DecayingCounter(*limits["private"]),
+            "trading": DecayingCounter(*limits["trading"]),
+            "public": DecayingCounter(public_burst, public_rate),
+        }
+        self._waiting = {bucket: [] for bucket in self.counters}
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self.granted = 0
+        self.timeouts = 0
+        self.rate_limit_errors = 0
+
+    @staticmethod
+    def classify(method: str, is_private: bool) -> Tuple[str, float, int]:
+        """Returns the (counter, cost, default priority) of an endpoint."""
+        if not is_private:
+            return "public", 1, PRIORITY_MARKET_DATA
+        if method in TRADING_METHODS:
+            return "trading", 1, PRIORITY_ORDER
+        return "private", PRIVATE_METHOD_COSTS.get(method, 1), PRIORITY_ACCOUNT
+
+    def acquire(self, method: str, is_private: bool, priority: Optional[int] = None, timeout: Optional[float] = None) -> bool:
+        """Blocks until the request fits its counter. Returns False if 'timeout' seconds pass first."""
+        bucket, cost, default_priority = self.classify(method, is_private)
+        counter = self.counters[bucket]
+        queue = self._waiting[bucket]
+        entry = (default_priority if priority is None else priority, next(self._sequence))
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            heapq.heappush(queue, entry)
+            try:
+                while True:
+                    wait = None
+                    if queue[0] == entry:
+                        wait = counter.wait_time(cost)
+                        if wait == 0:
+                            counter.add(cost)
+                            self.granted += 1
+                            return True
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.timeouts += 1
+                            return False
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._condition.wait(wait)
+            finally:
+                queue.remove(entry)
+                heapq.heapify(queue)
+                self._condition.notify_all()
+
+    def penalize(self, method: str, is_private: bool):
+        """Records a rate limit error from Kraken so the counter waits out a full decay."""
+        bucket, _, _ = self.classify(method, is_private)
+        with self._condition:
+            self.counters[bucket].saturate()
+            self.rate_limit_errors += 1
+
+    def remaining(self, bucket: str = "private") -> float:
+        """Points left on a counter before requests start waiting."""
+        with self._condition:
+            counter = self.counters[bucket]
+            return max(0.0, counter.limit - counter.value)
+
+    def stats(self) -> Dict[str, object]:
+        with self._condition:
+            budget = {bucket: round(max(0.0, counter.limit - counter.value), 2) for bucket, counter in self.counters.items()}
+            queued = {bucket: len(queue) for bucket, queue in self._waiting.items()}
+        return {"remaining": budget, "queued": queued, "granted": self.granted,
+                "timeouts": self.timeouts, "rate_limit_errors": self.rate_limit_errors}
@@ -0,0 +1,121 @@
+import random
+import threading
+import time
+from typing import Dict, List
+import requests
+
+# Failure kinds of a Kraken request
+ERROR_NETWORK = "network"            # Connection failure or timeout
+ERROR_SERVER = "server"              # HTTP 5xx
+ERROR_TEMPORARY = "temporary"        # EGeneral:Temporary lockout, EService:Unavailable/Busy
+ERROR_INVALID_NONCE = "invalid_nonce"
+ERROR_RATE_LIMIT = "rate_limit"      # EAPI/EOrder:Rate limit exceeded, HTTP 429
+ERROR_API = "api"                    # Any other Kraken or HTTP error; retrying will not help
+ERROR_BUDGET = "budget"              # No local rate limit budget before the deadline
+ERROR_CIRCUIT_OPEN = "circuit_open"
+
+# Kinds worth another attempt for calls that are safe to repeat
+TRANSIENT_ERRORS = {ERROR_NETWORK, ERROR_SERVER, ERROR_TEMPORARY, ERROR_INVALID_NONCE, ERROR_RATE_LIMIT}
+# Kinds where Kraken rejected the request before acting on it, so even an order can be resent
+REJECTED_ERRORS = {ERROR_INVALID_NONCE, ERROR_RATE_LIMIT}
+# Kinds that count against an endpoint's circuit breaker
+BREAKER_ERRORS = {ERROR_NETWORK, ERROR_SERVER, ERROR_TEMPORARY}
+
+# Private endpoints that change state each time they run; every other call may be retried
+NON_IDEMPOTENT_METHODS = {"AddOrder", "AddOrderBatch", "EditOrder", "Withdraw", "WalletTransfer", "Stake", "Unstake"}
+
+
+class KrakenError(Exception):
+    """A failed Kraken request, tagged with one of the ERROR_* kinds."""
+    def __init__(self, kind: str, message: str):
+        super().__init__(message)
+        self.kind = kind
+
+
+# Function to map Kraken's error strings to a failure kind
+def classify_api_errors(errors: List[str]) -> str:
+    for error in errors:
+        if "Rate limit exceeded" in error or "Too many requests" in error:
+            return ERROR_RATE_LIMIT
+        if error.startswith("EAPI:Invalid nonce"):
+            return ERROR_INVALID_NONCE
+        if error.startswith(("EGeneral:Temporary", "EService:Unavailable", "EService:Busy")):
+            return ERROR_TEMPORARY
+    return ERROR_API
+
+
+# Function to map a requests exception to a failure kind
+def classify_exception(error: requests.RequestException) -> str:
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return ERROR_NETWORK
+    response = getattr(error, "response", None)
+    if response is not None:
+        if response.status_code == 429:
+            return ERROR_RATE_LIMIT
+        if response.status_code >= 500:
+            return ERROR_SERVER
+    return ERROR_API
+
+
+def is_retryable(kind: str, method: str, is_private: bool) -> bool:
+    if kind in REJECTED_ERRORS:
+        return True
+    idempotent = not is_private or method not in NON_IDEMPOTENT_METHODS
+    return idempotent and kind in TRANSIENT_ERRORS
+
+
+# Function to compute a full-jitter exponential backoff delay
+def backoff_delay(attempt: int, base: float = 0.25, cap: float = 4.0) -> float:
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker. After 'failure_threshold' consecutive transient
+    failures the circuit opens and calls fail immediately for 'reset_timeout' seconds;
+    then one trial call is let through, closing the circuit again if it succeeds.
+    """
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures: Dict[str, int] = {}
+        self._opened_at: Dict[str, float] = {}
+        self._trial: Dict[str, bool] = {}
+
+    def state(self, endpoint: str) -> str:
+        with self._lock:
+            opened_at = self._opened_at.get(endpoint)
+            if opened_at is None:
+                return "closed"
+            return "half_open" if time.monotonic() - opened_at >= self.reset_timeout else "open"
+
+    def allow(self, endpoint: str) -> bool:
+        with self._lock:
+            opened_at = self._opened_at.get(endpoint)
+            if opened_at is None:
+                return True
+            if time.monotonic() - opened_at < self.reset_timeout or self._trial.get(endpoint):
+                return False
+            self._trial[endpoint] = True  # Half-open: let exactly one call probe the endpoint
+            return True
+
+    def release(self, endpoint: str):
+        """Gives back a half-open trial whose call never reached the endpoint, so the next call can probe it."""
+        with self._lock:
+            if self._trial.get(endpoint):
+                self._trial.pop(endpoint)
+
+    def record_success(self, endpoint: str):
+        with self._lock:
+            self._failures.pop(endpoint, None)
+            self._opened_at.pop(endpoint, None)
+            self._trial.pop(endpoint, None)
+
+    def record_failure(self, endpoint: str):
+        with self._lock:
+            failures = self._failures.get(endpoint, 0) + 1
+            self._failures[endpoint] = failures
+            if failures >= self.failure_threshold or self._trial.get(endpoint):
+                self._opened_at[endpoint] = time.monotonic()
+                self._trial[endpoint] = False
@@ -0,0 +1,195 @@
+import asyncio
+from typing import Callable, Dict, Optional
+from api_kraken import request_deadline
+from portfolio import Portfolio
+from candle_store import CandleStore
+from news_service import NewsService
+from decision_journal import DecisionJournal
+from market_data import KrakenMarketDataFeed
+from ohlcv import OHLCV
+from scheduler import CycleScheduler, PriceMoveTrigger, CandleTrigger, TICK
+from trading_strategy import TradingStrategy, kraken_api
+from logger_config import logger
+from config import ALLOCATIONS, TRADING_PAIRS, ASYNC_CYCLE, CYCLE_DEADLINE, PAIR_NEWS_QUERIES, CANDLE_STORE_PATH, CANDLE_INTERVAL, BACKGROUND_NEWS, NEWS_REFRESH_INTERVAL, NEWS_SERVICE_SOCKET, CYCLE_INTERVAL, CYCLE_OFFSET, DECISION_JOURNAL_DIR, DECISION_JOURNAL_SEGMENT_BYTES, MARKET_DATA_FEED, PRICE_MOVE_THRESHOLD
+
+
+# Wiring shared by this runner and the single-pair main.py; 'strategies' maps each pair to its TradingStrategy
+
+def load_candle_history(pair: str, limit: int, path: str = CANDLE_STORE_PATH) -> OHLCV:
+    """Syncs the pair's local candle store with Kraken, fetching only candles newer than its cursor, and loads the latest 'limit'."""
+    logger.info(f"Fetching historical {pair} data...")
+    try:
+        store = CandleStore(path, pair, CANDLE_INTERVAL)
+        try:
+            store.sync(kraken_api)
+            candles = store.load(limit=limit)
+        finally:
+            store.close()
+    except Exception as e:
+        logger.error(f"Failed to fetch historical {pair} data: {e}")
+        return OHLCV.empty()
+    if len(candles):
+        logger.info(f"Loaded {len(candles)} historical prices for {pair}.")
+    else:
+        logger.warning(f"No historical prices fetched for {pair}, starting with an empty dataset.")
+    return candles
+
+def start_news_service(strategies: Dict[str, TradingStrategy]) -> NewsService:
+    """Starts one combined-query news service and points every strategy without news at its own asset's view."""
+    queries = {pair: strategy.news_query for pair, strategy in strategies.items()}
+    news_service = NewsService(queries, interval=NEWS_REFRESH_INTERVAL).start()
+    if NEWS_SERVICE_SOCKET:
+        news_service.serve(NEWS_SERVICE_SOCKET)
+    for pair, strategy in strategies.items():
+        if strategy.news_refresher is None:
+            strategy.news_refresher = news_service.view(pair)
+    return news_service
+
+def open_journal(strategies: Dict[str, TradingStrategy]) -> DecisionJournal:
+    """Points every strategy without a journal at one shared decision journal; records carry their pair."""
+    journal = DecisionJournal(DECISION_JOURNAL_DIR, DECISION_JOURNAL_SEGMENT_BYTES)
+    for strategy in strategies.values():
+        if strategy.journal is None:
+            strategy.journal = journal
+    return journal
+
+def start_market_data_feed(strategies: Dict[str, TradingStrategy], scheduler: CycleScheduler) -> KrakenMarketDataFeed:
+    """
+    Streams every pair's ticker and order book over one WebSocket connection. While it
+    is live the per-cycle Ticker request is skipped and orders are priced from the local
+    books. Big price moves and new candles wake 'scheduler' early.
+    """
+    candle_trigger = not scheduler.ticks_on(CANDLE_INTERVAL * 60)
+    feed = KrakenMarketDataFeed(list(strategies), channels=("ticker", "book", "ohlc") if candle_trigger else ("ticker", "book"),
+                                ohlc_interval=CANDLE_INTERVAL)
+    price_trigger = PriceMoveTrigger(scheduler, PRICE_MOVE_THRESHOLD) if PRICE_MOVE_THRESHOLD > 0 else None
+    for pair, strategy in strategies.items():
+        strategy.market_data_feed = feed
+        strategy.local_order_book = feed.order_books[pair]
+        strategy.price_trigger = price_trigger
+    if price_trigger is not None:
+        price_trigger.attach(feed)
+    if candle_trigger:
+        CandleTrigger(scheduler).attach(feed)
+    feed.start()
+    return feed
+
+def run_scheduled(scheduler: CycleScheduler, cycle: Callable[[], None], name: str):
+    """Runs 'cycle' now and then on every scheduler wake-up; a failed cycle is logged and retried on the next one."""
+    while True:
+        try:
+            cycle()
+        except Exception as e:
+            logger.error(f"Error in {name}: {e}")
+
+        logger.info("Waiting for the next trading cycle...")
+        reason = scheduler.wait()
+        if reason != TICK:
+            logger.info(f"Running the trading cycle early on {reason}.")
+
+
+class MultiPairRunner:
+    """
+    Drives one TradingStrategy per pair from a single process. All pairs share the
+    Kraken client (and its connection pool) and one NewsService, and each cycle reads
+    every price and volume with one multi-pair Ticker request.
+    """
+    def __init__(self, pairs: Dict[str, float], candle_store_path: str = CANDLE_STORE_PATH):
+        self.candle_store_path = candle_store_path
+        self.news_service = None
+        self.market_data_feed = None
+        self.scheduler = None
+        self.strategies = {
+            pair: TradingStrategy(pair=pair, news_query=PAIR_NEWS_QUERIES.get(pair, pair), pair_portfolio=Portfolio(ALLOCATIONS, balance))
+            for pair, balance in pairs.items()
+        }
+
+    def load_history(self):
+        """Seeds each strategy's price history from its local candle store after syncing it with Kraken."""
+        for pair, strategy in self.strategies.items():
+            candles = load_candle_history(pair, strategy.prices.capacity, self.candle_store_path)
+            if len(candles):
+                strategy.load_candles(candles)
+
+    def start_news_service(self) -> NewsService:
+        self.news_service = start_news_service(self.strategies)
+        return self.news_service
+
+    def open_journal(self) -> DecisionJournal:
+        return open_journal(self.strategies)
+
+    def start_market_data_feed(self, scheduler: CycleScheduler) -> KrakenMarketDataFeed:
+        self.market_data_feed = start_market_data_feed(self.strategies, scheduler)
+        return self.market_data_feed
+
+    def _tickers(self) -> Dict:
+        feed = self.market_data_feed
+        # Streamed ticker payloads carry the same 'c' and 'v' fields as the REST Ticker result
+        if feed is not None and not feed.is_stale() and all(pair in feed.tickers for pair in self.strategies):
+            return dict(feed.tickers)
+        return kraken_api.get_ticker(list(self.strategies))
+
+    def run_cycle(self):
+        """Reads all tickers at once, streamed or with one request, and evaluates every pair's strategy."""
+        logger.info(f"Executing trading strategy for {', '.join(self.strategies)}...")
+        tickers = self._tickers()
+        for pair, strategy in self.strategies.items():
+            self._run_pair(pair, strategy, tickers.get(pair))
+
+    async def run_cycle_async(self, deadline: float = CYCLE_DEADLINE):
+        """
+        Like run_cycle, but evaluates the pairs concurrently in worker threads, so one pair's
+        order round trips do not hold up the others. The ticker read is bounded by 'deadline'
+        seconds and the cycle is skipped when it is not done by then.
+        """
+        logger.info(f"Executing trading strategy for {', '.join(self.strategies)}...")
+        with request_deadline(deadline):
+            try:
+                tickers = await asyncio.wait_for(asyncio.to_thread(self._tickers), timeout=deadline)
+            except asyncio.TimeoutError:
+                logger.error(f"Ticker fetch exceeded the {deadline}s cycle deadline. Skipping cycle.")
+                return
+        await asyncio.gather(*(asyncio.to_thread(self._run_pair, pair, strategy, tickers.get(pair))
+                               for pair, strategy in self.strategies.items()))
+
+    def _run_pair(self, pair: str, strategy: TradingStrategy, ticker: Optional[Dict]):
+        if not ticker:
+            logger.error(f"Failed to retrieve {pair} price.")
+            return
+        try:
+            current_price = float(ticker['c'][0])  # 'c' represents the current close price
+            market_volume = float(ticker['v'][1])  # 'v[1]' is the 24-hour volume
+        except (KeyError, ValueError, IndexError) as e:
+            logger.error(f"Malformed ticker data for {pair}: {e}")
+            return
+
+        # A failure in one pair must not stop the others
+        try:
+            strategy.portfolio.rebalance()
+            with strategy.cycle_timer.cycle():
+                strategy.update_sentiment()
+                strategy.evaluate(current_price, market_volume=market_volume)
+        except Exception as e:
+            logger.error(f"Error executing strategy for {pair}: {e}")
+
+    def run(self):
+        # Created here rather than in __init__, so loading history is not counted as an overrun
+        self.scheduler = CycleScheduler(CYCLE_INTERVAL, CYCLE_OFFSET)
+        if BACKGROUND_NEWS:
+            self.start_news_service()
+        if DECISION_JOURNAL_DIR:
+            self.open_journal()
+        if MARKET_DATA_FEED:
+            self.start_market_data_feed(self.scheduler)
+        if ASYNC_CYCLE:
+            # One event loop for the whole run, as in main.py
+            loop = asyncio.new_event_loop()
+            run_scheduled(self.scheduler, lambda: loop.run_until_complete(self.run_cycle_async()), "multi-pair runner")
+        else:
+            run_scheduled(self.scheduler, self.run_cycle, "multi-pair runner")
+
+
+if __name__ == "__main__":
+    runner = MultiPairRunner(TRADING_PAIRS)
+    runner.load_history()
+    runner.run()
@@ -0,0 +1,143 @@
+import math
+import threading
+import time
+from typing import Callable, Dict
+from logger_config import logger
+
+# What woke the scheduler: a scheduled tick or one of the event triggers
+TICK = "tick"
+TRIGGER_PRICE_MOVE = "price_move"
+TRIGGER_NEW_CANDLE = "new_candle"
+
+
+class CycleScheduler:
+    """
+    Wakes on wall-clock multiples of 'interval' seconds, shifted by 'offset', e.g. a few
+    seconds after every 5-minute candle close, so a cycle's own duration never pushes
+    later ticks back. When a cycle runs past one or more boundaries those ticks are
+    skipped rather than run back to back, and the overrun is counted. trigger() wakes
+    the waiting loop early for events such as a big price move or a new candle.
+    """
+    def __init__(self, interval: float, offset: float = 0.0, clock: Callable[[], float] = time.time):
+        if interval <= 0:
+            raise ValueError("Scheduler interval must be positive.")
+        self.interval = interval
+        self.offset = offset
+        self.clock = clock
+        self.ticks = 0
+        self.triggers = 0
+        self.skipped = 0
+        self.overruns = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._wake = threading.Event()
+        self._reason = None
+        self._lock = threading.Lock()
+        self._next = self.next_boundary(clock())
+
+    def next_boundary(self, now: float) -> float:
+        """The first tick time strictly after 'now'."""
+        return (math.floor((now - self.offset) / self.interval) + 1) * self.interval + self.offset
+
+    def ticks_on(self, period: float) -> bool:
+        """True if every 'period' boundary, e.g. a candle close, already gets a tick, so a trigger for it would only repeat the tick."""
+        return period % self.interval == 0
+
+    @property
+    def next_tick(self) -> float:
+        return self._next
+
+    def trigger(self, reason: str):
+        """Wakes wait() before the next tick; triggers arriving together are coalesced into one wake-up."""
+        with self._lock:
+            self._reason = reason
+            self._wake.set()
+
+    def wait(self) -> str:
+        """Blocks until the next tick or trigger. Returns TICK or the trigger's reason."""
+        now = self.clock()
+        if now >= self._next:
+            missed = int((now - self._next) // self.interval) + 1
+            self.overruns += 1
+            self.skipped += missed
+            self._next = self.next_boundary(now)
+            logger.warning(f"Cycle overran its {self.interval:g}s slot, skipped {missed} tick(s) "
+                           f"({self.overruns} overruns, {self.skipped} skipped ticks so far)")
+
+        while True:
+            now = self.clock()
+            if self._next - now > self.interval:
+                # The clock stepped back; realign instead of waiting for it to catch up with the old tick
+                logger.warning(f"Wall clock stepped back {self._next - self.interval - now:.1f}s. Realigning the schedule.")
+                self._next = self.next_boundary(now)
+            # Short waits so a wall clock step (NTP, manual change) is noticed promptly
+            if self._wake.wait(timeout=min(max(self._next - now, 0.0), 1.0)):
+                with self._lock:
+                    reason, self._reason = self._reason, None
+                    self._wake.clear()
+                self.triggers += 1
+                return reason
+            now = self.clock()
+            if now >= self._next:
+                self.last_lag = now - self._next
+                self.max_lag = max(self.max_lag, self.last_lag)
+                self.ticks += 1
+                self._next += self.interval
+                return TICK
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "ticks": self.ticks,
+            "triggers": self.triggers,
+            "skipped": self.skipped,
+            "overruns": self.overruns,
+            "last_lag": self.last_lag,
+            "max_lag": self.max_lag,
+        }
+
+
+class PriceMoveTrigger:
+    """
+    Triggers the scheduler when a pair's price moves more than 'threshold' (a fraction,
+    0.01 = 1%) away from the price at the last evaluation. Feed it prices with update(),
+    or attach() it to a KrakenMarketDataFeed's ticker channel.
+    """
+    def __init__(self, scheduler: CycleScheduler, threshold: float):
+        self.scheduler = scheduler
+        self.threshold = threshold
+        self.reference: Dict[str, float] = {}
+
+    def reset(self, pair: str, price: float):
+        """Sets the price moves are measured from, e.g. the price the strategy just evaluated."""
+        self.reference[pair] = price
+
+    def update(self, pair: str, price: float):
+        reference = self.reference.get(pair)
+        if reference is None:
+            self.reference[pair] = price
+        elif abs(price / reference - 1) >= self.threshold:
+            logger.info(f"{pair} moved {(price / reference - 1) * 100:+.2f}% since the last evaluation. Evaluating early.")
+            self.reference[pair] = price
+            self.scheduler.trigger(TRIGGER_PRICE_MOVE)
+
+    def attach(self, feed):
+        feed.add_listener("ticker", lambda pair, payload: self.update(pair, float(payload["c"][0])))
+
+
+class CandleTrigger:
+    """
+    Triggers the scheduler when a new candle opens on a KrakenMarketDataFeed's ohlc
+    channel, whose payload carries the candle's end time.
+    """
+    def __init__(self, scheduler: CycleScheduler):
+        self.scheduler = scheduler
+        self.candle_end: Dict[str, float] = {}
+
+    def update(self, pair: str, candle_end: float):
+        previous = self.candle_end.get(pair)
+        self.candle_end[pair] = candle_end
+        if previous is not None and candle_end > previous:
+            self.scheduler.trigger(TRIGGER_NEW_CANDLE)
+
+    def attach(self, feed):
+        feed.add_listener("ohlc", lambda pair, payload: self.update(pair, float(payload[1])))
@@ -0,0 +1,30 @@
+import subprocess
+import sys
+import time
+
+# Cold-start cost of the sentiment model, each measured in a fresh interpreter.
+# "before" reproduces the old module-level nltk.download + analyzer construction.
+SNIPPETS = {
+    "import indicators (lazy analyzer)": "import indicators",
+    "first sentiment score (local lexicon)": "import indicators; indicators.calculate_sentiment([{'title': 'Bitcoin rallies', 'description': ''}])",
+    "before: nltk.download + analyzer at import": "import indicators, nltk; nltk.download('vader_lexicon', quiet=True); indicators.SentimentIntensityAnalyzer()",
+}
+
+
+def measure(code: str, runs: int = 3) -> float:
+    """Returns the best wall time in seconds of running 'code' in a new Python process."""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, capture_output=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    baseline = measure("pass")
+    results = {name: measure(code) - baseline for name, code in SNIPPETS.items()}
+    for name, seconds in results.items():
+        print(f"{name:<45} {seconds * 1000:8.1f} ms")
+    saved = results["before: nltk.download + analyzer at import"] - results["import indicators (lazy analyzer)"]
+    print(f"{'saved on cold start before first trade':<45} {saved * 1000:8.1f} ms")
@@ -1,6 +1,26 @@
+import json
+import threading
+import time
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch, MagicMock
-from api_kraken import KrakenAPI
+import requests
+from api_kraken import KrakenAPI, request_deadline
+from resilience import CircuitBreaker
+
+class TickerHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps({"error": [], "result": {"XBTUSDT": {"c": ["50000.0", "1"], "v": ["10", "200"]}}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
 
 class TestKrakenAPIEnhanced(unittest.TestCase):
     def setUp(self):
@@ -9,7 +29,7 @@ class TestKrakenAPIEnhanced(unittest.TestCase):
         self.api_domain = "https://api.kraken.com"
         self.api_kraken = KrakenAPI(self.api_key, self.api_secret, self.api_domain)
 
-    @patch("api_kraken.requests.post")
+    @patch("api_kraken.requests.Session.post")
     def test_make_private_request_error_handling(self, mock_post):
         mock_post.side_effect = Exception("Network error")
         with self.assertRaises(Exception):  # Check for RetryError or specific exception if needed
@@ -21,7 +41,7 @@ class TestKrakenAPIEnhanced(unittest.TestCase):
             )
 
        
-    @patch("api_kraken.requests.get")
+    @patch("api_kraken.requests.Session.get")
     def test_get_btc_order_book_invalid_response(self, mock_get):
         mock_get.return_value.status_code = 200
         mock_get.return_value.json.return_value = {"result": {}, "error": []}
@@ -29,7 +49,7 @@ class TestKrakenAPIEnhanced(unittest.TestCase):
         order_book = self.api_kraken.get_btc_order_book()
         self.assertIsNone(order_book)
 
-    @patch("api_kraken.requests.get")
+    @patch("api_kraken.requests.Session.get")
     def test_get_historical_prices_invalid_data(self, mock_get):
         mock_get.return_value.status_code = 200
         mock_get.return_value.json.return_value = {
@@ -40,6 +60,19 @@ class TestKrakenAPIEnhanced(unittest.TestCase):
         prices = self.api_kraken.get_historical_prices()
         self.assertEqual(prices, [])
 
+    @patch("api_kraken.requests.Session.get")
+    def test_get_ohlcv_returns_columns_and_cursor(self, mock_get):
+        mock_get.return_value.json.return_value = {
+            "result": {"XBTUSDT": [[1700000000, "1", "2", "0.5", "1.5", "1.2", "3.0", 4]], "last": 1700000000},
+            "error": []
+        }
+
+        candles, last = self.api_kraken.get_ohlcv(since=1699990000)
+
+        self.assertEqual(last, 1700000000)
+        self.assertEqual(list(candles.close), [1.5])
+        self.assertEqual(mock_get.call_args.kwargs["params"]["since"], 1699990000)
+
     def test_get_optimal_price_invalid_side(self):
         order_book = {
             "asks": [["46000.0", "1"]],
@@ -56,16 +89,27 @@ class TestKrakenAPIEnhanced(unittest.TestCase):
         optimal_price = self.api_kraken.get_optimal_price(order_book, side="buy", buffer=10000.0)
         self.assertEqual(optimal_price, 36000.0)
 
-    @patch("api_kraken.requests.post")
+    def test_xrp_order_is_priced_within_a_tick_of_the_touch(self):
+        order_book = {"asks": [["0.52345", "1000"]], "bids": [["0.52330", "1000"]]}
+        with patch.object(self.api_kraken, "_make_request", return_value={"txid": ["OXRP"]}) as mock_request:
+            self.api_kraken.execute_trade(100.0, "buy", order_book=order_book, pair="XRPUSDT")
+            buy_price = mock_request.call_args.kwargs["data"]["price"]
+            self.api_kraken.execute_trade(100.0, "sell", order_book=order_book, pair="XRPUSDT")
+            sell_price = mock_request.call_args.kwargs["data"]["price"]
+
+        self.assertAlmostEqual(buy_price, 0.52344, places=8)
+        self.assertAlmostEqual(sell_price, 0.52331, places=8)
+
+    @patch("api_kraken.requests.Session.post")
     def test_execute_trade_invalid_order_book(self, mock_post):
-        with patch.object(self.api_kraken, "get_btc_order_book") as mock_order_book:
+        with patch.object(self.api_kraken, "get_order_book") as mock_order_book:
             mock_order_book.return_value = None
 
             self.api_kraken.execute_trade(volume=1.0, side="buy")
 
             mock_post.assert_not_called()
 
-    @patch("api_kraken.requests.get")
+    @patch("api_kraken.requests.Session.get")
     def test_get_market_volume_key_error(self, mock_get):
         mock_get.return_value.status_code = 200
         mock_get.return_value.json.return_value = {
@@ -76,7 +120,7 @@ class TestKrakenAPIEnhanced(unittest.TestCase):
         volume = self.api_kraken.get_market_volume()
         self.assertIsNone(volume)
 
-    @patch("api_kraken.requests.get")
+    @patch("api_kraken.requests.Session.get")
     def test_get_market_volume_invalid_response(self, mock_get):
         mock_get.return_value.status_code = 200
         mock_get.return_value.json.return_value = {
@@ -86,6 +130,190 @@ class TestKrakenAPIEnhanced(unittest.TestCase):
 
         volume = self.api_kraken.get_market_volume()
         self.assertIsNone(volume)
+    @patch("api_kraken.requests.Session.get")
+    def test_public_request_uses_public_timeout(self, mock_get):
+        mock_get.return_value.json.return_value = {"result": {"XBTUSDT": {"c": ["50000.0", "1"]}}, "error": []}
+        api = KrakenAPI(self.api_key, self.api_secret, self.api_domain, public_timeout=(1.0, 2.0))
+
+        self.assertEqual(api.get_btc_price(), 50000.0)
+        self.assertEqual(mock_get.call_args.kwargs["timeout"], (1.0, 2.0))
+
+    @patch("api_kraken.requests.Session.post")
+    def test_private_request_uses_private_timeout(self, mock_post):
+        mock_post.return_value.json.return_value = {"result": {"txid": ["T1"]}, "error": []}
+        api = KrakenAPI(self.api_key, self.api_secret, self.api_domain, private_timeout=(1.0, 30.0), request_deadline=60)
+
+        api._make_request(method="AddOrder", path="/0/private/", data={"pair": "XBTUSDT"}, is_private=True)
+        self.assertEqual(mock_post.call_args.kwargs["timeout"], (1.0, 30.0))
+
+    @patch("api_kraken.requests.Session.get")
+    def test_get_ticker_fetches_all_pairs_in_one_request(self, mock_get):
+        mock_get.return_value.json.return_value = {
+            "result": {"XBTUSDT": {"c": ["50000.0", "1"]}, "XRPUSDT": {"c": ["0.5", "1"]}},
+            "error": []
+        }
+
+        tickers = self.api_kraken.get_ticker(["XBTUSDT", "XETHZUSDT", "XRPUSDT"])
+
+        mock_get.assert_called_once()
+        self.assertEqual(mock_get.call_args.kwargs["params"], {"pair": "XBTUSDT,XETHZUSDT,XRPUSDT"})
+        self.assertEqual(set(tickers), {"XBTUSDT", "XRPUSDT"})
+
+    @patch("api_kraken.requests.Session.get")
+    def test_price_and_volume_share_one_ticker_request(self, mock_get):
+        mock_get.return_value.json.return_value = {"result": {"XBTUSDT": {"c": ["50000.0", "1"], "v": ["10", "200"]}}, "error": []}
+
+        self.assertEqual(self.api_kraken.get_price("XBTUSDT"), 50000.0)
+        self.assertEqual(self.api_kraken.get_market_volume("XBTUSDT"), 200.0)
+        mock_get.assert_called_once()
+
+        self.api_kraken.get_ticker_snapshot("XBTUSDT", max_age=0)
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch("api_kraken.requests.Session.get")
+    def test_get_ticker_fills_snapshot_cache(self, mock_get):
+        mock_get.return_value.json.return_value = {"result": {"XBTUSDT": {"c": ["50000.0", "1"], "v": ["10", "200"]}}, "error": []}
+
+        self.api_kraken.get_ticker(["XBTUSDT"])
+        self.assertEqual(self.api_kraken.get_market_volume("XBTUSDT"), 200.0)
+        mock_get.assert_called_once()
+
+    def test_concurrent_callers_share_one_in_flight_request(self):
+        release = threading.Event()
+        calls = []
+
+        def slow_request(**kwargs):
+            calls.append(kwargs)
+            release.wait(2)
+            return {"XBTUSDT": {"c": ["50000.0", "1"], "v": ["10", "200"]}}
+
+        results = []
+        with patch.object(self.api_kraken, "_make_request", side_effect=slow_request):
+            threads = [threading.Thread(target=lambda: results.append(self.api_kraken.get_price("XBTUSDT"))) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            while not calls:
+                time.sleep(0.01)
+            time.sleep(0.05)
+            release.set()
+            for thread in threads:
+                thread.join(2)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [50000.0] * 5)
+
+    @patch("api_kraken.requests.Session.post")
+    def test_rate_limit_error_saturates_counter(self, mock_post):
+        mock_post.return_value.json.return_value = {"result": {}, "error": ["EAPI:Rate limit exceeded"]}
+
+        self.assertIsNone(self.api_kraken._make_request(method="Balance", path="/0/private/", is_private=True, deadline=0.2))
+
+        budget = self.api_kraken.rate_limit_budget()
+        self.assertEqual(budget["rate_limit_errors"], 1)
+        self.assertLess(budget["remaining"]["private"], 1)
+
+    @patch("resilience.random.uniform", return_value=0)
+    @patch("api_kraken.requests.Session.get")
+    def test_idempotent_call_is_retried_after_server_error(self, mock_get, _):
+        failure = MagicMock()
+        failure.raise_for_status.side_effect = requests.HTTPError("502", response=MagicMock(status_code=502))
+        success = MagicMock()
+        success.json.return_value = {"result": {"XBTUSDT": {"c": ["50000.0", "1"]}}, "error": []}
+        mock_get.side_effect = [failure, success]
+
+        self.assertEqual(self.api_kraken.get_price("XBTUSDT"), 50000.0)
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch("api_kraken.requests.Session.post")
+    def test_order_is_not_retried_after_network_error(self, mock_post):
+        mock_post.side_effect = requests.ReadTimeout("read timed out")
+
+        result = self.api_kraken._make_request(method="AddOrder", path="/0/private/", data={"pair": "XBTUSDT"}, is_private=True)
+
+        self.assertIsNone(result)
+        mock_post.assert_called_once()
+
+    @patch("api_kraken.requests.Session.get")
+    def test_open_circuit_fails_fast(self, mock_get):
+        mock_get.side_effect = requests.ConnectionError("refused")
+        api = KrakenAPI(self.api_key, self.api_secret, self.api_domain, circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+
+        self.assertIsNone(api._make_request(method="Depth", path="/0/public/", deadline=5))
+        calls = mock_get.call_count
+        self.assertEqual(calls, 2)
+
+        start = time.monotonic()
+        self.assertIsNone(api._make_request(method="Depth", path="/0/public/", deadline=5))
+        self.assertEqual(mock_get.call_count, calls)
+        self.assertLess(time.monotonic() - start, 0.1)
+
+    @patch("api_kraken.requests.Session.get")
+    def test_half_open_trial_without_budget_does_not_keep_circuit_open(self, mock_get):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        rate_limiter = MagicMock()
+        api = KrakenAPI(self.api_key, self.api_secret, self.api_domain, circuit_breaker=breaker, rate_limiter=rate_limiter)
+        mock_get.side_effect = requests.ConnectionError("refused")
+        self.assertIsNone(api._make_request(method="Depth", path="/0/public/", deadline=0.01))
+        time.sleep(0.06)
+
+        rate_limiter.acquire.return_value = False  # The trial call times out waiting for budget
+        self.assertIsNone(api._make_request(method="Depth", path="/0/public/", deadline=1))
+        self.assertEqual(breaker.state("Depth"), "half_open")
+
+        rate_limiter.acquire.return_value = True
+        mock_get.side_effect = None
+        mock_get.return_value.json.return_value = {"result": {"XBTUSDT": {}}, "error": []}
+        self.assertEqual(api._make_request(method="Depth", path="/0/public/", deadline=1), {"XBTUSDT": {}})
+        self.assertEqual(breaker.state("Depth"), "closed")
+
+    @patch("api_kraken.requests.Session.get")
+    def test_read_timeout_is_limited_by_deadline(self, mock_get):
+        mock_get.return_value.json.return_value = {"result": {}, "error": []}
+
+        self.api_kraken._make_request(method="Depth", path="/0/public/", deadline=2)
+
+        connect_timeout, read_timeout = mock_get.call_args.kwargs["timeout"]
+        self.assertLessEqual(read_timeout, 2)
+
+    @patch("api_kraken.requests.Session.get")
+    def test_request_deadline_block_bounds_the_call(self, mock_get):
+        mock_get.return_value.json.return_value = {"result": {}, "error": []}
+
+        with request_deadline(1):
+            self.api_kraken._make_request(method="Depth", path="/0/public/", deadline=30)
+
+        connect_timeout, read_timeout = mock_get.call_args.kwargs["timeout"]
+        self.assertLessEqual(read_timeout, 1)
+
+    @patch("api_kraken.requests.Session.post")
+    def test_concurrent_private_calls_use_distinct_nonces(self, mock_post):
+        mock_post.return_value.json.return_value = {"result": {}, "error": []}
+
+        threads = [threading.Thread(target=self.api_kraken._make_request,
+                                    kwargs={"method": "QueryOrders", "path": "/0/private/", "is_private": True}) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        nonces = [call.kwargs["data"]["nonce"] for call in mock_post.call_args_list]
+        self.assertEqual(len(set(nonces)), 10)
+
+    def test_connections_are_reused_across_requests(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), TickerHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        api = KrakenAPI(self.api_key, self.api_secret, f"http://127.0.0.1:{server.server_address[1]}", ticker_ttl=0)
+        self.addCleanup(api.close)
+
+        for _ in range(3):
+            self.assertEqual(api.get_btc_price(), 50000.0)
+
+        stats = api.pool_stats()
+        self.assertEqual(stats["requests"], 3)
+        self.assertEqual(stats["connections_opened"], 1)
+        self.assertEqual(stats["connections_reused"], 2)
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import numpy as np
+from unittest.mock import patch
+from backtest import compute_indicators, evaluate_decisions, run_backtest, HOLD, BUY, PARTIAL_SELL, SELL
+from indicators import calculate_moving_average, calculate_rsi, calculate_macd
+from trading_strategy import TradingStrategy
+
+def make_ohlc(n, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 40000 + np.cumsum(rng.normal(0, 150, n))
+    return np.column_stack([close, close + 50, close - 50, close])
+
+class TestBacktest(unittest.TestCase):
+    def test_indicators_match_live_functions(self):
+        close = make_ohlc(120)[:, 3]
+        indicators = compute_indicators(close)
+        for i in range(len(close)):
+            history = close[:i + 1]
+            macd, signal = calculate_macd(history)
+            expected = {
+                'moving_average': calculate_moving_average(history),
+                'rsi': calculate_rsi(history),
+                'macd': macd,
+                'signal': signal,
+            }
+            for name, value in expected.items():
+                if value is None:
+                    self.assertTrue(np.isnan(indicators[name][i]))
+                else:
+                    self.assertEqual(indicators[name][i], value)
+
+    def test_decisions_match_live_decision_ladder(self):
+        ohlc = make_ohlc(400)
+        close = ohlc[:, 3]
+        sentiment = np.random.default_rng(3).uniform(-1, 1, len(close))
+        _, signals = evaluate_decisions(compute_indicators(close), sentiment)
+
+        strategy = TradingStrategy()
+        live_signals = []
+        with patch.object(strategy, '_execute_buy', side_effect=lambda price: live_signals.append(BUY)), \
+                patch.object(strategy, '_execute_partial_sell', side_effect=lambda price: live_signals.append(PARTIAL_SELL)), \
+                patch.object(strategy, '_execute_sell', side_effect=lambda price: live_signals.append(SELL)):
+            for i in range(len(close)):
+                history = close[:i + 1]
+                moving_avg = calculate_moving_average(history)
+                rsi = calculate_rsi(history)
+                macd, signal = calculate_macd(history)
+                strategy.sentiment_score = sentiment[i]
+                count = len(live_signals)
+                if moving_avg and rsi and macd and signal:
+                    strategy._determine_trade_action(close[i], macd, signal, rsi)
+                if len(live_signals) == count:
+                    live_signals.append(HOLD)
+
+        np.testing.assert_array_equal(signals, live_signals)
+        self.assertTrue(np.any(signals != HOLD))
+
+    def test_run_backtest_trades_and_equity(self):
+        ohlc = make_ohlc(500)
+        sentiment = np.zeros(len(ohlc))
+        result = run_backtest(ohlc, sentiment, trade_volume=0.1, initial_cash=10000.0)
+
+        self.assertEqual(len(result.equity), len(ohlc))
+        self.assertEqual(result.equity[0], 10000.0)
+        # Trades alternate between buying and selling like the live last_trade_type guard
+        actions = [trade['action'] for trade in result.trades]
+        for previous, current in zip(actions, actions[1:]):
+            self.assertNotEqual(previous == 'buy', current == 'buy')
+        self.assertAlmostEqual(result.fees_paid, sum(trade['fee'] for trade in result.trades))
+        for trade in result.trades:
+            self.assertAlmostEqual(trade['fee'], trade['volume'] * trade['price'] * 0.0026)
+
+    def test_run_backtest_rejects_mismatched_sentiment(self):
+        with self.assertRaises(ValueError):
+            run_backtest(make_ohlc(50), np.zeros(10), trade_volume=0.1)
+
+    def test_years_of_hourly_candles(self):
+        ohlc = make_ohlc(3 * 365 * 24)
+        sentiment = np.random.default_rng(1).uniform(-1, 1, len(ohlc))
+
+        result = run_backtest(ohlc, sentiment, trade_volume=0.1, initial_cash=10000.0)
+
+        self.assertEqual(len(result.equity), len(ohlc))
+        self.assertTrue(result.trades)
+        self.assertTrue(np.all(np.isfinite(result.equity)))
+
+if __name__ == "__main__":
+    unittest.main()
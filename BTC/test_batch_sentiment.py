@@ -0,0 +1,51 @@
+import unittest
+from nltk.sentiment.vader import SentiText, VaderConstants
+from batch_sentiment import BatchSentimentScorer, score_articles, vader_tokens, benchmark
+from indicators import get_sentiment_analyzer
+
+TEXTS = [
+    "Bitcoin rallies to a record high!",
+    "Crypto markets crash after exchange hack. Investors are not happy",
+    "BTC price holds steady, but analysts warn of a sharp correction ahead??",
+    "The outlook for miners is GOOD despite weak demand",
+    "Prices are extremely good, never so good, and very very bad",
+    "This isn't great. Great news though, great!!!",
+    "Traders are kind of worried about the rally",  # multi-word booster, scored by NLTK
+    "At least the losses are small",  # 'least' rule, scored by NLTK
+    "",
+    "x y z",
+    "'Quoted' words, (parenthesised) and --dashes-- :) :(",
+]
+
+class TestBatchSentimentScorer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.analyzer = get_sentiment_analyzer()
+        cls.scorer = BatchSentimentScorer(cls.analyzer)
+
+    def test_tokens_match_nltk(self):
+        for text in TEXTS:
+            expected = SentiText(text, VaderConstants.PUNC_LIST, VaderConstants.REGEX_REMOVE_PUNCTUATION).words_and_emoticons
+            self.assertEqual(vader_tokens(text), expected, text)
+
+    def test_compound_scores_match_nltk(self):
+        expected = [self.analyzer.polarity_scores(text)["compound"] for text in TEXTS]
+        scores = self.scorer.polarity(TEXTS)
+        self.assertEqual(len(scores), len(TEXTS))
+        for text, score, nltk_score in zip(TEXTS, scores, expected):
+            self.assertAlmostEqual(score, nltk_score, delta=1e-4, msg=text)
+
+    def test_score_articles_uses_title_and_description(self):
+        articles = [{"title": "Bitcoin rallies", "description": "Great gains"}, {"title": None, "description": None}]
+        scores = score_articles(articles, self.scorer)
+        self.assertAlmostEqual(scores[0], self.analyzer.polarity_scores("Bitcoin rallies. Great gains")["compound"], delta=1e-4)
+        self.assertEqual(scores[1], 0.0)
+
+    def test_benchmark_reports_throughput(self):
+        result = benchmark(TEXTS * 10, runs=1)
+        self.assertEqual(result["texts"], len(TEXTS) * 10)
+        self.assertGreater(result["batch_per_second"], 0)
+        self.assertGreater(result["speedup"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
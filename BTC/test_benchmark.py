@@ -0,0 +1,38 @@
+import json
+import os
+import tempfile
+import unittest
+import benchmark
+
+class TestBenchmark(unittest.TestCase):
+    def test_run_selected_benchmarks(self):
+        report = benchmark.run(["moving_average[50]", "strategy", "parse.depth"], repeat=2, min_time=0.001)
+        self.assertEqual(set(report["results"]), {"indicators.moving_average[50]", "strategy.execute_strategy", "parse.depth_json[500]"})
+        for result in report["results"].values():
+            self.assertGreater(result["median_us"], 0)
+            self.assertLessEqual(result["min_us"], result["median_us"])
+        self.assertIn("python", report["meta"])
+
+    def test_compare_flags_regressions(self):
+        baseline = {"results": {"a": {"median_us": 100.0}, "b": {"median_us": 100.0}}}
+        current = {"results": {"a": {"median_us": 110.0}, "b": {"median_us": 150.0}, "c": {"median_us": 1.0}}}
+        rows = {row["name"]: row for row in benchmark.compare(current, baseline, threshold=0.25)}
+        self.assertFalse(rows["a"]["regressed"])
+        self.assertTrue(rows["b"]["regressed"])
+        self.assertIsNone(rows["c"]["ratio"])
+
+    def test_save_then_compare_against_baseline(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "baseline.json")
+            self.assertEqual(benchmark.main(["moving_average[50]", "--save", path, "--repeat", "2"]), 0)
+            with open(path) as f:
+                baseline = json.load(f)
+            self.assertIn("indicators.moving_average[50]", baseline["results"])
+
+            baseline["results"]["indicators.moving_average[50]"]["median_us"] /= 100  # Pretend it used to be much faster
+            with open(path, "w") as f:
+                json.dump(baseline, f)
+            self.assertEqual(benchmark.main(["moving_average[50]", "--compare", path, "--repeat", "2"]), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from candle_store import CandleStore
+
+HOUR = 3600
+
+def candle(time, close):
+    return [time, str(close), str(close + 1), str(close - 1), str(close), str(close), "1.5", 10]
+
+class TestCandleStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.path = os.path.join(self.temp_dir.name, "candles.db")
+        self.store = CandleStore(self.path, "XBTUSDT", 60)
+        self.addCleanup(self.store.close)
+
+    def test_sync_uses_stored_cursor(self):
+        api = MagicMock()
+        api.get_ohlc.return_value = ([candle(HOUR, 100), candle(2 * HOUR, 101)], HOUR)
+        self.store.sync(api)
+        api.get_ohlc.assert_called_once_with("XBTUSDT", 60, since=None)
+
+        api.get_ohlc.reset_mock()
+        api.get_ohlc.return_value = ([candle(2 * HOUR, 102), candle(3 * HOUR, 103)], 2 * HOUR)
+        self.store.sync(api)
+        api.get_ohlc.assert_called_once_with("XBTUSDT", 60, since=HOUR)
+
+        # The still-forming candle is replaced rather than duplicated
+        self.assertEqual(self.store.closes(), [100.0, 102.0, 103.0])
+        self.assertEqual(self.store.last_cursor, 2 * HOUR)
+
+    def test_history_persists_across_restarts(self):
+        self.store.append([candle(HOUR, 100), candle(2 * HOUR, 101), candle(3 * HOUR, 102)])
+        self.store._set_last_cursor(2 * HOUR)
+        self.store.connection.commit()
+        self.store.close()
+
+        reopened = CandleStore(self.path, "XBTUSDT", 60)
+        self.addCleanup(reopened.close)
+        self.assertEqual(len(reopened), 3)
+        self.assertEqual(reopened.closes(limit=2), [101.0, 102.0])
+        self.assertEqual(reopened.last_cursor, 2 * HOUR)
+        self.assertEqual(CandleStore(self.path, "XBTUSDT", 15).closes(), [])
+
+    def test_gaps_are_detected_and_backfilled(self):
+        self.store.append([candle(HOUR, 100), candle(2 * HOUR, 101), candle(5 * HOUR, 104)])
+        self.assertEqual(self.store.find_gaps(), [(2 * HOUR, 5 * HOUR)])
+
+        api = MagicMock()
+        api.get_ohlc.return_value = ([candle(3 * HOUR, 102), candle(4 * HOUR, 103), candle(5 * HOUR, 104), candle(6 * HOUR, 105)], 5 * HOUR)
+        filled = self.store.backfill_gaps(api)
+
+        api.get_ohlc.assert_called_once_with("XBTUSDT", 60, since=2 * HOUR)
+        self.assertEqual(filled, 2)
+        self.assertEqual(self.store.find_gaps(), [])
+        self.assertEqual(self.store.closes(), [100.0, 101.0, 102.0, 103.0, 104.0])
+
+    def test_unfillable_gaps_are_not_requested_again(self):
+        self.store.append([candle(HOUR, 100), candle(4 * HOUR, 103), candle(5 * HOUR, 104), candle(9 * HOUR, 108)])
+        api = MagicMock()
+        api.get_ohlc.side_effect = [([], None), ([candle(9 * HOUR, 108)], 9 * HOUR)]
+
+        self.store.backfill_gaps(api)  # The first request fails, the second is answered without candles
+        self.assertEqual(self.store.unfillable_gaps(), [(5 * HOUR, 9 * HOUR)])
+
+        api.get_ohlc.reset_mock(side_effect=True)
+        api.get_ohlc.return_value = ([candle(2 * HOUR, 101), candle(3 * HOUR, 102)], 9 * HOUR)
+        self.store.backfill_gaps(api)
+
+        api.get_ohlc.assert_called_once_with("XBTUSDT", 60, since=HOUR)
+        self.assertEqual(self.store.find_gaps(), [(5 * HOUR, 9 * HOUR)])
+
+    def test_load_returns_columnar_candles(self):
+        self.store.append([candle(HOUR, 100), candle(2 * HOUR, 101), candle(3 * HOUR, 102)])
+
+        candles = self.store.load(limit=2)
+
+        self.assertEqual(list(candles.time), [2 * HOUR, 3 * HOUR])
+        self.assertEqual(list(candles.close), [101.0, 102.0])
+        self.assertEqual(list(candles.high), [102.0, 103.0])
+        self.assertEqual(list(candles.count), [10, 10])
+        self.assertEqual(len(CandleStore(self.path, "XRPUSDT", 60).load()), 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from unittest.mock import patch
+from cycle_timer import CycleTimer, PHASE_NEWS, PHASE_DECISION, PHASE_ORDER
+
+class TestCycleTimer(unittest.TestCase):
+    def setUp(self):
+        self.clock = 0.0
+        patch('cycle_timer.time.perf_counter', lambda: self.clock).start()
+        self.mock_logger = patch('cycle_timer.logger').start()
+        self.addCleanup(patch.stopall)
+
+    def advance(self, seconds):
+        self.clock += seconds
+
+    def test_nested_phase_is_charged_only_to_itself(self):
+        timer = CycleTimer("XBTUSDT")
+        with timer.cycle():
+            with timer.phase(PHASE_NEWS):
+                self.advance(0.3)
+            with timer.phase(PHASE_DECISION):
+                self.advance(0.01)
+                with timer.phase(PHASE_ORDER):
+                    self.advance(0.2)
+
+        report = timer.percentiles()
+        self.assertAlmostEqual(report[PHASE_NEWS]["p50"], 300.0)
+        self.assertAlmostEqual(report[PHASE_DECISION]["p50"], 10.0)
+        self.assertAlmostEqual(report[PHASE_ORDER]["p50"], 200.0)
+        self.assertAlmostEqual(report["cycle"]["p50"], 510.0)
+
+    def test_summary_line_lists_phases_in_cycle_order(self):
+        timer = CycleTimer("XBTUSDT")
+        with timer.cycle():
+            with timer.phase(PHASE_ORDER):
+                self.advance(0.002)
+            with timer.phase(PHASE_NEWS):
+                self.advance(0.001)
+
+        line = self.mock_logger.info.call_args[0][0]
+        self.assertEqual(line, "Cycle XBTUSDT 3.0ms [news=1.0 order=2.0] p95=3.0ms")
+
+    def test_rolling_percentiles_cover_the_last_window_only(self):
+        timer = CycleTimer("XBTUSDT", window=100)
+        for duration in [10.0] * 100 + [0.001 * (i + 1) for i in range(100)]:
+            with timer.phase(PHASE_NEWS):
+                self.advance(duration)
+
+        report = timer.percentiles()[PHASE_NEWS]
+        self.assertAlmostEqual(report["p50"], 50.5)
+        self.assertAlmostEqual(report["p99"], 99.01)
+        self.assertNotIn("cycle", timer.percentiles())
+
+    def test_overrun_is_counted_and_flagged(self):
+        timer = CycleTimer("XBTUSDT", budget=1.0)
+        with timer.cycle():
+            self.advance(0.5)
+        with timer.cycle():
+            self.advance(1.5)
+
+        self.assertEqual((timer.cycles, timer.overruns), (2, 1))
+        self.assertIn("OVERRUN", self.mock_logger.warning.call_args[0][0])
+        self.assertIn("(1/2 cycles)", self.mock_logger.warning.call_args[0][0])
+
+    def test_cycle_is_recorded_when_it_raises(self):
+        timer = CycleTimer("XBTUSDT")
+        with self.assertRaises(RuntimeError):
+            with timer.cycle():
+                with timer.phase(PHASE_NEWS):
+                    raise RuntimeError("boom")
+        self.assertEqual(timer.cycles, 1)
+        self.assertIn(PHASE_NEWS, timer.percentiles())
+
+if __name__ == '__main__':
+    unittest.main()
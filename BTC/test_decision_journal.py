@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from unittest.mock import patch
+import fixtures
+from backtest import BRANCH_NEUTRAL, BRANCH_STRONG_POSITIVE, HOLD, BUY, SELL
+from decision_journal import DecisionJournal, read_journal, read_segment, replay_decisions, RECORD_DTYPE, SEGMENT_HEADER, NO_BRANCH
+from trading_strategy import TradingStrategy
+
+class TestDecisionJournal(unittest.TestCase):
+    def setUp(self):
+        self.directory = os.path.join(tempfile.mkdtemp(), "journal")
+
+    def segments(self):
+        return sorted(os.listdir(self.directory))
+
+    def test_records_round_trip(self):
+        journal = DecisionJournal(self.directory)
+        journal.append("XBTUSDT", 50000.0, None, None, None, None, 0.0, ts=100.0)
+        journal.append("XBTUSDT", 50100.0, 49900.0, 35.0, 12.5, 10.0, 0.6, BRANCH_STRONG_POSITIVE, BUY, "OQCLML-BW3P3-BUCMWZ", ts=101.0)
+        journal.close()
+
+        records = read_journal(self.directory)
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0]["branch"], NO_BRANCH)
+        self.assertTrue(np.isnan(records[0]["rsi"]))
+        self.assertEqual(records[1]["pair"], b"XBTUSDT")
+        self.assertEqual(records[1]["macd"], 12.5)
+        self.assertEqual(records[1]["action"], BUY)
+        self.assertEqual(records[1]["order_id"], b"OQCLML-BW3P3-BUCMWZ")
+
+    def test_segments_rotate_by_size(self):
+        journal = DecisionJournal(self.directory, segment_bytes=SEGMENT_HEADER.itemsize + 10 * RECORD_DTYPE.itemsize)
+        for i in range(25):
+            journal.append("XBTUSDT", float(i), None, None, None, None, 0.0, ts=float(i))
+        journal.close()
+
+        self.assertEqual(self.segments(), ["decisions-000000.bin", "decisions-000001.bin", "decisions-000002.bin"])
+        np.testing.assert_array_equal(read_journal(self.directory)["price"], np.arange(25.0))
+
+    def test_reopened_journal_appends_and_skips_torn_record(self):
+        journal = DecisionJournal(self.directory)
+        journal.append("XBTUSDT", 1.0, None, None, None, None, 0.0)
+        journal.close()
+        with open(os.path.join(self.directory, "decisions-000000.bin"), "ab") as f:
+            f.write(b"\x00" * 10)  # A write cut short by a crash
+
+        self.assertEqual(len(read_segment(os.path.join(self.directory, "decisions-000000.bin"))), 1)
+        journal = DecisionJournal(self.directory)
+        journal.append("XBTUSDT", 2.0, None, None, None, None, 0.0)
+        journal.close()
+
+        self.assertEqual(self.segments(), ["decisions-000000.bin", "decisions-000001.bin"])
+        np.testing.assert_array_equal(read_journal(self.directory)["price"], [1.0, 2.0])
+
+    def test_read_filters_by_time_and_pair(self):
+        journal = DecisionJournal(self.directory)
+        for i, pair in enumerate(["XBTUSDT", "XETHZUSDT"] * 5):
+            journal.append(pair, float(i), None, None, None, None, 0.0, ts=float(i))
+        journal.close()
+
+        records = read_journal(self.directory, since=2.0, until=8.0, pair="XETHZUSDT")
+        np.testing.assert_array_equal(records["ts"], [3.0, 5.0, 7.0])
+        self.assertEqual(len(read_journal(os.path.join(self.directory, "missing"))), 0)
+
+    def test_rejects_foreign_files(self):
+        os.makedirs(self.directory)
+        with open(os.path.join(self.directory, "decisions-000000.bin"), "wb") as f:
+            f.write(b"not a journal at all")
+        with self.assertRaises(ValueError):
+            read_journal(self.directory)
+
+    def test_month_of_minute_records_across_segments(self):
+        journal = DecisionJournal(self.directory, segment_bytes=1024 * 1024)
+        for i in range(30 * 24 * 60):
+            journal.append("XBTUSDT", 50000.0 + i, 50000.0, 50.0, 1.0, 1.0, 0.0, BRANCH_NEUTRAL, HOLD, ts=float(i))
+        journal.close()
+
+        records = read_journal(self.directory)
+
+        self.assertGreater(len(self.segments()), 1)
+        self.assertEqual(len(records), 43200)
+        np.testing.assert_array_equal(records["ts"], np.arange(43200.0))
+        np.testing.assert_array_equal(records["price"], 50000.0 + np.arange(43200.0))
+        self.assertTrue(np.all(records["action"] == HOLD))
+
+class TestStrategyJournal(unittest.TestCase):
+    def setUp(self):
+        self.mock_kraken_api = patch('trading_strategy.kraken_api').start()
+        self.mock_kraken_api.get_market_volume.return_value = 200
+        self.mock_kraken_api.execute_trade.return_value = "OQCLML-BW3P3-BUCMWZ"
+        self.addCleanup(patch.stopall)
+        self.directory = tempfile.mkdtemp()
+
+    def test_live_decisions_replay_identically_in_backtest(self):
+        strategy = TradingStrategy()
+        strategy.journal = DecisionJournal(self.directory)
+        sentiment = np.random.default_rng(3).uniform(-1, 1, 400)
+        for price, score in zip(fixtures.price_walk(400, volatility=0.01), sentiment):
+            strategy.sentiment_score = score
+            strategy.evaluate(price)
+        strategy.journal.close()
+
+        records = read_journal(self.directory)
+        self.assertEqual(len(records), 400)
+        self.assertEqual(records["branch"][0], NO_BRANCH)
+        self.assertTrue(np.any(records["action"] == BUY))
+        self.assertTrue(np.any(records["action"] == SELL))
+        self.assertIn(b"OQCLML-BW3P3-BUCMWZ", records["order_id"][records["action"] == BUY])
+        self.assertFalse(np.any(replay_decisions(records)))
+
+if __name__ == '__main__':
+    unittest.main()
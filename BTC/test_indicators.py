@@ -1,3 +1,4 @@
+import time
 import unittest
 from unittest.mock import patch, MagicMock
 import numpy as np
@@ -11,8 +12,15 @@ from indicators import (
     calculate_rsi,
     calculate_macd,
     calculate_potential_profit_loss,
-    is_profitable_trade
+    is_profitable_trade,
+    StreamingIndicators,
+    cross_check_streaming_indicators,
+    calculate_atr,
+    calculate_vwap,
+    SentimentScoreCache,
+    get_sentiment_analyzer
 )
+from ohlcv import OHLCV
 
 class TestBitcoinAnalysis(unittest.TestCase):
 
@@ -34,6 +42,20 @@ class TestBitcoinAnalysis(unittest.TestCase):
         self.assertEqual(len(articles), 2)
         self.assertEqual(articles[0]['title'], "Bitcoin hits new high")
 
+    @patch("indicators.requests.get")
+    def test_fetch_latest_news_requests_only_top_n(self, mock_get):
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.return_value = {"articles": []}
+
+        fetch_latest_news(top_n=5, query="bitcoin & ether", use_cache=False)
+        fetch_latest_news(top_n=500, query="bitcoin & ether", use_cache=False)
+
+        first, second = mock_get.call_args_list
+        self.assertEqual(first.args, ("https://newsapi.org/v2/everything",))
+        self.assertEqual(first.kwargs["params"]["q"], "bitcoin & ether")
+        self.assertEqual(first.kwargs["params"]["pageSize"], 5)
+        self.assertEqual(second.kwargs["params"]["pageSize"], 100)
+
     def test_calculate_sentiment(self):
         articles = [
             {"title": "Bitcoin is amazing", "description": "Prices are soaring"},
@@ -43,6 +65,54 @@ class TestBitcoinAnalysis(unittest.TestCase):
         sentiment = calculate_sentiment(articles)
         self.assertIsInstance(sentiment, float)
 
+    def test_calculate_sentiment_reuses_cached_scores(self):
+        cache = SentimentScoreCache()
+        articles = [
+            {"title": "Bitcoin is amazing", "description": "Prices are soaring", "publishedAt": "2024-01-01T10:00:00Z"},
+            {"title": "Bitcoin crash", "description": "Prices are falling sharply", "publishedAt": "2024-01-01T11:00:00Z"}
+        ]
+
+        first = calculate_sentiment(articles, cache=cache)
+        with patch("indicators.get_sentiment_analyzer") as mock_analyzer:
+            second = calculate_sentiment(articles, cache=cache)
+            mock_analyzer.assert_not_called()
+
+        self.assertEqual(first, second)
+        self.assertEqual(cache.stats(), {"hits": 2, "misses": 2, "entries": 2})
+        self.assertEqual(cache.published_cursor, "2024-01-01T11:00:00Z")
+        self.assertEqual(cache.advance_cursor(articles + [{"publishedAt": "2024-01-01T12:00:00Z"}]), 1)
+
+    @patch("indicators.nltk.download")
+    @patch("indicators.SentimentIntensityAnalyzer")
+    def test_sentiment_analyzer_is_built_lazily_once(self, mock_analyzer_class, mock_download):
+        mock_analyzer_class.side_effect = [LookupError("vader_lexicon"), MagicMock()]
+        with patch("indicators._sentiment_analyzer", None):
+            analyzer = get_sentiment_analyzer()
+            self.assertIs(get_sentiment_analyzer(), analyzer)
+        mock_download.assert_called_once_with('vader_lexicon', quiet=True)
+        self.assertEqual(mock_analyzer_class.call_count, 2)
+
+    @patch("indicators.nltk.download")
+    @patch("indicators.SentimentIntensityAnalyzer", side_effect=LookupError("vader_lexicon"))
+    def test_sentiment_analyzer_offline_without_lexicon(self, mock_analyzer_class, mock_download):
+        with patch("indicators._sentiment_analyzer", None), patch("indicators.NLTK_DOWNLOAD_MISSING", False):
+            with self.assertRaises(LookupError):
+                get_sentiment_analyzer()
+        mock_download.assert_not_called()
+
+    def test_sentiment_cache_evicts_and_expires(self):
+        cache = SentimentScoreCache(max_entries=2, ttl=60)
+        cache.put("a", 0.1)
+        cache.put("b", 0.2)
+        cache.get("a")
+        cache.put("c", 0.3)
+        self.assertIsNone(cache.get("b"))  # Least recently used entry was evicted
+        self.assertEqual(cache.get("a"), 0.1)
+
+        with patch("indicators.time.monotonic", return_value=time.monotonic() + 120):
+            self.assertIsNone(cache.get("c"))
+        self.assertEqual(len(cache), 1)
+
     def test_calculate_moving_average(self):
         prices = [10, 20, 30, 40, 50, 60, 70]
         result = calculate_moving_average(prices, window=3)
@@ -72,6 +142,49 @@ class TestBitcoinAnalysis(unittest.TestCase):
 
         potential_profit_loss = 0.2  # 0.2% profit
         self.assertFalse(is_profitable_trade(potential_profit_loss, transaction_fee_percentage=0.26))
+    def test_calculate_atr(self):
+        candles = OHLCV.from_kraken([
+            [0, "10", "12", "9", "11", "10", "1", 1],
+            [60, "11", "13", "10", "12", "11", "1", 1],
+            [120, "12", "16", "12", "15", "14", "1", 1],
+        ])
+        # True ranges: max(3, 2, 1) = 3 and max(4, 4, 0) = 4
+        self.assertAlmostEqual(calculate_atr(candles, window=2), 3.5)
+        self.assertIsNone(calculate_atr(candles, window=3))
+
+    def test_calculate_vwap(self):
+        candles = OHLCV.from_kraken([
+            [0, "10", "12", "9", "11", "10", "1", 1],
+            [60, "11", "13", "10", "12", "20", "3", 1],
+        ])
+        self.assertAlmostEqual(calculate_vwap(candles, window=2), 17.5)
+        self.assertIsNone(calculate_vwap(candles, window=3))
+
+    def test_streaming_indicators_match_batch_functions(self):
+        np.random.seed(42)
+        prices = list(50000 + np.cumsum(np.random.randn(200) * 100))
+        deviations = cross_check_streaming_indicators(prices)
+        for deviation in deviations.values():
+            self.assertLess(deviation, 1e-9)
+
+    def test_streaming_indicators_not_ready_until_enough_prices(self):
+        engine = StreamingIndicators()
+        moving_avg, rsi, macd, signal = engine.extend([100.0] * 6)
+        self.assertIsNone(moving_avg)
+        self.assertIsNone(rsi)
+        self.assertIsNone(macd)
+        self.assertIsNone(signal)
+
+        moving_avg, rsi, macd, signal = engine.extend([100.0] * 20)
+        self.assertAlmostEqual(moving_avg, 100.0)
+        self.assertEqual(rsi, 100.0)
+        self.assertEqual(macd, 0.0)
+        self.assertEqual(signal, 0.0)
+
+    def test_cross_check_detects_mismatch(self):
+        with patch("indicators.calculate_rsi", return_value=10.0):
+            with self.assertRaises(ValueError):
+                cross_check_streaming_indicators([float(p) for p in range(1, 40)])
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,89 @@
+import time
+import unittest
+from api_kraken import KrakenAPI
+from kraken_server import LocalKrakenServer, load_test
+from nonce import NonceGenerator
+from rate_limiter import KrakenRateLimiter
+
+class TestLocalKrakenServer(unittest.TestCase):
+    def setUp(self):
+        self.server = LocalKrakenServer().start()
+        self.addCleanup(self.server.stop)
+        self.api = KrakenAPI("test_key", "dGVzdF9zZWNyZXQ=", self.server.url, ticker_ttl=0,
+                             rate_limiter=KrakenRateLimiter(public_rate=1000, public_burst=1000), nonce_generator=NonceGenerator())
+        self.addCleanup(self.api.close)
+
+    def test_public_endpoints_parse_through_the_client(self):
+        self.assertAlmostEqual(self.api.get_price("XBTUSDT"), 50000.0, delta=500)
+        self.assertGreater(self.api.get_market_volume("XBTUSDT"), 0)
+
+        order_book = self.api.get_order_book("XBTUSDT")
+        self.assertEqual(len(order_book["asks"]), 100)
+        self.assertLess(float(order_book["bids"][0][0]), float(order_book["asks"][0][0]))
+
+        rows, last = self.api.get_ohlc("XBTUSDT")
+        self.assertEqual(len(rows), 720)
+        self.assertEqual(last, rows[-1][0])
+        rows, _ = self.api.get_ohlc("XBTUSDT", since=rows[-3][0])
+        self.assertEqual(len(rows), 2)
+
+    def test_unknown_pair_is_an_api_error(self):
+        self.assertIsNone(self.api.get_price("NOPE"))
+
+    def test_order_is_signed_stored_and_queryable(self):
+        self.api.execute_trade(0.001, "buy", pair="XBTUSDT")
+        self.assertEqual(list(self.server.orders), ["O00001-LOCAL-KRAKEN"])
+        order = self.server.orders["O00001-LOCAL-KRAKEN"]
+        self.assertEqual(order["descr"]["type"], "buy")
+        self.assertEqual(order["vol"], "0.001")
+
+        result = self.api._make_request("QueryOrders", "/0/private/", {"txid": "O00001-LOCAL-KRAKEN"}, is_private=True)
+        self.assertEqual(result["O00001-LOCAL-KRAKEN"]["status"], "open")
+        self.assertEqual(self.api._make_request("Balance", "/0/private/", is_private=True)["USDT"], "10000.0")
+
+    def test_bad_signature_and_stale_nonce_are_rejected(self):
+        status, reply = self.server.handle("POST", "/0/private/Balance", {"nonce": "1"}, "nonce=1",
+                                           {"API-Key": "test_key", "API-Sign": "bogus"})
+        self.assertEqual(reply["error"], ["EAPI:Invalid signature"])
+
+        self.assertIsNotNone(self.api._make_request("Balance", "/0/private/", is_private=True))
+        stale = KrakenAPI("test_key", "dGVzdF9zZWNyZXQ=", self.server.url, nonce_generator=lambda: "1", request_deadline=0.2)
+        self.addCleanup(stale.close)
+        self.assertIsNone(stale._make_request("Balance", "/0/private/", is_private=True))
+
+    def test_injected_temporary_error_is_retried(self):
+        self.server.add_fault("Ticker", error="EGeneral:Temporary lockout", count=1)
+        self.assertIsNotNone(self.api.get_price("XBTUSDT"))
+        self.assertEqual(self.server.requests["Ticker"], 2)
+
+    def test_injected_http_error_fails_once_the_deadline_passes(self):
+        self.server.add_fault("Depth", status=503)
+        self.assertIsNone(self.api._make_request("Depth", "/0/public/", {"pair": "XBTUSDT"}, deadline=0.3))
+        self.assertGreaterEqual(self.server.requests["Depth"], 1)
+
+    def test_injected_latency_delays_replies(self):
+        self.server.add_fault("Ticker", latency=0.2)
+        start = time.monotonic()
+        self.api.get_price("XBTUSDT")
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+
+    def test_private_counter_runs_out_like_krakens(self):
+        server = LocalKrakenServer(counter_limit=3, counter_decay=0.0).start()
+        self.addCleanup(server.stop)
+        api = KrakenAPI("test_key", "dGVzdF9zZWNyZXQ=", server.url, nonce_generator=NonceGenerator(),
+                        rate_limiter=KrakenRateLimiter(tier="pro"))
+        self.addCleanup(api.close)
+        results = [api._make_request("Balance", "/0/private/", is_private=True, deadline=0.2) for _ in range(4)]
+        self.assertEqual(sum(result is not None for result in results), 3)
+        self.assertIsNone(results[-1])
+
+    def test_load_test_reports_throughput_and_percentiles(self):
+        report = load_test(lambda: self.api.get_order_book("XBTUSDT"), requests=40, concurrency=4)
+        self.assertEqual(report["requests"], 40)
+        self.assertEqual(report["failures"], 0)
+        self.assertGreater(report["per_second"], 0)
+        self.assertLessEqual(report["p50_ms"], report["p99_ms"])
+        self.assertLessEqual(report["p99_ms"], report["max_ms"])
+
+if __name__ == '__main__':
+    unittest.main()
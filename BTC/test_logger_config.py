@@ -0,0 +1,128 @@
+import json
+import logging
+import os
+import queue
+import sys
+import tempfile
+import unittest
+from functools import partial
+from logging.handlers import QueueListener
+from unittest.mock import patch
+from termcolor import colored
+from logger_config import ConsoleFormatter, JsonLinesFormatter, ThrottleFilter, NonBlockingQueueHandler, logger, queue_handler, console_handler, log_handler
+
+def make_record(msg, *args, **extra):
+    record = logging.LogRecord("trading_bot", logging.INFO, "trading_strategy.py", 10, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+class CountingArg:
+    """Counts how often it is rendered into a message."""
+    def __init__(self):
+        self.renders = 0
+
+    def __str__(self):
+        self.renders += 1
+        return "arg"
+
+class TestFormatters(unittest.TestCase):
+    def test_json_line_has_fields_and_no_ansi_codes(self):
+        entry = json.loads(JsonLinesFormatter().format(make_record("\033[92mExecuted %s order\033[0m", "buy")))
+
+        self.assertEqual(entry["message"], "Executed buy order")
+        self.assertEqual(entry["level"], "INFO")
+        self.assertEqual(entry["logger"], "trading_bot")
+        self.assertEqual(entry["line"], 10)
+        self.assertTrue(entry["ts"].endswith("+00:00"))
+
+    def test_json_line_includes_exception_and_suppressed_count(self):
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord("trading_bot", logging.ERROR, "x.py", 1, "failed", (), sys.exc_info())
+        record.suppressed = 4
+
+        entry = json.loads(JsonLinesFormatter().format(record))
+
+        self.assertIn("ValueError: boom", entry["exception"])
+        self.assertEqual(entry["suppressed"], 4)
+
+    def test_console_colors_message_without_changing_the_record(self):
+        record = make_record("No trade signal detected: RSI %s", 50, color="yellow", suppressed=2)
+
+        with patch('logger_config.colored', partial(colored, force_color=True)):  # termcolor leaves output plain off a terminal
+            line = ConsoleFormatter('%(levelname)s - %(message)s').format(record)
+
+        self.assertIn("\033[33mNo trade signal detected: RSI 50 (2 similar lines suppressed)\033[0m", line)
+        self.assertEqual(record.getMessage(), "No trade signal detected: RSI 50")
+
+class TestThrottleFilter(unittest.TestCase):
+    def setUp(self):
+        self.clock = 1000.0
+        patch('logger_config.time.monotonic', lambda: self.clock).start()
+        self.addCleanup(patch.stopall)
+
+    def test_repeats_within_interval_are_dropped_and_counted(self):
+        throttle = ThrottleFilter()
+        passed = []
+        for rsi in range(5):
+            record = make_record("No trade signal detected: RSI %s", rsi, throttle=60)
+            if throttle.filter(record):
+                passed.append(record)
+            self.clock += 20
+
+        self.assertEqual([record.args for record in passed], [(0,), (3,)])
+        self.assertEqual(passed[1].suppressed, 2)
+
+    def test_unthrottled_and_distinct_templates_pass(self):
+        throttle = ThrottleFilter()
+        self.assertTrue(throttle.filter(make_record("Making %s request", "Ticker")))
+        self.assertTrue(throttle.filter(make_record("Making %s request", "Ticker")))
+        self.assertTrue(throttle.filter(make_record("first", throttle=60)))
+        self.assertTrue(throttle.filter(make_record("second", throttle=60)))
+
+class TestQueuePipeline(unittest.TestCase):
+    def test_enqueue_does_not_render_the_message(self):
+        handler = NonBlockingQueueHandler(queue.Queue())
+        arg = CountingArg()
+
+        handler.handle(make_record("value %s", arg))
+
+        self.assertEqual(arg.renders, 0)
+        self.assertEqual(handler.queue.get_nowait().getMessage(), "value arg")
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = NonBlockingQueueHandler(queue.Queue(1))
+        handler.handle(make_record("one"))
+        handler.handle(make_record("two"))
+        self.assertEqual(handler.dropped, 1)
+
+    def test_listener_writes_json_lines_file(self):
+        path = os.path.join(tempfile.mkdtemp(), "bot.log")
+        file_handler = logging.FileHandler(path)
+        file_handler.setFormatter(JsonLinesFormatter())
+        self.addCleanup(file_handler.close)
+        handler = NonBlockingQueueHandler(queue.Queue())
+        listener = QueueListener(handler.queue, file_handler)
+        listener.start()
+
+        for i in range(3):
+            handler.handle(make_record("cycle %d", i))
+        listener.stop()
+
+        with open(path) as f:
+            self.assertEqual([json.loads(line)["message"] for line in f], ["cycle 0", "cycle 1", "cycle 2"])
+
+    def test_bot_logger_only_enqueues(self):
+        self.assertIn(queue_handler, logger.handlers)
+        self.assertNotIn(console_handler, logger.handlers)
+        self.assertNotIn(log_handler, logger.handlers)
+
+        arg = CountingArg()
+        with patch.object(logger, 'handlers', [queue_handler]), patch.object(queue_handler, 'enqueue') as enqueue:
+            logger.info("MACD (%s) > Signal (%s)", arg, 0.5)
+        enqueue.assert_called_once()
+        self.assertEqual(arg.renders, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,15 +1,21 @@
 import unittest
 from unittest.mock import MagicMock, patch
 from main import portfolio_manager
+from config import PRICE_HISTORY_CAPACITY
 
 class TestMain(unittest.TestCase):
     def setUp(self):
         # Mock necessary imports
-        self.mock_kraken_api = patch('main.kraken_api').start()
+        self.mock_kraken_api = patch('runner.kraken_api').start()
         self.mock_logger = patch('main.logger').start()
+        # The scheduled loop shared with runner.py logs cycle errors there
+        self.mock_runner_logger = patch('runner.logger').start()
         self.mock_rebalance_portfolio = patch('main.rebalance_portfolio').start()
         self.mock_trading_strategy = patch('main.trading_strategy').start()
-        self.mock_time = patch('main.time').start()
+        self.mock_scheduler = patch('main.CycleScheduler').start().return_value
+        self.mock_load_candle_history = patch('main.load_candle_history').start()
+        self.mock_start_news_service = patch('main.start_news_service').start()
+        self.mock_open_journal = patch('main.open_journal').start()
 
         self.addCleanup(patch.stopall)
 
@@ -51,7 +57,7 @@ class TestMain(unittest.TestCase):
     def test_portfolio_manager_execution(self):
         # Setup
         self.mock_kraken_api.get_historical_prices.return_value = [50000, 49000, 48000]
-        self.mock_time.sleep.side_effect = KeyboardInterrupt  # Simulate one loop
+        self.mock_scheduler.wait.side_effect = KeyboardInterrupt  # Simulate one loop
 
         # Execute
         try:
@@ -65,10 +71,22 @@ class TestMain(unittest.TestCase):
         self.mock_logger.info.assert_any_call("Rebalancing portfolio...")
         self.mock_logger.info.assert_any_call("Executing trading strategy...")
 
+    def test_portfolio_manager_uses_the_shared_wiring(self):
+        self.mock_scheduler.wait.side_effect = KeyboardInterrupt  # Simulate one loop
+
+        try:
+            portfolio_manager()
+        except KeyboardInterrupt:
+            pass
+
+        self.mock_load_candle_history.assert_called_once_with("XBTUSDT", PRICE_HISTORY_CAPACITY)
+        self.mock_trading_strategy.assert_called_once_with(self.mock_load_candle_history.return_value)
+        self.assertEqual(list(self.mock_open_journal.call_args[0][0]), ["XBTUSDT"])
+
     def test_error_handling_in_portfolio_manager(self):
         # Setup
         self.mock_rebalance_portfolio.side_effect = Exception("Rebalance Error")
-        self.mock_time.sleep.side_effect = KeyboardInterrupt  # Simulate one loop
+        self.mock_scheduler.wait.side_effect = KeyboardInterrupt  # Simulate one loop
 
         # Execute
         try:
@@ -77,8 +95,8 @@ class TestMain(unittest.TestCase):
             pass
 
         # Assert
-        self.mock_logger.error.assert_any_call("Error in portfolio manager: Rebalance Error")
-        self.mock_time.sleep.assert_called_with(60)  # Sleep before retrying
+        self.mock_runner_logger.error.assert_any_call("Error in portfolio manager: Rebalance Error")
+        self.mock_scheduler.wait.assert_called_once()  # Retry on the next tick
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,164 @@
+import asyncio
+import json
+import unittest
+from websockets.asyncio.server import serve
+from market_data import KrakenMarketDataFeed, ReplayServer
+from price_history import PriceRingBuffer
+
+def ticker_message(price):
+    return json.dumps([340, {"a": [str(price + 1), 1, "1.0"], "b": [str(price - 1), 1, "1.0"], "c": [str(price), "0.1"], "v": ["10", "200"]}, "ticker", "XBT/USDT"])
+
+def trade_message(*prices):
+    return json.dumps([337, [[str(price), "0.01", "1700000000.1", "b", "l", ""] for price in prices], "trade", "XBT/USDT"])
+
+def ohlc_message(close):
+    return json.dumps([42, ["1700000000.0", "1700000060.0", "1.0", "2.0", "0.5", str(close), "1.5", "3.0", 4], "ohlc-1", "XBT/USDT"])
+
+HEARTBEAT = json.dumps({"event": "heartbeat"})
+
+class TestKrakenMarketDataFeed(unittest.TestCase):
+    def test_subscription_messages_use_websocket_pair_names(self):
+        feed = KrakenMarketDataFeed(["XBTUSDT", "XETHZUSDT"], ohlc_interval=5)
+        messages = feed.subscription_messages()
+        self.assertEqual([m["subscription"]["name"] for m in messages], ["ticker", "trade", "ohlc"])
+        self.assertEqual(messages[0]["pair"], ["XBT/USDT", "ETH/USDT"])
+        self.assertEqual(messages[2]["subscription"]["interval"], 5)
+
+    def test_handle_message_pushes_prices_from_price_channel(self):
+        feed = KrakenMarketDataFeed(["XBTUSDT"], price_channel="trade")
+        history = PriceRingBuffer(capacity=10)
+        feed.attach_price_history("XBTUSDT", history)
+        candles = []
+        feed.add_listener("ohlc", lambda pair, candle: candles.append((pair, candle[5])))
+
+        self.assertIsNone(feed.handle_message(HEARTBEAT))
+        self.assertEqual(feed.handle_message(ticker_message(50000)), "ticker")
+        self.assertEqual(feed.handle_message(trade_message(50001, 50002)), "trade")
+        self.assertEqual(feed.handle_message(ohlc_message(50003)), "ohlc")
+
+        self.assertEqual(list(history.view()), [50001.0, 50002.0])
+        self.assertEqual(feed.last_price["XBTUSDT"], 50003.0)
+        self.assertEqual(feed.tickers["XBTUSDT"]["c"][0], "50000")
+        self.assertEqual(candles, [("XBTUSDT", "50003")])
+        self.assertFalse(feed.is_stale())
+
+    def test_streams_from_replay_server(self):
+        messages = [ticker_message(50000), trade_message(50001), HEARTBEAT, trade_message(50002, 50003)]
+        history = PriceRingBuffer(capacity=10)
+
+        async def scenario():
+            async with ReplayServer(messages) as server:
+                feed = KrakenMarketDataFeed(["XBTUSDT"], url=server.url, price_channel="trade")
+                feed.attach_price_history("XBTUSDT", history)
+                await asyncio.wait_for(feed.run(max_messages=len(messages) + 1), timeout=5)
+                return feed
+
+        feed = asyncio.run(scenario())
+        self.assertEqual(list(history.view()), [50001.0, 50002.0, 50003.0])
+        self.assertEqual(feed.reconnects, 0)
+
+    def test_start_streams_in_a_background_thread(self):
+        messages = [ticker_message(50000)]
+
+        async def scenario():
+            async with ReplayServer(messages, repeat=100, rate=50) as server:
+                feed = KrakenMarketDataFeed(["XBTUSDT"], url=server.url, max_queue=16).start()
+                while feed.price("XBTUSDT") is None:
+                    await asyncio.sleep(0.01)
+                feed.stop()
+                await asyncio.to_thread(feed._thread.join, 5)
+                return feed
+
+        feed = asyncio.run(asyncio.wait_for(scenario(), timeout=10))
+        self.assertEqual(feed.price("XBTUSDT"), 50000.0)
+        self.assertFalse(feed._thread.is_alive())
+
+    def test_bad_messages_and_failing_listeners_do_not_stop_the_feed(self):
+        messages = ["not json", json.dumps([1, {}, "ticker", "XBT/USDT"]), ticker_message(50000), ticker_message(50001)]
+        failures = []
+
+        def listener(pair, payload):
+            if not failures:
+                failures.append(pair)
+                raise ValueError("listener failed")
+
+        async def scenario():
+            async with ReplayServer(messages) as server:
+                feed = KrakenMarketDataFeed(["XBTUSDT"], url=server.url)
+                feed.add_listener("ticker", listener)
+                await asyncio.wait_for(feed.run(max_messages=len(messages) + 1), timeout=5)
+                return feed
+
+        feed = asyncio.run(scenario())
+        self.assertEqual(feed.message_errors, 3)
+        self.assertEqual(feed.last_price["XBTUSDT"], 50001.0)
+        self.assertEqual(feed.reconnects, 0)
+
+    def test_reconnects_after_a_failed_handshake(self):
+        attempts = []
+
+        def process_request(connection, request):
+            attempts.append(request.path)
+            if len(attempts) == 1:
+                return connection.respond(503, "Service Unavailable")
+
+        async def handler(websocket):
+            await websocket.recv()
+            await websocket.send(ticker_message(50000))
+            await websocket.wait_closed()
+
+        async def scenario():
+            async with serve(handler, "127.0.0.1", 0, process_request=process_request) as server:
+                url = f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+                feed = KrakenMarketDataFeed(["XBTUSDT"], url=url, backoff_min=0.01, backoff_max=0.02)
+                await asyncio.wait_for(feed.run(max_messages=1), timeout=5)
+                return feed
+
+        feed = asyncio.run(scenario())
+        self.assertEqual(feed.reconnects, 1)
+        self.assertEqual(feed.last_price["XBTUSDT"], 50000.0)
+
+    def test_reconnects_when_connection_closes(self):
+        messages = [trade_message(50000)]
+
+        async def scenario():
+            async with ReplayServer(messages) as server:
+                feed = KrakenMarketDataFeed(["XBTUSDT"], url=server.url, backoff_min=0.01, backoff_max=0.05)
+                await asyncio.wait_for(feed.run(max_messages=6), timeout=5)
+                return feed, server.connections
+
+        feed, connections = asyncio.run(scenario())
+        self.assertGreaterEqual(feed.reconnects, 2)
+        self.assertEqual(connections, feed.reconnects + 1)
+
+    def test_reconnects_when_feed_goes_stale(self):
+        messages = [trade_message(50000), trade_message(50001)]
+
+        async def scenario():
+            async with ReplayServer(messages, rate=2) as server:
+                feed = KrakenMarketDataFeed(["XBTUSDT"], url=server.url, stale_after=0.1, backoff_min=0.01, backoff_max=0.02)
+                await asyncio.wait_for(feed.run(max_messages=4), timeout=5)
+                return feed
+
+        feed = asyncio.run(scenario())
+        self.assertGreaterEqual(feed.reconnects, 1)
+
+    def test_replay_delivers_every_message(self):
+        count = 20000
+        messages = [trade_message(50000 + i % 100) for i in range(count)]
+        history = PriceRingBuffer(capacity=1000)
+
+        async def scenario():
+            async with ReplayServer(messages) as server:
+                feed = KrakenMarketDataFeed(["XBTUSDT"], url=server.url, price_channel="trade")
+                feed.attach_price_history("XBTUSDT", history)
+                await asyncio.wait_for(feed.run(max_messages=count + 1), timeout=30)
+                return feed
+
+        feed = asyncio.run(scenario())
+        self.assertEqual(feed.messages_received, count + 1)
+        self.assertEqual(len(history), 1000)
+        self.assertEqual(history.latest, 50000.0 + (count - 1) % 100)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import time
+import unittest
+from unittest.mock import patch
+from news_refresher import NewsRefresher
+
+ARTICLES = [{"title": "Bitcoin rallies", "description": "Prices rise"}]
+
+class TestNewsRefresher(unittest.TestCase):
+    def setUp(self):
+        self.mock_fetch_latest_news = patch('news_refresher.fetch_latest_news').start()
+        self.mock_calculate_sentiment = patch('news_refresher.calculate_sentiment').start()
+        self.addCleanup(patch.stopall)
+
+    def test_refresh_updates_snapshot(self):
+        self.mock_fetch_latest_news.return_value = ARTICLES
+        self.mock_calculate_sentiment.return_value = 0.4
+        refresher = NewsRefresher("bitcoin", top_n=5)
+
+        self.assertEqual(refresher.snapshot(), (None, 0.0))
+        self.assertTrue(refresher.refresh())
+
+        self.assertEqual(refresher.snapshot(), (ARTICLES, 0.4))
+        self.mock_fetch_latest_news.assert_called_once_with(top_n=5, query="bitcoin", use_cache=False)
+        self.assertIsNotNone(refresher.age)
+
+    def test_failed_refresh_keeps_last_good_result_and_backs_off(self):
+        self.mock_fetch_latest_news.return_value = ARTICLES
+        self.mock_calculate_sentiment.return_value = 0.4
+        refresher = NewsRefresher(interval=600, backoff_min=10, backoff_max=40)
+        refresher.refresh()
+
+        self.mock_fetch_latest_news.side_effect = Exception("timeout")
+        for expected_max in (10, 20, 40, 40):
+            self.assertFalse(refresher.refresh())
+            self.assertEqual(refresher.snapshot(), (ARTICLES, 0.4))
+            delay = refresher.next_delay()
+            self.assertGreaterEqual(delay, expected_max / 2)
+            self.assertLessEqual(delay, expected_max)
+
+        self.mock_fetch_latest_news.side_effect = None
+        self.assertTrue(refresher.refresh())
+        self.assertEqual(refresher.next_delay(), 600)
+
+    def test_background_thread_refreshes_on_schedule(self):
+        self.mock_fetch_latest_news.return_value = ARTICLES
+        self.mock_calculate_sentiment.return_value = 0.2
+        refresher = NewsRefresher(interval=0.05).start()
+        self.addCleanup(refresher.stop, 1)
+
+        # Warmed synchronously before the thread takes over
+        self.assertEqual(refresher.snapshot(), (ARTICLES, 0.2))
+        time.sleep(0.3)
+        self.assertGreaterEqual(self.mock_fetch_latest_news.call_count, 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from news_service import NewsService, RemoteNewsView, combined_query, tag_article
+
+QUERIES = {"XBTUSDT": "bitcoin", "XETHZUSDT": "ethereum", "XRPUSDT": "Ripple AND XRP -recipe"}
+KEYWORDS = {"XBTUSDT": ["bitcoin", "btc"], "XETHZUSDT": ["ethereum", "eth"], "XRPUSDT": ["ripple", "xrp"]}
+
+ARTICLES = [
+    {"title": "Bitcoin and Ethereum rally", "description": "Crypto markets rise"},
+    {"title": "BTC slips", "description": "Traders cautious"},
+    {"title": "XRP lawsuit news", "description": "Ripple responds"},
+    {"title": "Stock market update", "description": "Nothing about crypto"},
+]
+SCORES = {"Bitcoin and Ethereum rally": 0.6, "BTC slips": -0.2, "XRP lawsuit news": 0.1}
+
+class TestNewsService(unittest.TestCase):
+    def setUp(self):
+        self.mock_fetch_latest_news = patch('news_service.fetch_latest_news').start()
+        self.mock_score_article = patch('news_service.score_article', side_effect=lambda article: SCORES[article["title"]]).start()
+        self.addCleanup(patch.stopall)
+        self.mock_fetch_latest_news.return_value = ARTICLES
+        self.service = NewsService(QUERIES, KEYWORDS, daily_quota=2)
+
+    def test_combined_query_and_tagging(self):
+        self.assertEqual(combined_query(QUERIES), "(bitcoin) OR (ethereum) OR (Ripple AND XRP -recipe)")
+        self.assertEqual(tag_article(ARTICLES[0], KEYWORDS), ["XBTUSDT", "XETHZUSDT"])
+        self.assertEqual(tag_article({"title": "Ethernet cables", "description": None}, KEYWORDS), [])
+
+    def test_refresh_scores_each_article_once_and_serves_per_asset(self):
+        self.assertTrue(self.service.refresh())
+
+        self.mock_fetch_latest_news.assert_called_once_with(top_n=100, query=self.service.query, use_cache=False)
+        self.assertEqual(self.mock_score_article.call_count, 3)
+        self.assertAlmostEqual(self.service.sentiment("XBTUSDT"), 0.2)
+        self.assertAlmostEqual(self.service.sentiment("XETHZUSDT"), 0.6)
+        articles, score = self.service.view("XRPUSDT").snapshot()
+        self.assertEqual(articles, [ARTICLES[2]])
+        self.assertAlmostEqual(score, 0.1)
+        self.assertEqual(self.service.snapshot("UNKNOWN"), (None, 0.0))
+
+    def test_quota_stops_refreshes_and_delays_until_reset(self):
+        self.assertEqual(self.service.next_delay(), 24 * 3600 / 2)
+        self.assertTrue(self.service.refresh())
+        self.assertTrue(self.service.refresh())
+        self.assertEqual(self.service.quota_remaining, 0)
+
+        self.assertFalse(self.service.refresh())
+        self.assertEqual(self.mock_fetch_latest_news.call_count, 2)
+        self.assertAlmostEqual(self.service.sentiment("XBTUSDT"), 0.2)
+        self.assertLessEqual(self.service.next_delay(), 24 * 3600 + 1)
+
+    def test_remote_view_reads_sentiment_over_socket(self):
+        self.service.refresh()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "news.sock")
+            self.service.serve(path)
+            self.addCleanup(self.service.stop)
+
+            view = RemoteNewsView(path, "XETHZUSDT")
+            self.assertEqual(view.snapshot(), (None, 0.6))
+            self.assertEqual(view.fetch()["articles"], 1)
+
+            self.service.stop()
+            self.assertEqual(view.snapshot(), (None, 0.6))  # Last known score survives an outage
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import unittest
+from nonce import NonceGenerator
+
+def draw_nonces(path, count, queue):
+    generator = NonceGenerator(path)
+    queue.put([generator.next() for _ in range(count)])
+
+class TestNonceGenerator(unittest.TestCase):
+    def test_nonces_are_unique_and_increasing_across_threads(self):
+        generator = NonceGenerator()
+        results = [[] for _ in range(8)]
+
+        def draw(out):
+            for _ in range(500):
+                out.append(generator.next())
+
+        threads = [threading.Thread(target=draw, args=(out,)) for out in results]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for out in results:
+            self.assertEqual(out, sorted(out))
+        everything = [nonce for out in results for nonce in out]
+        self.assertEqual(len(set(everything)), len(everything))
+
+    def test_wall_clock_step_backwards_does_not_repeat_nonces(self):
+        generator = NonceGenerator()
+        before = generator.next()
+        generator._wall_start -= 3600  # As if the clock had been set back an hour
+        self.assertGreater(generator.next(), before)
+
+    def test_nonce_is_close_to_wall_clock_in_microseconds(self):
+        self.assertAlmostEqual(NonceGenerator().next() / 1_000_000, time.time(), delta=1)
+
+    def test_nonce_file_is_shared_between_processes(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "nonce")
+            context = multiprocessing.get_context("fork")
+            queue = context.Queue()
+            processes = [context.Process(target=draw_nonces, args=(path, 200, queue)) for _ in range(3)]
+            for process in processes:
+                process.start()
+            everything = [nonce for _ in processes for nonce in queue.get(timeout=10)]
+            for process in processes:
+                process.join(5)
+
+            self.assertEqual(len(set(everything)), len(everything))
+            with open(path) as f:
+                self.assertEqual(int(f.read()), max(everything))
+            self.assertGreater(NonceGenerator(path).next(), max(everything))
+
+if __name__ == '__main__':
+    unittest.main()
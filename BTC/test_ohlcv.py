@@ -0,0 +1,40 @@
+import unittest
+import numpy as np
+from ohlcv import OHLCV
+
+ROWS = [
+    [1700000000, "100.0", "110.0", "95.0", "105.0", "103.0", "2.5", 12],
+    [1700003600, "105.0", "112.0", "101.0", "111.0", "108.0", "1.5", 7],
+    [1700007200, "111.0", "115.0", "109.0", "110.0", "112.0", "3.0", 20],
+]
+
+class TestOHLCV(unittest.TestCase):
+    def test_from_kraken_parses_columns(self):
+        candles = OHLCV.from_kraken(ROWS)
+        self.assertEqual(len(candles), 3)
+        self.assertEqual(candles.time.dtype, np.int64)
+        self.assertEqual(candles.count.dtype, np.int64)
+        self.assertEqual(candles.close.dtype, np.float64)
+        np.testing.assert_array_equal(candles.time, [1700000000, 1700003600, 1700007200])
+        np.testing.assert_array_equal(candles.close, [105.0, 111.0, 110.0])
+        np.testing.assert_array_equal(candles.volume, [2.5, 1.5, 3.0])
+        np.testing.assert_array_equal(candles.count, [12, 7, 20])
+
+    def test_empty_payload(self):
+        candles = OHLCV.from_kraken([])
+        self.assertEqual(len(candles), 0)
+        self.assertEqual(candles.time.dtype, np.int64)
+
+    def test_tail_returns_views(self):
+        candles = OHLCV.from_kraken(ROWS)
+        tail = candles.tail(2)
+        np.testing.assert_array_equal(tail.high, [112.0, 115.0])
+        self.assertTrue(np.shares_memory(tail.close, candles.close))
+        self.assertIs(candles.tail(10), candles)
+
+    def test_round_trip_to_rows(self):
+        rows = OHLCV.from_kraken(ROWS).to_rows()
+        self.assertEqual(rows[1], [1700003600, 105.0, 112.0, 101.0, 111.0, 108.0, 1.5, 7])
+
+if __name__ == "__main__":
+    unittest.main()
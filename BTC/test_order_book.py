@@ -0,0 +1,122 @@
+import asyncio
+import json
+import threading
+import unittest
+import zlib
+from order_book import LocalOrderBook
+from market_data import KrakenMarketDataFeed, ReplayServer
+
+SNAPSHOT = {
+    "as": [["50001.00000", "0.50000000", "1700000000.1"], ["50002.50000", "1.00000000", "1700000000.2"]],
+    "bs": [["50000.00000", "0.25000000", "1700000000.3"], ["49999.10000", "2.00000000", "1700000000.4"]],
+}
+
+class TestLocalOrderBook(unittest.TestCase):
+    def setUp(self):
+        self.book = LocalOrderBook("XBTUSDT", depth=10)
+        self.book.apply_snapshot(SNAPSHOT)
+
+    def test_snapshot_sets_best_levels(self):
+        self.assertTrue(self.book.is_synced)
+        self.assertEqual(self.book.best_ask, 50001.0)
+        self.assertEqual(self.book.best_bid, 50000.0)
+        self.assertAlmostEqual(self.book.depth_at("asks", 2), 1.5)
+        self.assertEqual(self.book.to_dict(), {"asks": [["50001.00000", "0.50000000"]], "bids": [["50000.00000", "0.25000000"]]})
+
+    def test_checksum_matches_kraken_format(self):
+        expected = zlib.crc32(b"500010000050000000" b"5000250000100000000" b"500000000025000000" b"4999910000200000000")
+        self.assertEqual(self.book.checksum(), expected)
+
+    def test_updates_insert_and_delete_levels(self):
+        expected = LocalOrderBook("XBTUSDT")
+        expected.apply_snapshot({
+            "as": [["50000.50000", "0.10000000"], ["50002.50000", "1.00000000"]],
+            "bs": [["50000.20000", "0.30000000"], ["50000.00000", "0.25000000"], ["49999.10000", "2.00000000"]],
+        })
+        asks = {"a": [["50000.50000", "0.10000000", "1700000001.0"], ["50001.00000", "0.00000000", "1700000001.0"]]}
+        bids = {"b": [["50000.20000", "0.30000000", "1700000001.0"]], "c": str(expected.checksum())}
+
+        self.assertTrue(self.book.apply_update([asks, bids]))
+        self.assertEqual(self.book.best_ask, 50000.5)
+        self.assertEqual(self.book.best_bid, 50000.2)
+        self.assertEqual(len(self.book.asks), 2)
+        self.assertEqual(len(self.book.bids), 3)
+
+    def test_update_with_valid_checksum_stays_synced(self):
+        self.book.asks.update("50003.00000", "1.00000000")
+        checksum = self.book.checksum()
+        self.book.apply_snapshot(SNAPSHOT)
+
+        self.assertTrue(self.book.apply_update([{"a": [["50003.00000", "1.00000000", "1700000002.0"]], "c": str(checksum)}]))
+        self.assertTrue(self.book.is_synced)
+
+    def test_checksum_mismatch_marks_book_out_of_sync(self):
+        self.assertFalse(self.book.apply_update([{"b": [["49999.10000", "0.00000000", "1"]], "c": "12345"}]))
+        self.assertFalse(self.book.is_synced)
+        self.assertEqual(self.book.checksum_failures, 1)
+        self.assertIsNone(self.book.to_dict())
+
+    def test_levels_beyond_depth_are_truncated(self):
+        book = LocalOrderBook("XBTUSDT", depth=2)
+        book.apply_snapshot(SNAPSHOT)
+        book.apply_update([{"a": [["50000.90000", "1.00000000", "1"]]}])
+        self.assertEqual(len(book.asks), 2)
+        self.assertEqual(book.asks.level(1), (50001.0, 0.5))
+
+    def test_readers_never_see_a_half_applied_book(self):
+        errors = []
+        done = threading.Event()
+
+        def read():
+            while not done.is_set():
+                try:
+                    book = self.book.to_dict(levels=2)
+                    if book is not None and not (book["asks"] and book["bids"]):
+                        errors.append(book)
+                except Exception as e:
+                    errors.append(e)
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        for i in range(2000):
+            self.book.apply_snapshot(SNAPSHOT)
+            self.book.apply_update([{"a": [["50001.00000", "0.00000000", "1"]], "b": [["49998.00000", "1.00000000", "1"]]}])
+        done.set()
+        reader.join()
+
+        self.assertEqual(errors, [])
+
+class TestFeedOrderBook(unittest.TestCase):
+    def test_feed_resubscribes_on_checksum_mismatch(self):
+        feed = KrakenMarketDataFeed(["XBTUSDT"], channels=("book",), book_depth=10)
+        feed.handle_message(json.dumps([10, SNAPSHOT, "book-10", "XBT/USDT"]))
+        self.assertEqual(feed.order_books["XBTUSDT"].best_ask, 50001.0)
+
+        feed.handle_message(json.dumps([10, {"a": [["50001.00000", "0.40000000", "1"]]}, {"b": [["50000.00000", "0.20000000", "1"]], "c": "1"}, "book-10", "XBT/USDT"]))
+        # Further updates are ignored until a new snapshot arrives
+        feed.handle_message(json.dumps([10, {"a": [["50001.00000", "0.30000000", "1"]], "c": "2"}, "book-10", "XBT/USDT"]))
+
+        messages = feed.book_resubscription_messages()
+        self.assertEqual([m["event"] for m in messages], ["unsubscribe", "subscribe"])
+        self.assertEqual(messages[1]["subscription"], {"name": "book", "depth": 10})
+        self.assertEqual(feed.book_resubscription_messages(), [])
+
+        feed.handle_message(json.dumps([10, SNAPSHOT, "book-10", "XBT/USDT"]))
+        self.assertTrue(feed.order_books["XBTUSDT"].is_synced)
+
+    def test_book_is_out_of_sync_after_a_disconnect(self):
+        snapshot = json.dumps([10, SNAPSHOT, "book-10", "XBT/USDT"])
+
+        async def scenario():
+            async with ReplayServer([snapshot]) as server:
+                feed = KrakenMarketDataFeed(["XBTUSDT"], url=server.url, channels=("book",), backoff_min=0.01, backoff_max=0.02)
+                # Status and snapshot, then the server closes; stop on the next connection's status
+                await asyncio.wait_for(feed.run(max_messages=3), timeout=5)
+                return feed
+
+        feed = asyncio.run(scenario())
+        self.assertEqual(feed.reconnects, 1)
+        self.assertIsNone(feed.order_books["XBTUSDT"].to_dict())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+import numpy as np
+from price_history import PriceRingBuffer
+
+class TestPriceRingBuffer(unittest.TestCase):
+    def test_view_returns_latest_prices_in_order(self):
+        buffer = PriceRingBuffer(capacity=5)
+        buffer.extend([1, 2, 3, 4, 5, 6, 7])
+        self.assertEqual(len(buffer), 5)
+        np.testing.assert_array_equal(buffer.view(), [3, 4, 5, 6, 7])
+        np.testing.assert_array_equal(buffer.view(3), [5, 6, 7])
+        self.assertEqual(buffer.latest, 7.0)
+
+    def test_view_is_zero_copy_and_read_only(self):
+        buffer = PriceRingBuffer(capacity=4)
+        buffer.extend([1, 2, 3])
+        window = buffer.view()
+        self.assertTrue(window.flags['C_CONTIGUOUS'])
+        self.assertTrue(np.shares_memory(window, buffer._data))
+        with self.assertRaises(ValueError):
+            window[0] = 10
+
+    def test_append_wraps_without_allocating(self):
+        buffer = PriceRingBuffer(capacity=3, dtype="float32")
+        storage = buffer._data
+        for price in range(10):
+            buffer.append(price)
+            np.testing.assert_array_equal(buffer.view(), np.arange(max(0, price - 2), price + 1))
+        self.assertIs(buffer._data, storage)
+        self.assertEqual(buffer.view().dtype, np.float32)
+
+    def test_empty_buffer(self):
+        buffer = PriceRingBuffer(capacity=3)
+        self.assertEqual(len(buffer), 0)
+        self.assertIsNone(buffer.latest)
+        self.assertEqual(buffer.view().size, 0)
+
+    def test_invalid_capacity(self):
+        with self.assertRaises(ValueError):
+            PriceRingBuffer(capacity=0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import threading
+import time
+import unittest
+from rate_limiter import KrakenRateLimiter, DecayingCounter, PRIORITY_ORDER, PRIORITY_MARKET_DATA
+
+class TestDecayingCounter(unittest.TestCase):
+    def test_counter_decays_and_reports_wait(self):
+        counter = DecayingCounter(limit=2, decay=10.0)
+        counter.add(2)
+        self.assertAlmostEqual(counter.wait_time(1), 0.1, delta=0.02)
+        time.sleep(0.15)
+        self.assertEqual(counter.wait_time(1), 0.0)
+        self.assertLess(counter.value, 1.0)
+
+class TestKrakenRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.limiter = KrakenRateLimiter("starter")
+
+    def test_classify_endpoints(self):
+        self.assertEqual(self.limiter.classify("Ticker", False), ("public", 1, PRIORITY_MARKET_DATA))
+        self.assertEqual(self.limiter.classify("AddOrder", True), ("trading", 1, PRIORITY_ORDER))
+        self.assertEqual(self.limiter.classify("Ledgers", True)[:2], ("private", 2))
+        self.assertEqual(self.limiter.classify("Balance", True)[:2], ("private", 1))
+
+    def test_budget_is_spent_and_exposed(self):
+        for _ in range(5):
+            self.assertTrue(self.limiter.acquire("Balance", True))
+        self.assertTrue(self.limiter.acquire("Ledgers", True))
+        self.assertAlmostEqual(self.limiter.remaining("private"), 8, delta=0.1)
+        stats = self.limiter.stats()
+        self.assertEqual(stats["granted"], 6)
+        self.assertEqual(stats["remaining"]["trading"], 60)
+
+    def test_acquire_times_out_when_counter_is_full(self):
+        self.limiter.penalize("Balance", True)
+        self.assertFalse(self.limiter.acquire("Balance", True, timeout=0.05))
+        self.assertEqual(self.limiter.stats()["timeouts"], 1)
+        self.assertEqual(self.limiter.stats()["rate_limit_errors"], 1)
+        # Orders use their own counter and are not held back
+        self.assertTrue(self.limiter.acquire("AddOrder", True, timeout=0))
+
+    def test_higher_priority_requests_are_served_first(self):
+        self.limiter.counters["public"] = DecayingCounter(limit=1, decay=20.0)
+        self.limiter.acquire("Ticker", False)
+        served = []
+
+        def request(name, priority):
+            self.limiter.acquire("Ticker", False, priority=priority, timeout=2)
+            served.append(name)
+
+        low = [threading.Thread(target=request, args=(f"poll-{i}", PRIORITY_MARKET_DATA)) for i in range(3)]
+        for thread in low:
+            thread.start()
+        time.sleep(0.01)
+        urgent = threading.Thread(target=request, args=("urgent", PRIORITY_ORDER))
+        urgent.start()
+        for thread in low + [urgent]:
+            thread.join(2)
+
+        self.assertEqual(len(served), 4)
+        self.assertLessEqual(served.index("urgent"), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import time
+import unittest
+from unittest.mock import MagicMock
+import requests
+from resilience import (CircuitBreaker, classify_api_errors, classify_exception, is_retryable, backoff_delay,
+                        ERROR_NETWORK, ERROR_SERVER, ERROR_TEMPORARY, ERROR_INVALID_NONCE, ERROR_RATE_LIMIT, ERROR_API)
+
+def http_error(status):
+    response = MagicMock(status_code=status)
+    return requests.HTTPError(f"{status}", response=response)
+
+class TestClassification(unittest.TestCase):
+    def test_kraken_errors(self):
+        self.assertEqual(classify_api_errors(["EGeneral:Temporary lockout"]), ERROR_TEMPORARY)
+        self.assertEqual(classify_api_errors(["EService:Unavailable"]), ERROR_TEMPORARY)
+        self.assertEqual(classify_api_errors(["EAPI:Invalid nonce"]), ERROR_INVALID_NONCE)
+        self.assertEqual(classify_api_errors(["EAPI:Rate limit exceeded"]), ERROR_RATE_LIMIT)
+        self.assertEqual(classify_api_errors(["EOrder:Insufficient funds"]), ERROR_API)
+
+    def test_http_errors(self):
+        self.assertEqual(classify_exception(requests.ConnectionError()), ERROR_NETWORK)
+        self.assertEqual(classify_exception(requests.ReadTimeout()), ERROR_NETWORK)
+        self.assertEqual(classify_exception(http_error(502)), ERROR_SERVER)
+        self.assertEqual(classify_exception(http_error(429)), ERROR_RATE_LIMIT)
+        self.assertEqual(classify_exception(http_error(403)), ERROR_API)
+
+    def test_only_safe_calls_are_retried(self):
+        self.assertTrue(is_retryable(ERROR_NETWORK, "Ticker", False))
+        self.assertTrue(is_retryable(ERROR_SERVER, "Balance", True))
+        self.assertFalse(is_retryable(ERROR_NETWORK, "AddOrder", True))  # The order may have been placed
+        self.assertTrue(is_retryable(ERROR_INVALID_NONCE, "AddOrder", True))  # Rejected before execution
+        self.assertFalse(is_retryable(ERROR_API, "Ticker", False))
+
+    def test_backoff_is_jittered_and_capped(self):
+        delays = [backoff_delay(10, base=0.25, cap=1.0) for _ in range(50)]
+        self.assertTrue(all(0 <= delay <= 1.0 for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_threshold_and_probes_after_reset(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+        breaker.record_failure("Ticker")
+        self.assertTrue(breaker.allow("Ticker"))
+        breaker.record_failure("Ticker")
+        self.assertEqual(breaker.state("Ticker"), "open")
+        self.assertFalse(breaker.allow("Ticker"))
+        self.assertTrue(breaker.allow("Depth"))  # Breakers are per endpoint
+
+        time.sleep(0.06)
+        self.assertEqual(breaker.state("Ticker"), "half_open")
+        self.assertTrue(breaker.allow("Ticker"))
+        self.assertFalse(breaker.allow("Ticker"))  # Only one trial call
+        breaker.record_failure("Ticker")
+        self.assertEqual(breaker.state("Ticker"), "open")
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow("Ticker"))
+        breaker.record_success("Ticker")
+        self.assertEqual(breaker.state("Ticker"), "closed")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+from runner import MultiPairRunner, load_candle_history
+from scheduler import CycleScheduler, TRIGGER_PRICE_MOVE
+
+PAIRS = {"XBTUSDT": 0.01, "XETHZUSDT": 0.5, "XRPUSDT": 100.0}
+
+def ticker(price, volume):
+    return {"c": [str(price), "1"], "v": ["1", str(volume)]}
+
+class TestMultiPairRunner(unittest.TestCase):
+    def setUp(self):
+        self.mock_kraken_api = patch('runner.kraken_api').start()
+        self.addCleanup(patch.stopall)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.runner = MultiPairRunner(PAIRS, candle_store_path=os.path.join(self.temp_dir.name, "candles.db"))
+
+    def test_strategies_are_configured_per_pair(self):
+        strategy = self.runner.strategies["XETHZUSDT"]
+        self.assertEqual(strategy.pair, "XETHZUSDT")
+        self.assertEqual(strategy.news_query, "ethereum")
+        self.assertAlmostEqual(sum(strategy.portfolio.portfolio.values()), 0.5)
+
+    def test_run_cycle_uses_one_ticker_request_for_all_pairs(self):
+        self.mock_kraken_api.get_ticker.return_value = {
+            "XBTUSDT": ticker(50000, 300),
+            "XETHZUSDT": ticker(3000, 5000),
+            "XRPUSDT": ticker(0.5, 1000000),
+        }
+        evaluated = {}
+        for pair, strategy in self.runner.strategies.items():
+            patch.object(strategy, 'update_sentiment').start()
+            patch.object(strategy, 'evaluate', side_effect=lambda price, market_volume, pair=pair: evaluated.update({pair: (price, market_volume)})).start()
+
+        self.runner.run_cycle()
+
+        self.mock_kraken_api.get_ticker.assert_called_once_with(list(PAIRS))
+        self.assertEqual(evaluated, {"XBTUSDT": (50000.0, 300.0), "XETHZUSDT": (3000.0, 5000.0), "XRPUSDT": (0.5, 1000000.0)})
+
+    def test_failing_pair_does_not_stop_others(self):
+        self.mock_kraken_api.get_ticker.return_value = {
+            "XBTUSDT": ticker(50000, 300),
+            "XRPUSDT": ticker(0.5, 1000000),
+        }
+        for strategy in self.runner.strategies.values():
+            patch.object(strategy, 'update_sentiment').start()
+            patch.object(strategy, 'evaluate').start()
+        self.runner.strategies["XBTUSDT"].evaluate.side_effect = Exception("boom")
+
+        self.runner.run_cycle()
+
+        self.runner.strategies["XETHZUSDT"].evaluate.assert_not_called()
+        self.runner.strategies["XRPUSDT"].evaluate.assert_called_once_with(0.5, market_volume=1000000.0)
+
+    def test_async_cycle_evaluates_pairs_concurrently(self):
+        self.mock_kraken_api.get_ticker.return_value = {
+            "XBTUSDT": ticker(50000, 300),
+            "XETHZUSDT": ticker(3000, 5000),
+            "XRPUSDT": ticker(0.5, 1000000),
+        }
+        # Every evaluation only gets past the barrier while all three are in flight at once
+        barrier = threading.Barrier(len(PAIRS), timeout=2)
+        evaluated = {}
+        def evaluate(pair, price):
+            barrier.wait()
+            evaluated[pair] = price
+        for pair, strategy in self.runner.strategies.items():
+            patch.object(strategy, 'update_sentiment').start()
+            patch.object(strategy, 'evaluate', side_effect=lambda price, market_volume, pair=pair: evaluate(pair, price)).start()
+
+        asyncio.run(self.runner.run_cycle_async(deadline=5))
+
+        self.mock_kraken_api.get_ticker.assert_called_once_with(list(PAIRS))
+        self.assertEqual(evaluated, {"XBTUSDT": 50000.0, "XETHZUSDT": 3000.0, "XRPUSDT": 0.5})
+
+    @patch('runner.KrakenMarketDataFeed')
+    def test_run_cycle_reads_streamed_tickers_while_the_feed_is_live(self, mock_feed):
+        feed = mock_feed.return_value
+        feed.is_stale.return_value = False
+        feed.tickers = {"XBTUSDT": ticker(50000, 300), "XETHZUSDT": ticker(3000, 5000), "XRPUSDT": ticker(0.5, 1000000)}
+        for strategy in self.runner.strategies.values():
+            patch.object(strategy, 'update_sentiment').start()
+            patch.object(strategy, 'evaluate').start()
+
+        self.runner.start_market_data_feed(MagicMock())
+        self.runner.run_cycle()
+        feed.is_stale.return_value = True
+        self.mock_kraken_api.get_ticker.return_value = {}
+        self.runner.run_cycle()
+
+        self.assertEqual(mock_feed.call_args[0][0], list(PAIRS))
+        self.assertIs(self.runner.strategies["XRPUSDT"].market_data_feed, feed)
+        self.assertIs(self.runner.strategies["XRPUSDT"].local_order_book, feed.order_books["XRPUSDT"])
+        self.runner.strategies["XRPUSDT"].evaluate.assert_called_once_with(0.5, market_volume=1000000.0)
+        self.mock_kraken_api.get_ticker.assert_called_once_with(list(PAIRS))
+
+    @patch('runner.KrakenMarketDataFeed')
+    def test_market_data_feed_wakes_the_scheduler(self, mock_feed):
+        scheduler = CycleScheduler(3600)
+        patch.object(scheduler, 'trigger').start()
+        feed = mock_feed.return_value
+
+        self.runner.start_market_data_feed(scheduler)
+        listeners = {call.args[0]: call.args[1] for call in feed.add_listener.call_args_list}
+        strategy = self.runner.strategies["XBTUSDT"]
+        patch.object(strategy, '_update_indicators', return_value=None).start()
+        strategy.evaluate(50000.0)
+        listeners["ticker"]("XBTUSDT", {"c": ["50100.0", "1"]})
+        scheduler.trigger.assert_not_called()
+        listeners["ticker"]("XBTUSDT", {"c": ["51000.0", "1"]})
+
+        scheduler.trigger.assert_called_once_with(TRIGGER_PRICE_MOVE)
+        self.assertEqual(strategy.price_trigger.reference["XBTUSDT"], 51000.0)
+        self.assertNotIn("ohlc", mock_feed.call_args.kwargs["channels"])  # Hourly candles close on a tick
+
+    @patch('runner.NewsService')
+    def test_news_service_is_shared_by_all_pairs(self, mock_news_service):
+        service = mock_news_service.return_value.start.return_value
+
+        self.runner.start_news_service()
+
+        mock_news_service.assert_called_once()
+        self.assertEqual(mock_news_service.call_args[0][0], {"XBTUSDT": "bitcoin", "XETHZUSDT": "ethereum", "XRPUSDT": "Ripple AND XRP -recipe -water -sound"})
+        for pair, strategy in self.runner.strategies.items():
+            self.assertIs(strategy.news_refresher, service.view.return_value)
+        self.assertEqual([c.args[0] for c in service.view.call_args_list], list(PAIRS))
+
+    def test_load_history_seeds_each_pair(self):
+        def get_ohlc(pair, interval, since=None):
+            if pair == "XRPUSDT":
+                return [], None
+            return [[1700000000, "1", "1", "1", "1.0", "1", "1", 1], [1700003600, "2", "2", "2", "2.0", "2", "1", 1]], 1700000000
+        self.mock_kraken_api.get_ohlc.side_effect = get_ohlc
+
+        self.runner.load_history()
+
+        self.assertEqual(len(self.runner.strategies["XBTUSDT"].prices), 2)
+        self.assertEqual(len(self.runner.strategies["XRPUSDT"].prices), 0)
+
+    @patch('runner.logger')
+    @patch('runner.CandleStore')
+    def test_load_candle_history_syncs_and_loads_the_candle_store(self, mock_store, mock_logger):
+        store = mock_store.return_value
+        store.load.return_value = [50000, 49000, 48000]
+
+        self.assertEqual(load_candle_history("XBTUSDT", 300), [50000, 49000, 48000])
+
+        store.sync.assert_called_once_with(self.mock_kraken_api)
+        store.load.assert_called_once_with(limit=300)
+        store.close.assert_called_once()
+        mock_logger.info.assert_any_call("Loaded 3 historical prices for XBTUSDT.")
+
+    @patch('runner.logger')
+    @patch('runner.CandleStore')
+    def test_load_candle_history_failure_starts_empty(self, mock_store, mock_logger):
+        mock_store.return_value.sync.side_effect = Exception("API Error")
+
+        self.assertEqual(len(load_candle_history("XBTUSDT", 300)), 0)
+        mock_logger.error.assert_any_call("Failed to fetch historical XBTUSDT data: API Error")
+
+    @patch('runner.CandleStore')
+    def test_load_history_closes_the_store_when_sync_fails(self, mock_store):
+        mock_store.return_value.sync.side_effect = RuntimeError("EAPI:Rate limit exceeded")
+
+        self.runner.load_history()
+
+        self.assertEqual(mock_store.return_value.close.call_count, len(PAIRS))
+        self.assertEqual(len(self.runner.strategies["XBTUSDT"].prices), 0)
+
+if __name__ == "__main__":
+    unittest.main()
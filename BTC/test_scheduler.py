@@ -0,0 +1,131 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+from scheduler import CycleScheduler, PriceMoveTrigger, CandleTrigger, TICK, TRIGGER_PRICE_MOVE, TRIGGER_NEW_CANDLE
+
+class FakeWallClock:
+    """A wall clock starting at 'start' that runs in real time and can be stepped."""
+    def __init__(self, start):
+        self.offset = start - time.monotonic()
+
+    def __call__(self):
+        return time.monotonic() + self.offset
+
+    def step(self, seconds):
+        self.offset += seconds
+
+class TestCycleScheduler(unittest.TestCase):
+    def test_boundaries_are_aligned_to_wall_clock_multiples(self):
+        scheduler = CycleScheduler(300, offset=2, clock=lambda: 1000.0)
+        self.assertEqual(scheduler.next_tick, 1202.0)
+        self.assertEqual(scheduler.next_boundary(1202.0), 1502.0)
+        self.assertEqual(scheduler.next_boundary(1201.9), 1202.0)
+
+    def test_ticks_on_periods_that_are_multiples_of_the_interval(self):
+        scheduler = CycleScheduler(300)
+        self.assertTrue(scheduler.ticks_on(3600))
+        self.assertFalse(scheduler.ticks_on(60))
+
+    def test_rejects_non_positive_interval(self):
+        with self.assertRaises(ValueError):
+            CycleScheduler(0)
+
+    def test_ticks_fire_on_boundaries_without_drift(self):
+        clock = FakeWallClock(299.9)
+        scheduler = CycleScheduler(300, clock=clock)
+
+        self.assertEqual(scheduler.wait(), TICK)
+        self.assertGreaterEqual(clock(), 300.0)
+        self.assertLess(scheduler.last_lag, 0.5)
+        clock.step(299.8)  # A cycle that takes most of its slot does not delay the next tick
+        self.assertEqual(scheduler.wait(), TICK)
+        self.assertEqual(scheduler.next_tick, 900.0)
+        self.assertEqual(scheduler.stats()["ticks"], 2)
+
+    def test_overrun_skips_missed_ticks(self):
+        clock = FakeWallClock(299.9)
+        scheduler = CycleScheduler(300, clock=clock)
+        scheduler.wait()
+
+        clock.step(650)  # The cycle ran through the 600 and 900 boundaries
+        scheduler.trigger(TRIGGER_NEW_CANDLE)
+        scheduler.wait()
+
+        self.assertEqual((scheduler.overruns, scheduler.skipped), (1, 2))
+        self.assertEqual(scheduler.next_tick, 1200.0)
+
+    def test_trigger_wakes_wait_early(self):
+        scheduler = CycleScheduler(3600, clock=FakeWallClock(0.0))
+        threading.Timer(0.05, scheduler.trigger, args=(TRIGGER_PRICE_MOVE,)).start()
+
+        start = time.monotonic()
+        self.assertEqual(scheduler.wait(), TRIGGER_PRICE_MOVE)
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertEqual((scheduler.ticks, scheduler.triggers), (0, 1))
+        self.assertEqual(scheduler.next_tick, 3600.0)
+
+    def test_triggers_during_a_cycle_coalesce(self):
+        scheduler = CycleScheduler(3600, clock=FakeWallClock(0.0))
+        scheduler.trigger(TRIGGER_PRICE_MOVE)
+        scheduler.trigger(TRIGGER_NEW_CANDLE)
+
+        self.assertEqual(scheduler.wait(), TRIGGER_NEW_CANDLE)
+        self.assertEqual(scheduler.triggers, 1)
+
+    def test_backward_clock_step_realigns_the_schedule(self):
+        clock = FakeWallClock(1199.5)
+        scheduler = CycleScheduler(300, clock=clock)
+        clock.step(-600.0)  # NTP pulls the clock back ten minutes
+
+        start = time.monotonic()
+        self.assertEqual(scheduler.wait(), TICK)
+        self.assertLess(time.monotonic() - start, 3.0)
+        self.assertEqual(scheduler.next_tick, 900.0)
+
+    def test_triggers_racing_wait_always_carry_a_reason(self):
+        scheduler = CycleScheduler(3600, clock=FakeWallClock(0.0))
+        stop = threading.Event()
+
+        def fire():
+            while not stop.is_set():
+                scheduler.trigger(TRIGGER_PRICE_MOVE)
+
+        thread = threading.Thread(target=fire)
+        thread.start()
+        try:
+            reasons = {scheduler.wait() for _ in range(500)}
+        finally:
+            stop.set()
+            thread.join()
+
+        self.assertEqual(reasons, {TRIGGER_PRICE_MOVE})
+
+class TestTriggers(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = MagicMock()
+
+    def test_price_move_triggers_past_threshold(self):
+        trigger = PriceMoveTrigger(self.scheduler, threshold=0.01)
+        trigger.reset("XBTUSDT", 50000.0)
+
+        trigger.update("XBTUSDT", 50400.0)
+        self.scheduler.trigger.assert_not_called()
+        trigger.update("XBTUSDT", 49400.0)
+        self.scheduler.trigger.assert_called_once_with(TRIGGER_PRICE_MOVE)
+        self.assertEqual(trigger.reference["XBTUSDT"], 49400.0)
+
+    def test_new_candle_triggers_once_the_end_time_advances(self):
+        trigger = CandleTrigger(self.scheduler)
+        feed = MagicMock()
+        trigger.attach(feed)
+        on_ohlc = feed.add_listener.call_args[0][1]
+
+        on_ohlc("XBTUSDT", ["1700000010.1", "1700000060.0", "50000.0"])
+        on_ohlc("XBTUSDT", ["1700000030.5", "1700000060.0", "50010.0"])
+        self.scheduler.trigger.assert_not_called()
+        on_ohlc("XBTUSDT", ["1700000061.2", "1700000120.0", "50020.0"])
+        self.scheduler.trigger.assert_called_once_with(TRIGGER_NEW_CANDLE)
+
+if __name__ == '__main__':
+    unittest.main()
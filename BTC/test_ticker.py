@@ -0,0 +1,26 @@
+import unittest
+from ticker import TickerSnapshot
+
+TICKER = {
+    "a": ["50001.0", "1", "1.000"], "b": ["49999.0", "2", "2.000"], "c": ["50000.0", "0.1"],
+    "v": ["100.5", "250.25"], "p": ["49900.0", "49800.0"], "t": [1200, 3400],
+    "l": ["49000.0", "48500.0"], "h": ["51000.0", "51500.0"], "o": "49500.0",
+}
+
+class TestTickerSnapshot(unittest.TestCase):
+    def test_from_kraken_parses_all_fields(self):
+        snapshot = TickerSnapshot.from_kraken("XBTUSDT", TICKER, fetched_at=0.0)
+        self.assertEqual((snapshot.ask, snapshot.bid, snapshot.last), (50001.0, 49999.0, 50000.0))
+        self.assertEqual((snapshot.volume, snapshot.vwap, snapshot.trades), (250.25, 49800.0, 3400))
+        self.assertEqual((snapshot.low, snapshot.high, snapshot.open), (48500.0, 51500.0, 49500.0))
+        self.assertEqual(snapshot.spread, 2.0)
+
+    def test_missing_fields_are_none(self):
+        snapshot = TickerSnapshot.from_kraken("XBTUSDT", {"c": ["50000.0", "1"], "v": []})
+        self.assertEqual(snapshot.last, 50000.0)
+        self.assertIsNone(snapshot.volume)
+        self.assertIsNone(snapshot.spread)
+        self.assertLess(snapshot.age, 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,11 @@
+import asyncio
+import threading
+import time
 import unittest
+import numpy as np
 from unittest.mock import MagicMock, patch
 from trading_strategy import TradingStrategy
-from api_kraken import KrakenAPI
+from api_kraken import KrakenAPI, request_deadline_at
 from indicators import (
     calculate_moving_average, 
     calculate_rsi, 
@@ -12,6 +16,9 @@ from indicators import (
     fetch_latest_news
 )
 from portfolio import portfolio
+from ohlcv import OHLCV
+from backtest import SELL
+from order_book import LocalOrderBook
 
 class TestTradingStrategy(unittest.TestCase):
 
@@ -20,9 +27,8 @@ class TestTradingStrategy(unittest.TestCase):
         
         # Mock dependencies
         self.mock_kraken_api = patch('trading_strategy.kraken_api').start()
-        self.mock_calculate_moving_average = patch('trading_strategy.calculate_moving_average').start()
-        self.mock_calculate_rsi = patch('trading_strategy.calculate_rsi').start()
-        self.mock_calculate_macd = patch('trading_strategy.calculate_macd').start()
+        # (moving_avg, rsi, macd, signal); incomplete until a test supplies every indicator
+        self.mock_update_indicators = patch('trading_strategy.StreamingIndicators.update', return_value=(None, None, None, None)).start()
         self.mock_calculate_sentiment = patch('trading_strategy.calculate_sentiment').start()
         self.mock_fetch_latest_news = patch('trading_strategy.fetch_latest_news').start()
         self.mock_calculate_potential_profit_loss = patch('trading_strategy.calculate_potential_profit_loss').start()
@@ -45,12 +51,21 @@ class TestTradingStrategy(unittest.TestCase):
         self.mock_fetch_latest_news.assert_called_once()
         self.mock_calculate_sentiment.assert_called_once_with(articles)
 
+    def test_update_sentiment_uses_background_refresher(self):
+        refresher = MagicMock()
+        refresher.snapshot.return_value = (["Positive news"], 0.7)
+        self.trading_strategy.news_refresher = refresher
+
+        self.trading_strategy.update_sentiment()
+
+        self.assertEqual(self.trading_strategy.sentiment_score, 0.7)
+        self.mock_fetch_latest_news.assert_not_called()
+        self.mock_calculate_sentiment.assert_not_called()
+
     def test_execute_strategy_with_valid_indicators(self):
         # Setup
-        self.mock_kraken_api.get_btc_price.return_value = 50000
-        self.mock_calculate_moving_average.return_value = 48000
-        self.mock_calculate_rsi.return_value = 30
-        self.mock_calculate_macd.return_value = (100, 90)
+        self.mock_kraken_api.get_price.return_value = 50000
+        self.mock_update_indicators.return_value = (48000, 30, 100, 90)
         self.mock_calculate_sentiment.return_value = 0.6
         self.mock_kraken_api.get_market_volume.return_value = 200
 
@@ -58,20 +73,61 @@ class TestTradingStrategy(unittest.TestCase):
         self.trading_strategy.execute_strategy()
 
         # Assert
-        self.mock_kraken_api.get_btc_price.assert_called_once()
-        self.mock_calculate_moving_average.assert_called_once_with([50000])
-        self.mock_calculate_rsi.assert_called_once_with([50000])
-        self.mock_calculate_macd.assert_called_once_with([50000])
+        self.mock_kraken_api.get_price.assert_called_once_with("XBTUSDT")
+        self.mock_update_indicators.assert_called_once_with(50000)
+        np.testing.assert_array_equal(self.trading_strategy.prices.view(), [50000])
+
+    def test_execute_strategy_times_each_phase(self):
+        self.mock_fetch_latest_news.return_value = []
+        self.mock_calculate_sentiment.return_value = 0.6
+        self.mock_kraken_api.get_price.return_value = 50000
+        self.mock_kraken_api.get_market_volume.return_value = 200
+        self.mock_update_indicators.return_value = (48000, 30, 100, 90)
+
+        self.trading_strategy.execute_strategy()
+
+        self.assertEqual(self.trading_strategy.cycle_timer.cycles, 1)
+        self.assertEqual(set(self.trading_strategy.cycle_timer.percentiles()),
+                         {"news", "sentiment", "price", "indicators", "decision", "volume", "order_book", "order", "cycle"})
+
+    def test_order_skipped_without_order_book(self):
+        self.mock_kraken_api.get_order_book.return_value = None
+
+        self.trading_strategy._submit_order(0.1, 'buy')
+
+        self.mock_kraken_api.execute_trade.assert_not_called()
+
+    def test_price_history_is_capped_at_capacity(self):
+        strategy = TradingStrategy(prices=[1.0, 2.0, 3.0], capacity=3)
+        self.mock_kraken_api.get_price.return_value = 4.0
+
+        strategy.execute_strategy()
+
+        np.testing.assert_array_equal(strategy.prices.view(), [2.0, 3.0, 4.0])
 
     def test_execute_strategy_handles_missing_price(self):
         # Setup
-        self.mock_kraken_api.get_btc_price.return_value = None
+        self.mock_kraken_api.get_price.return_value = None
 
         # Execute
         self.trading_strategy.execute_strategy()
 
         # Assert
-        self.mock_kraken_api.get_btc_price.assert_called_once()
+        self.mock_kraken_api.get_price.assert_called_once()
+
+    def test_execute_strategy_prefers_the_streamed_price(self):
+        feed = MagicMock()
+        feed.price.return_value = 50100.0
+        self.trading_strategy.market_data_feed = feed
+
+        self.trading_strategy.execute_strategy()
+        feed.price.return_value = None  # Stale feed
+        self.mock_kraken_api.get_price.return_value = 50200.0
+        self.trading_strategy.execute_strategy()
+
+        feed.price.assert_called_with("XBTUSDT")
+        self.mock_kraken_api.get_price.assert_called_once_with("XBTUSDT")
+        np.testing.assert_array_equal(self.trading_strategy.prices.view(), [50100.0, 50200.0])
 
     def test_buy_with_positive_sentiment(self):
         # Setup
@@ -90,7 +146,7 @@ class TestTradingStrategy(unittest.TestCase):
         self.trading_strategy._execute_buy(50000)
 
         # Assert
-        self.mock_kraken_api.execute_trade.assert_called_once_with(expected_trade_amount, 'buy')
+        self.mock_kraken_api.execute_trade.assert_called_once_with(expected_trade_amount, 'buy', order_book=self.mock_kraken_api.get_order_book.return_value, pair='XBTUSDT')
 
     def test_partial_sell_with_negative_sentiment(self):
         # Setup
@@ -106,7 +162,137 @@ class TestTradingStrategy(unittest.TestCase):
         self.trading_strategy._execute_partial_sell(50000)
 
         # Assert
-        self.mock_kraken_api.execute_trade.assert_called_once_with(expected_partial_sell_amount, 'sell')
+        self.mock_kraken_api.execute_trade.assert_called_once_with(expected_partial_sell_amount, 'sell', order_book=self.mock_kraken_api.get_order_book.return_value, pair='XBTUSDT')
+
+    def test_sell_with_strong_negative_sentiment(self):
+        self.trading_strategy.sentiment_score = -0.6
+        self.trading_strategy.last_buy_price = 48000
+        self.trading_strategy.last_trade_type = 'buy'
+        self.mock_is_profitable_trade.return_value = True
+        self.mock_kraken_api.execute_trade.return_value = "OQCLML-BW3P3-BUCMWZ"
+
+        branch, action, order_id = self.trading_strategy._determine_trade_action(50000, macd=90, signal=100, rsi=55)
+
+        self.assertEqual((action, order_id), (SELL, "OQCLML-BW3P3-BUCMWZ"))
+        self.mock_kraken_api.execute_trade.assert_called_once_with(0.000552, 'sell', order_book=self.mock_kraken_api.get_order_book.return_value, pair='XBTUSDT')
+        self.assertEqual(self.trading_strategy.last_trade_type, 'sell')
+
+    def test_orders_are_priced_from_local_order_book(self):
+        book = LocalOrderBook("XBTUSDT")
+        book.apply_snapshot({"as": [["50001.0", "1.0"]], "bs": [["49999.0", "1.0"]]})
+        self.trading_strategy.local_order_book = book
+
+        self.trading_strategy._submit_order(0.1, 'buy')
+
+        self.mock_kraken_api.execute_trade.assert_called_once_with(0.1, 'buy', order_book={"asks": [["50001.0", "1.0"]], "bids": [["49999.0", "1.0"]]}, pair='XBTUSDT')
+        self.mock_kraken_api.get_order_book.assert_not_called()
+
+    def test_load_candles_seeds_price_history(self):
+        candles = OHLCV.from_kraken([[0, "1", "1", "1", "10.0", "1", "1", 1], [60, "1", "1", "1", "11.0", "1", "1", 1]])
+        strategy = TradingStrategy()
+
+        strategy.load_candles(candles)
+
+        np.testing.assert_array_equal(strategy.prices.view(), [10.0, 11.0])
+
+    def test_async_cycle_fetches_concurrently(self):
+        # Each pair of calls only gets past its barrier while both are in flight at once
+        fetch_barrier, order_barrier = threading.Barrier(2, timeout=2), threading.Barrier(2, timeout=2)
+        def meet(barrier, value):
+            def call(*args, **kwargs):
+                barrier.wait()
+                return value
+            return call
+        order_book = {"asks": [["50001.0", "1"]], "bids": [["49999.0", "1"]]}
+        self.mock_fetch_latest_news.side_effect = meet(fetch_barrier, [])
+        self.mock_kraken_api.get_price.side_effect = meet(fetch_barrier, 50000.0)
+        self.mock_kraken_api.get_market_volume.side_effect = meet(order_barrier, 200.0)
+        self.mock_kraken_api.get_order_book.side_effect = meet(order_barrier, order_book)
+        self.mock_calculate_sentiment.return_value = 0.6
+        self.mock_update_indicators.return_value = (48000, 30, 100, 90)
+
+        asyncio.run(self.trading_strategy.execute_strategy_async(deadline=5))
+
+        self.assertEqual(self.trading_strategy.prices.latest, 50000.0)
+        self.mock_kraken_api.execute_trade.assert_called_once()
+        self.assertEqual(self.mock_kraken_api.execute_trade.call_args.kwargs["order_book"], order_book)
+
+    def test_async_cycle_skipped_after_deadline(self):
+        self.mock_fetch_latest_news.return_value = []
+        self.mock_kraken_api.get_price.side_effect = lambda pair: time.sleep(0.5) or 50000.0
+
+        asyncio.run(self.trading_strategy.execute_strategy_async(deadline=0.1))
+
+        self.assertEqual(len(self.trading_strategy.prices), 0)
+        self.mock_calculate_sentiment.assert_not_called()
+
+    def test_async_cycle_fetches_order_book_only_for_an_order(self):
+        order_book = {"asks": [["50001.0", "1"]], "bids": [["49999.0", "1"]]}
+        self.mock_fetch_latest_news.return_value = []
+        self.mock_kraken_api.get_price.return_value = 50000.0
+        self.mock_kraken_api.get_market_volume.return_value = 200.0
+        self.mock_kraken_api.get_order_book.return_value = order_book
+        self.mock_calculate_sentiment.return_value = 0.6
+        self.mock_update_indicators.return_value = (48000, 30, 100, 90)
+
+        asyncio.run(self.trading_strategy.execute_strategy_async(deadline=5))
+
+        self.mock_kraken_api.get_market_volume.assert_called_once()
+        self.mock_kraken_api.get_order_book.assert_called_once_with("XBTUSDT")
+        self.assertEqual(self.mock_kraken_api.execute_trade.call_args.kwargs["order_book"], order_book)
+
+    def test_async_cycle_without_a_decision_skips_volume_and_depth(self):
+        self.mock_fetch_latest_news.return_value = []
+        self.mock_kraken_api.get_price.return_value = 50000.0
+        self.mock_calculate_sentiment.return_value = 0.0
+
+        asyncio.run(self.trading_strategy.execute_strategy_async(deadline=5))
+
+        self.mock_kraken_api.get_market_volume.assert_not_called()
+        self.mock_kraken_api.get_order_book.assert_not_called()
+
+    def test_async_cycle_deadline_reaches_the_worker_threads(self):
+        deadlines = []
+        self.mock_fetch_latest_news.return_value = []
+        self.mock_kraken_api.get_price.side_effect = lambda pair: deadlines.append(request_deadline_at.get()) or 50000.0
+        self.mock_calculate_sentiment.return_value = 0.0
+
+        start = time.monotonic()
+        asyncio.run(self.trading_strategy.execute_strategy_async(deadline=5))
+
+        self.assertAlmostEqual(deadlines[0], start + 5, delta=1)
+        self.assertIsNone(request_deadline_at.get())
+
+class TestTradingStrategyStreamingIndicators(unittest.TestCase):
+
+    def setUp(self):
+        patch('trading_strategy.kraken_api').start()
+        self.addCleanup(patch.stopall)
+
+    def test_streamed_indicators_match_the_batch_functions(self):
+        prices = list(50000 + np.cumsum(np.random.default_rng(7).normal(0, 50, 80)))
+        strategy = TradingStrategy(prices=prices[:40])
+        patch.object(strategy, '_determine_trade_action', return_value=(0, 0, None)).start()
+
+        for price in prices[40:]:
+            strategy.evaluate(price)
+
+        history = strategy.prices.view()
+        macd, signal = calculate_macd(history)
+        self.assertAlmostEqual(strategy.indicators['moving_average'], calculate_moving_average(history), places=6)
+        self.assertAlmostEqual(strategy.indicators['rsi'], calculate_rsi(history), places=6)
+        self.assertAlmostEqual(strategy.indicators['macd'], macd, places=6)
+        self.assertAlmostEqual(strategy.indicators['signal'], signal, places=6)
+
+    def test_load_candles_reseeds_the_streaming_indicators(self):
+        rows = [[60 * i, "1", "1", "1", str(100.0 + i), "1", "1", 1] for i in range(30)]
+        strategy = TradingStrategy()
+        strategy.evaluate(1.0)
+
+        strategy.load_candles(OHLCV.from_kraken(rows))
+
+        self.assertEqual(strategy.streaming_indicators.count, 31)
+        self.assertAlmostEqual(strategy.streaming_indicators.moving_average, np.mean(strategy.prices.view()[-7:]))
 
 if __name__ == "__main__":
     unittest.main()
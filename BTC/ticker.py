@@ -0,0 +1,64 @@
+import time
+from typing import Optional, Dict
+
+
+# Function to read one numeric field of a Kraken Ticker entry, None when it is missing or malformed
+def _field(data: Dict, key: str, index: Optional[int] = None) -> Optional[float]:
+    try:
+        value = data[key] if index is None else data[key][index]
+        return float(value)
+    except (KeyError, IndexError, TypeError, ValueError):
+        return None
+
+
+class TickerSnapshot:
+    """
+    One pair's Ticker entry parsed once. Rolling fields (volume, vwap, trades, low,
+    high) are the last 24 hours; 'open' is today's opening price. Fields missing from
+    the payload are None. 'fetched_at' is a time.monotonic() stamp used for TTL checks.
+    """
+    def __init__(self, pair: str, ask: Optional[float], bid: Optional[float], last: Optional[float],
+                 volume: Optional[float], vwap: Optional[float], trades: Optional[float],
+                 low: Optional[float], high: Optional[float], open: Optional[float],
+                 fetched_at: Optional[float] = None):
+        self.pair = pair
+        self.ask = ask
+        self.bid = bid
+        self.last = last
+        self.volume = volume
+        self.vwap = vwap
+        self.trades = None if trades is None else int(trades)
+        self.low = low
+        self.high = high
+        self.open = open
+        self.fetched_at = time.monotonic() if fetched_at is None else fetched_at
+
+    @classmethod
+    def from_kraken(cls, pair: str, data: Dict, fetched_at: Optional[float] = None) -> "TickerSnapshot":
+        """Parses a Ticker result entry {'a': [...], 'b': [...], 'c': [...], 'v': [...], ...}."""
+        return cls(
+            pair,
+            ask=_field(data, 'a', 0),
+            bid=_field(data, 'b', 0),
+            last=_field(data, 'c', 0),
+            volume=_field(data, 'v', 1),
+            vwap=_field(data, 'p', 1),
+            trades=_field(data, 't', 1),
+            low=_field(data, 'l', 1),
+            high=_field(data, 'h', 1),
+            open=_field(data, 'o'),
+            fetched_at=fetched_at,
+        )
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+    @property
+    def spread(self) -> Optional[float]:
+        if self.ask is None or self.bid is None:
+            return None
+        return self.ask - self.bid
+
+    def __repr__(self) -> str:
+        return f"TickerSnapshot({self.pair}, last={self.last}, bid={self.bid}, ask={self.ask}, volume={self.volume})"
@@ -1,19 +1,32 @@
+import asyncio
 import time
-from api_kraken import KrakenAPI
-from indicators import calculate_moving_average, calculate_rsi, calculate_macd, calculate_potential_profit_loss, is_profitable_trade, calculate_sentiment, fetch_latest_news
-from portfolio import portfolio
-from config import MIN_TRADE_VOLUME, API_KEY, API_SECRET, API_DOMAIN
+from api_kraken import KrakenAPI, AsyncKrakenAPI, request_deadline
+from indicators import StreamingIndicators, calculate_potential_profit_loss, is_profitable_trade, calculate_sentiment, fetch_latest_news
+from portfolio import portfolio, Portfolio
+from price_history import PriceRingBuffer
+from ohlcv import OHLCV
+from backtest import BRANCH_STRONG_POSITIVE, BRANCH_MODERATE_POSITIVE, BRANCH_STRONG_NEGATIVE, BRANCH_MODERATE_NEGATIVE, BRANCH_NEUTRAL, HOLD, BUY, PARTIAL_SELL, SELL
+from decision_journal import NO_BRANCH
+from cycle_timer import CycleTimer, PHASE_NEWS, PHASE_SENTIMENT, PHASE_MARKET_DATA, PHASE_PRICE, PHASE_INDICATORS, PHASE_DECISION, PHASE_VOLUME, PHASE_ORDER_BOOK, PHASE_ORDER
+from config import MIN_TRADE_VOLUME, API_KEY, API_SECRET, API_DOMAIN, PRICE_HISTORY_CAPACITY, PRICE_HISTORY_DTYPE, CYCLE_DEADLINE, CYCLE_INTERVAL, CYCLE_TIMING_WINDOW, LOG_REPEAT_INTERVAL
 from logger_config import logger
-from typing import List, Optional
-from termcolor import colored
+from typing import List, Optional, Tuple, Union
 
 # Initialize Kraken API client
 kraken_api = KrakenAPI(API_KEY, API_SECRET, API_DOMAIN)
 
 # Trading strategy class to encapsulate trading logic
 class TradingStrategy:
-    def __init__(self, prices: Optional[List[float]] = None):
-        self.prices = prices if prices else []
+    def __init__(self, prices: Optional[List[float]] = None, capacity: int = PRICE_HISTORY_CAPACITY, dtype: str = PRICE_HISTORY_DTYPE,
+                 pair: str = "XBTUSDT", news_query: str = "bitcoin", pair_portfolio: Optional[Portfolio] = None):
+        self.pair = pair
+        self.news_query = news_query
+        self.portfolio = pair_portfolio if pair_portfolio else portfolio
+        self.prices = PriceRingBuffer(capacity, dtype)
+        # MA, RSI and MACD folded in one price at a time; matches the batch calculate_* functions over self.prices
+        self.streaming_indicators = StreamingIndicators()
+        if prices:
+            self.extend_prices(prices)
         self.last_buy_price = None
         self.last_sell_price = None
         self.last_trade_type = None
@@ -21,123 +34,320 @@ class TradingStrategy:
         self.stop_loss_percent = 0.03  # 3% stop loss
         self.take_profit_percent = 0.15  # 15% take profit
         self.sentiment_score = 0.0  # Initialize sentiment score
+        self.indicators = {}  # Latest moving average, RSI, MACD and signal
+        # Market volume a caller already fetched (e.g. the multi-pair runner), used instead of fetching it again
+        self._cycle_market_volume = None
+        # Order book fetched alongside the volume for this cycle's buy, used instead of fetching it again
+        self._cycle_order_book = None
+        # Event loop and client of a running async cycle; a buy then fetches volume and depth concurrently on it
+        self._cycle_loop = None
+        self._cycle_api = None
+        # Optional KrakenMarketDataFeed; while it is live its streamed price replaces the REST Ticker request
+        self.market_data_feed = None
+        # Optional LocalOrderBook kept current by the WebSocket feed; orders are priced from it when in sync
+        self.local_order_book = None
+        # Optional NewsRefresher keeping sentiment warm in the background, so cycles never wait on news I/O
+        self.news_refresher = None
+        # Per-phase durations of each cycle, with rolling percentiles and a summary line per cycle
+        self.cycle_timer = CycleTimer(pair, budget=CYCLE_INTERVAL, window=CYCLE_TIMING_WINDOW)
+        # Optional PriceMoveTrigger, reset to each evaluated price so early cycles follow moves since the last evaluation
+        self.price_trigger = None
+        # Optional DecisionJournal receiving one record per cycle: indicators, branch, action and order id
+        self.journal = None
+
+    def load_candles(self, candles: OHLCV):
+        """Seeds the price history with the closes of the columnar candle history."""
+        self.extend_prices(candles.close)
+
+    def extend_prices(self, prices: List[float]):
+        """Appends historical prices and reseeds the streaming indicators from the retained history."""
+        self.prices.extend(prices)
+        self.streaming_indicators = StreamingIndicators()
+        self.streaming_indicators.extend(self.prices.view())
 
     def update_sentiment(self):
-        articles = fetch_latest_news()
-        self.sentiment_score = calculate_sentiment(articles)
+        if self.news_refresher is not None:
+            with self.cycle_timer.phase(PHASE_NEWS):
+                _, self.sentiment_score = self.news_refresher.snapshot()
+            logger.info(f"Using background sentiment score: {self.sentiment_score}")
+            return
+        with self.cycle_timer.phase(PHASE_NEWS):
+            articles = fetch_latest_news(query=self.news_query)
+        with self.cycle_timer.phase(PHASE_SENTIMENT):
+            self.sentiment_score = calculate_sentiment(articles)
         logger.info(f"Updated sentiment score: {self.sentiment_score}")
 
     def execute_strategy(self):
-        # Update sentiment score before executing the strategy
-        self.update_sentiment()
+        with self.cycle_timer.cycle():
+            # Update sentiment score before executing the strategy
+            self.update_sentiment()
 
-        current_price = kraken_api.get_btc_price()
-        if current_price is None:
-            logger.error("Failed to retrieve BTC price.")
+            with self.cycle_timer.phase(PHASE_PRICE):
+                current_price = self._streamed_price() or kraken_api.get_price(self.pair)
+            if current_price is None:
+                logger.error(f"Failed to retrieve {self.pair} price.")
+                return
+
+            self.evaluate(current_price)
+
+    def evaluate(self, current_price: float, market_volume: Optional[float] = None):
+        """
+        Runs the indicator update and trade decision for a price fetched by the caller,
+        e.g. a multi-pair runner that reads all tickers in one request.
+        """
+        indicators = self._update_indicators(current_price)
+        branch, action, order_id = NO_BRANCH, HOLD, None
+        if indicators:
+            self._cycle_market_volume = market_volume
+            try:
+                with self.cycle_timer.phase(PHASE_DECISION):
+                    branch, action, order_id = self._determine_trade_action(current_price, *indicators)
+            finally:
+                self._cycle_market_volume = None
+                self._cycle_order_book = None
+        self._journal_cycle(current_price, branch, action, order_id)
+        if self.price_trigger is not None:
+            self.price_trigger.reset(self.pair, current_price)
+
+    def _journal_cycle(self, current_price: float, branch: int, action: int, order_id: Optional[str]):
+        if self.journal is None:
             return
+        try:
+            self.journal.append(self.pair, current_price, sentiment=self.sentiment_score, branch=branch, action=action,
+                                order_id=order_id, **self.indicators)
+        except OSError as e:
+            logger.error(f"Failed to write the decision journal: {e}")
 
-        # Append the current price to the price history
+    def _update_indicators(self, current_price: float) -> Optional[tuple]:
+        """Appends the price and returns (macd, signal, rsi) when every indicator is available."""
+        # Append the current price to the ring buffer; the oldest price is overwritten once full
         self.prices.append(current_price)
-        if len(self.prices) > 300:
-            self.prices.pop(0)  # Keep only the latest 300 prices to save memory
 
-        # Calculate indicators
-        moving_avg = calculate_moving_average(self.prices)
-        rsi = calculate_rsi(self.prices)
-        macd, signal = calculate_macd(self.prices)
+        # Fold the price into the streaming indicators instead of recomputing them over the whole history
+        with self.cycle_timer.phase(PHASE_INDICATORS):
+            moving_avg, rsi, macd, signal = self.streaming_indicators.update(current_price)
+        self.indicators = {'moving_average': moving_avg, 'rsi': rsi, 'macd': macd, 'signal': signal}
 
-        logger.info(f"Current BTC Price: {current_price}, Moving Average: {moving_avg}, RSI: {rsi}, MACD: {macd}, Signal: {signal}, Sentiment Score: {self.sentiment_score}")
+        logger.info("Current %s Price: %s, Moving Average: %s, RSI: %s, MACD: %s, Signal: %s, Sentiment Score: %s",
+                    self.pair, current_price, moving_avg, rsi, macd, signal, self.sentiment_score)
 
         if moving_avg and rsi and macd and signal:
-            self._determine_trade_action(current_price, macd, signal, rsi)
+            return macd, signal, rsi
+        return None
+
+    def _streamed_price(self) -> Optional[float]:
+        return self.market_data_feed.price(self.pair) if self.market_data_feed is not None else None
+
+    async def execute_strategy_async(self, api: Optional[AsyncKrakenAPI] = None, deadline: float = CYCLE_DEADLINE):
+        """
+        Runs one cycle with the news and price fetched concurrently, so the cycle waits for
+        the slower call rather than both. Every Kraken request of the fetch is bounded by
+        'deadline' seconds and the cycle is abandoned when it is not done by then. Market
+        volume and the order book are only fetched when a decision needs them; a buy
+        fetches both concurrently.
+        """
+        with self.cycle_timer.cycle():
+            await self._execute_cycle_async(api or AsyncKrakenAPI(kraken_api), deadline)
+
+    async def _execute_cycle_async(self, api: AsyncKrakenAPI, deadline: float):
+        # With a background refresher the news is already warm and nothing needs fetching
+        with request_deadline(deadline):
+            news = asyncio.sleep(0) if self.news_refresher is not None else asyncio.to_thread(fetch_latest_news, query=self.news_query)
+            streamed_price = self._streamed_price()
+            price = asyncio.sleep(0, streamed_price) if streamed_price is not None else api.get_price(self.pair)
+            try:
+                with self.cycle_timer.phase(PHASE_MARKET_DATA):
+                    results = await asyncio.wait_for(asyncio.gather(news, price, return_exceptions=True),
+                                                     timeout=deadline)
+            except asyncio.TimeoutError:
+                logger.error(f"Market data fetch exceeded the {deadline}s cycle deadline. Skipping cycle.")
+                return
+
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Concurrent fetch failed: {result}")
+        articles, current_price = [None if isinstance(result, Exception) else result for result in results]
+
+        if self.news_refresher is not None:
+            self.update_sentiment()
+        else:
+            with self.cycle_timer.phase(PHASE_SENTIMENT):
+                self.sentiment_score = calculate_sentiment(articles)
+            logger.info(f"Updated sentiment score: {self.sentiment_score}")
+
+        if current_price is None:
+            logger.error(f"Failed to retrieve {self.pair} price.")
+            return
+
+        # Order submission is blocking, keep it off the event loop
+        self._cycle_loop, self._cycle_api = asyncio.get_running_loop(), api
+        try:
+            await asyncio.to_thread(self.evaluate, current_price)
+        finally:
+            self._cycle_loop = self._cycle_api = None
+
+    async def _fetch_volume_and_depth(self) -> Tuple[Optional[float], Optional[dict]]:
+        results = await asyncio.gather(self._cycle_api.get_market_volume(self.pair), self._cycle_api.get_order_book(self.pair),
+                                       return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Concurrent fetch failed: {result}")
+        market_volume, order_book = [None if isinstance(result, Exception) else result for result in results]
+        return market_volume, order_book
 
     
-    def _determine_trade_action(self, current_price: float, macd: float, signal: float, rsi: float):
+    def _determine_trade_action(self, current_price: float, macd: float, signal: float, rsi: float) -> Tuple[int, int, Optional[str]]:
+        """Runs the decision ladder and returns (branch, action, order id) using the backtest constants."""
         # Integrate sentiment into the trade decision
         if self.sentiment_score > 0.5:
+            branch = BRANCH_STRONG_POSITIVE
             logger.info("Strong positive sentiment detected. Considering more aggressive buying opportunity...")
             # Adjust thresholds to be more aggressive for buying
             adjusted_rsi_threshold = 65  # Allow RSI up to 65 for strong sentiment
             if macd > signal * 0.9 and rsi < adjusted_rsi_threshold:  # Allow a slight MACD-Signal crossover lag
-                logger.info(f"MACD ({macd}) > 0.9 * Signal ({signal}) and RSI ({rsi}) < {adjusted_rsi_threshold} with strong positive sentiment. Executing buy.")
-                self._execute_buy(current_price)
+                logger.info("MACD (%s) > 0.9 * Signal (%s) and RSI (%s) < %s with strong positive sentiment. Executing buy.", macd, signal, rsi, adjusted_rsi_threshold)
+                return branch, BUY, self._execute_buy(current_price)
             else:
-                logger.info(colored(f"Conditions not met for buying despite strong positive sentiment: MACD {macd}, Signal {signal}, RSI {rsi}.", 'yellow'))
+                logger.info("Conditions not met for buying despite strong positive sentiment: MACD %s, Signal %s, RSI %s.", macd, signal, rsi, extra={"color": "yellow", "throttle": LOG_REPEAT_INTERVAL})
 
         elif 0.1 < self.sentiment_score <= 0.5:
+            branch = BRANCH_MODERATE_POSITIVE
             logger.info("Moderate positive sentiment detected. Considering buying opportunity...")
             # Use normal conditions for moderate positive sentiment
             if macd > signal and rsi < 60:
-                logger.info(f"MACD ({macd}) > Signal ({signal}) and RSI ({rsi}) < 60 with moderate positive sentiment. Executing buy.")
-                self._execute_buy(current_price)
+                logger.info("MACD (%s) > Signal (%s) and RSI (%s) < 60 with moderate positive sentiment. Executing buy.", macd, signal, rsi)
+                return branch, BUY, self._execute_buy(current_price)
             else:
-                logger.info(colored(f"Conditions not met for buying despite moderate positive sentiment: MACD {macd}, Signal {signal}, RSI {rsi}.", 'yellow'))
+                logger.info("Conditions not met for buying despite moderate positive sentiment: MACD %s, Signal %s, RSI %s.", macd, signal, rsi, extra={"color": "yellow", "throttle": LOG_REPEAT_INTERVAL})
 
         elif self.sentiment_score < -0.5:
+            branch = BRANCH_STRONG_NEGATIVE
             logger.info("Strong negative sentiment detected. Considering more aggressive selling opportunity...")
             # Adjust thresholds to be more aggressive for selling
             adjusted_rsi_threshold = 50  # Allow selling even if RSI is above 50 when sentiment is strongly negative
             if macd < signal * 1.1 and rsi > adjusted_rsi_threshold:  # Allow MACD-Signal crossover lag for faster sell
-                logger.info(f"MACD ({macd}) < 1.1 * Signal ({signal}) and RSI ({rsi}) > {adjusted_rsi_threshold} with strong negative sentiment. Executing sell.")
-                self._execute_sell(current_price)
+                logger.info("MACD (%s) < 1.1 * Signal (%s) and RSI (%s) > %s with strong negative sentiment. Executing sell.", macd, signal, rsi, adjusted_rsi_threshold)
+                return branch, SELL, self._execute_sell(current_price)
             else:
-                logger.info(colored(f"Conditions not met for selling despite strong negative sentiment: MACD {macd}, Signal {signal}, RSI {rsi}.", 'yellow'))
+                logger.info("Conditions not met for selling despite strong negative sentiment: MACD %s, Signal %s, RSI %s.", macd, signal, rsi, extra={"color": "yellow", "throttle": LOG_REPEAT_INTERVAL})
 
         elif -0.5 <= self.sentiment_score < -0.1:
+            branch = BRANCH_MODERATE_NEGATIVE
             logger.info("Moderate negative sentiment detected. Considering selling opportunity...")
             # Use normal conditions for moderate negative sentiment
             if macd < signal and rsi > 45:
-                logger.info(f"MACD ({macd}) < Signal ({signal}) and RSI ({rsi}) > 45 with moderate negative sentiment. Executing sell.")
-                self._execute_sell(current_price)
+                logger.info("MACD (%s) < Signal (%s) and RSI (%s) > 45 with moderate negative sentiment. Executing sell.", macd, signal, rsi)
+                return branch, SELL, self._execute_sell(current_price)
             else:
-                logger.info(colored(f"Conditions not met for selling despite moderate negative sentiment: MACD {macd}, Signal {signal}, RSI {rsi}.", 'yellow'))
+                logger.info("Conditions not met for selling despite moderate negative sentiment: MACD %s, Signal %s, RSI %s.", macd, signal, rsi, extra={"color": "yellow", "throttle": LOG_REPEAT_INTERVAL})
 
         else:
+            branch = BRANCH_NEUTRAL
             logger.info("Neutral sentiment detected. Proceeding with regular MACD and RSI checks.")
             # Buy signal when MACD crossover and RSI < 40
             if macd > signal and rsi < 40:
-                logger.info(f"MACD ({macd}) > Signal ({signal}) and RSI ({rsi}) < 40. Executing buy.")
-                self._execute_buy(current_price)
+                logger.info("MACD (%s) > Signal (%s) and RSI (%s) < 40. Executing buy.", macd, signal, rsi)
+                return branch, BUY, self._execute_buy(current_price)
             # Sell signal when MACD crossover below and RSI > 60
             elif macd < signal and rsi > 60:
-                logger.info(f"MACD ({macd}) < Signal ({signal}) and RSI ({rsi}) > 60. Executing partial sell.")
-                self._execute_partial_sell(current_price)
+                logger.info("MACD (%s) < Signal (%s) and RSI (%s) > 60. Executing partial sell.", macd, signal, rsi)
+                return branch, PARTIAL_SELL, self._execute_partial_sell(current_price)
             else:
-                logger.info(colored(f"No trade signal detected: MACD {macd}, Signal {signal}, RSI {rsi}. Conditions for buying: MACD > Signal and RSI < 40. Conditions for selling: MACD < Signal and RSI > 60.", 'yellow'))
+                logger.info("No trade signal detected: MACD %s, Signal %s, RSI %s. Conditions for buying: MACD > Signal and RSI < 40. Conditions for selling: MACD < Signal and RSI > 60.",
+                            macd, signal, rsi, extra={"color": "yellow", "throttle": LOG_REPEAT_INTERVAL})
+        return branch, HOLD, None
 
 
-    def _execute_buy(self, current_price: float):
+    def _execute_buy(self, current_price: float) -> Optional[str]:
         potential_profit_loss = None
         if self.last_sell_price:
             potential_profit_loss = calculate_potential_profit_loss(current_price, self.last_sell_price)
 
         # Check market volume or trends to ensure buying during upward momentum
-        market_volume = kraken_api.get_market_volume()
+        market_volume = self._cycle_market_volume
+        if market_volume is None and self._cycle_loop is not None and self._local_order_book() is None:
+            # Async cycle: the depth the order needs is fetched alongside the volume instead of after it
+            with self.cycle_timer.phase(PHASE_MARKET_DATA):
+                market_volume, self._cycle_order_book = asyncio.run_coroutine_threadsafe(self._fetch_volume_and_depth(),
+                                                                                         self._cycle_loop).result()
+        if market_volume is None:
+            with self.cycle_timer.phase(PHASE_VOLUME):
+                market_volume = kraken_api.get_market_volume(self.pair)
         if market_volume and market_volume < 100:
-            logger.info(f"Market volume ({market_volume}) is too low for a confident buy. Skipping buy action.")
-            return
+            logger.info("Market volume (%s) is too low for a confident buy. Skipping buy action.", market_volume)
+            return None
 
         if self.last_trade_type != 'buy' and (potential_profit_loss is None or is_profitable_trade(potential_profit_loss)):
-            logger.info(colored(f"Buying BTC... Signal: MACD crossover above SignalRSI < 40 (moderately oversold), Potential Profit: {potential_profit_loss if potential_profit_loss else 0:.2f}%, Market Volume: {market_volume}", 'green'))
-            kraken_api.execute_trade(portfolio.portfolio['TRADING'], 'buy')
+            logger.info("Buying %s... Signal: MACD crossover above SignalRSI < 40 (moderately oversold), Potential Profit: %.2f%%, Market Volume: %s",
+                        self.pair, potential_profit_loss or 0, market_volume, extra={"color": "green"})
+            order_id = self._submit_order(self.portfolio.portfolio['TRADING'], 'buy')
             self.last_buy_price = current_price
             self.last_trade_type = 'buy'
+            return order_id
+        return None
 
-    def _execute_partial_sell(self, current_price: float):
+    def _execute_partial_sell(self, current_price: float) -> Optional[str]:
         potential_profit_loss = None
         if self.last_buy_price:
             potential_profit_loss = calculate_potential_profit_loss(current_price, self.last_buy_price)
 
         if self.last_trade_type != 'sell' and (potential_profit_loss is None or is_profitable_trade(potential_profit_loss)):
-            logger.info(colored(f"Partially selling BTC...Signal: MACD crossover below SignalRSI > 60 (moderately overbought), Potential Profit: {potential_profit_loss if potential_profit_loss else 0:.2f}%", 'yellow'))
+            logger.info("Partially selling %s...Signal: MACD crossover below SignalRSI > 60 (moderately overbought), Potential Profit: %.2f%%",
+                        self.pair, potential_profit_loss or 0, extra={"color": "yellow"})
             # Execute a partial sell - selling 50% of the current trading amount
-            kraken_api.execute_trade(portfolio.portfolio['TRADING'] / 2, 'sell')
+            order_id = self._submit_order(self.portfolio.portfolio['TRADING'] / 2, 'sell')
             self.last_sell_price = current_price
             self.last_trade_type = 'sell'
+            return order_id
+        return None
+
+    def _execute_sell(self, current_price: float) -> Optional[str]:
+        potential_profit_loss = None
+        if self.last_buy_price:
+            potential_profit_loss = calculate_potential_profit_loss(current_price, self.last_buy_price)
+
+        if self.last_trade_type != 'sell' and (potential_profit_loss is None or is_profitable_trade(potential_profit_loss)):
+            logger.info("Selling %s... Signal: MACD below Signal with negative sentiment, Potential Profit: %.2f%%",
+                        self.pair, potential_profit_loss or 0, extra={"color": "red"})
+            # Sell the whole trading amount
+            order_id = self._submit_order(self.portfolio.portfolio['TRADING'], 'sell')
+            self.last_sell_price = current_price
+            self.last_trade_type = 'sell'
+            return order_id
+        return None
+
+    def _local_order_book(self) -> Optional[dict]:
+        return self.local_order_book.to_dict() if self.local_order_book is not None else None
+
+    def _submit_order(self, volume: float, side: str) -> Optional[str]:
+        """Places the order and returns its Kraken order id, or None if it was not placed."""
+        order_book = self._cycle_order_book or self._local_order_book()
+        if order_book is None:
+            # Fetched here rather than inside execute_trade so the fetch is timed apart from the order
+            with self.cycle_timer.phase(PHASE_ORDER_BOOK):
+                order_book = kraken_api.get_order_book(self.pair)
+            if not order_book:
+                logger.error(f"Failed to retrieve the {self.pair} order book. Skipping {side} order.")
+                return None
+        with self.cycle_timer.phase(PHASE_ORDER):
+            return kraken_api.execute_trade(volume, side, order_book=order_book, pair=self.pair)
 
 # Initialize TradingStrategy
 trading_strategy_instance = TradingStrategy()
 
-def trading_strategy(prices: List[float]):
-    trading_strategy_instance.prices = prices
+def _seed_history(history: Union[List[float], OHLCV]):
+    # Seed the ring buffer with the historical prices on the first cycle only
+    if len(trading_strategy_instance.prices) > 0 or len(history) == 0:
+        return
+    if isinstance(history, OHLCV):
+        trading_strategy_instance.load_candles(history)
+    else:
+        trading_strategy_instance.extend_prices(history)
+
+def trading_strategy(prices: Union[List[float], OHLCV]):
+    _seed_history(prices)
     trading_strategy_instance.execute_strategy()
+
+async def trading_strategy_async(prices: Union[List[float], OHLCV]):
+    _seed_history(prices)
+    await trading_strategy_instance.execute_strategy_async()
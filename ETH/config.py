@@ -14,6 +14,8 @@ if not API_KEY or not API_SECRET:
 
 # API-related constants
 API_DOMAIN = os.getenv("API_DOMAIN", "https://api.kraken.com")
+# Optional file holding the last private-call nonce, shared by every process using the same API key
+KRAKEN_NONCE_FILE = os.getenv("KRAKEN_NONCE_FILE")
 
 # Allocation strategy for portfolio management
 ALLOCATIONS = {
@@ -1,11 +1,11 @@
 import requests
-import time
 import base64
 import hashlib
 import hmac
 import json
 from typing import Optional, List, Dict
-from config import API_KEY, API_SECRET, API_DOMAIN
+from config import API_KEY, API_SECRET, API_DOMAIN, KRAKEN_NONCE_FILE
+from nonce import NonceGenerator
 from logger_config import logger
 from tenacity import retry, wait_exponential, stop_after_attempt
 
@@ -14,6 +14,8 @@ class KrakenAPI:
         self.api_key = api_key
         self.api_secret = api_secret
         self.api_domain = api_domain
+        # Microsecond nonces, like the BTC bot's, so the bots can share an API key
+        self.nonce_generator = NonceGenerator(KRAKEN_NONCE_FILE)
 
     def _sign_request(self, api_path: str, api_nonce: str, api_postdata: str) -> str:
         api_sha256 = hashlib.sha256(api_nonce.encode('utf-8') + api_postdata.encode('utf-8')).digest()
@@ -28,7 +30,7 @@ class KrakenAPI:
         
         if is_private:
             # Handling private request
-            nonce = str(int(time.time() * 1000))
+            nonce = self.nonce_generator()
             if not data:
                 data = {}
             data['nonce'] = nonce
@@ -0,0 +1,56 @@
+import fcntl
+import os
+import threading
+import time
+from typing import Optional
+
+
+class NonceGenerator:
+    """
+    Strictly increasing nonces for Kraken private calls, in microseconds.
+
+    The clock is the wall time read once at start-up advanced by time.monotonic(), so
+    NTP corrections or manual clock changes while running cannot move it backwards, and
+    every nonce is at least one more than the previous one, so parallel calls in the same
+    microsecond still differ. With 'path' set, the last nonce is also kept in a locked
+    file so several processes sharing an API key on this host never reuse one.
+
+    Private calls sent concurrently can still reach Kraken out of order; give the key a
+    nonce window in its API settings when pipelining them.
+    """
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._last = 0
+        self._wall_start = time.time()
+        self._monotonic_start = time.monotonic()
+
+    def _clock(self) -> int:
+        return int((self._wall_start + time.monotonic() - self._monotonic_start) * 1_000_000)
+
+    def next(self) -> int:
+        with self._lock:
+            nonce = max(self._clock(), self._last + 1)
+            if self.path is not None:
+                nonce = self._reserve_shared(nonce)
+            self._last = nonce
+            return nonce
+
+    def _reserve_shared(self, nonce: int) -> int:
+        """Takes the next nonce from the shared file under an exclusive lock."""
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            stored = os.read(fd, 32).strip()
+            if stored:
+                nonce = max(nonce, int(stored) + 1)
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, str(nonce).encode())
+            return nonce
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def __call__(self) -> str:
+        return str(self.next())